@@ -7,6 +7,7 @@ from django.contrib import messages
 from django.utils.html import format_html
 from django.db import transaction
 from .models import UserProfile
+from .services import invalidate_cached_user
 
 class UserProfileAdmin(UserAdmin):
     model = UserProfile
@@ -70,13 +71,19 @@ class UserProfileAdmin(UserAdmin):
     
     def deactivate_users(self, request, queryset):
         """Bulk action to deactivate selected users"""
+        user_ids = list(queryset.values_list("pk", flat=True))
         updated = queryset.update(is_active=False)
+        for user_id in user_ids:
+            invalidate_cached_user(user_id)
         self.message_user(request, f'Successfully deactivated {updated} user(s).')
     
     
     def activate_users(self, request, queryset):
         """Bulk action to activate selected users"""
+        user_ids = list(queryset.values_list("pk", flat=True))
         updated = queryset.update(is_active=True)
+        for user_id in user_ids:
+            invalidate_cached_user(user_id)
         self.message_user(request, f'Successfully activated {updated} user(s).')
         
     def get_urls(self):
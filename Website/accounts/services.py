@@ -6,6 +6,7 @@ Never imports Response, JsonResponse, or HttpResponse.
 """
 import logging
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 from workos import WorkOSClient
 
@@ -72,6 +73,36 @@ def delete_account(user: UserProfile, session) -> dict:
     return {"message": "Account deleted successfully"}
 
 
+# ── Session user cache ───────────────────────────────────────────────────────
+
+def _user_cache_key(user_id) -> str:
+    return f"accounts:user:{user_id}"
+
+
+def get_cached_user(user_id) -> UserProfile | None:
+    """Return the UserProfile for *user_id*, serving it from cache when possible.
+
+    Entries live for ``settings.USER_CACHE_SECONDS`` and are dropped whenever
+    the profile is saved or deleted (see ``accounts.signals``).  Returns
+    ``None`` if the user does not exist.
+    """
+    timeout = getattr(settings, "USER_CACHE_SECONDS", 0)
+    if timeout:
+        user = cache.get(_user_cache_key(user_id))
+        if user is not None:
+            return user
+
+    user = UserProfile.objects.filter(pk=user_id).first()
+    if user is not None and timeout:
+        cache.set(_user_cache_key(user_id), user, timeout)
+    return user
+
+
+def invalidate_cached_user(user_id) -> None:
+    """Forget the cached UserProfile for *user_id*."""
+    cache.delete(_user_cache_key(user_id))
+
+
 # ── Signup ───────────────────────────────────────────────────────────────────
 
 def _process_pending_invite(user: UserProfile) -> dict | None:
@@ -0,0 +1,13 @@
+"""Model signal handlers for the accounts app."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import UserProfile
+from accounts.services import invalidate_cached_user
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Drop the cached session user whenever the profile changes."""
+    invalidate_cached_user(instance.pk)
@@ -8,7 +8,10 @@ class WorkOSSessionMiddleware:
 
     Reads the authenticated user's PK from the session (written during the
     WorkOS OAuth callback) and attaches the UserProfile to ``request.user``.
-    Falls back to AnonymousUser when no valid session exists.
+    The profile comes from ``accounts.services.get_cached_user`` so repeat
+    requests skip the user query.  Falls back to AnonymousUser when no valid
+    session exists; requests without a session cookie never touch the
+    database here.
     """
 
     SESSION_KEY = "_workos_user_id"
@@ -19,18 +22,35 @@ class WorkOSSessionMiddleware:
     def __call__(self, request):
         user_id = request.session.get(self.SESSION_KEY)
         if user_id:
-            from accounts.models import UserProfile
+            from accounts.services import get_cached_user
 
-            try:
-                request.user = UserProfile.objects.get(pk=user_id)
-            except UserProfile.DoesNotExist:
+            user = get_cached_user(user_id)
+            if user is None:
                 request.session.flush()
                 request.user = AnonymousUser()
+            else:
+                request.user = user
         else:
             request.user = AnonymousUser()
         return self.get_response(request)
 
 
+class MembershipCacheMiddleware:
+    """
+    Scopes ``organizations.helpers.access`` lookups to a single request, so
+    every access check during the request shares one membership load.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from organizations.helpers.access import access_scope
+
+        with access_scope():
+            return self.get_response(request)
+
+
 class LoginRequiredMiddleware:
     """
     Middleware that redirects unauthenticated users to the login page
@@ -7,6 +7,8 @@ from pathlib import Path
 from dotenv import load_dotenv
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 from core.utils.key_vault_client import KeyVaultClient
 
 load_dotenv()
@@ -99,15 +101,68 @@ WORKOS = {
     "REDIRECT_URI": f"{HOST}/api/v1/accounts/oauth/workos/callback",
 }
 
+# ──────────────────────────────────────────────
+# Cache
+# ──────────────────────────────────────────────
+# Without CACHE_URL Django uses a per-process LocMemCache, so anything cached
+# (and any invalidation) is only seen by the worker that wrote it.  Set
+# CACHE_URL (e.g. redis://host:6379/0, needs the ``redis`` package) to share
+# one cache across workers; the cross-request caches below only default on
+# when it is set.
+CACHE_URL = os.getenv("CACHE_URL", "")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+
 # ──────────────────────────────────────────────
 # Sessions & Security  (safe defaults — overridden per env)
 # ──────────────────────────────────────────────
-SESSION_ENGINE = "django.contrib.sessions.backends.db"
+# SESSION_BACKEND picks the session store: "db" (default), "cached_db",
+# "cache" or "signed_cookies".  "cache" and "cached_db" need a shared cache
+# (CACHE_URL), otherwise each worker would see its own sessions.  Signed
+# cookies keep sessions off the database entirely but cannot be revoked
+# server-side, so a flushed session stays valid until it expires.
+_SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+_SESSION_BACKEND = os.getenv("SESSION_BACKEND", "db")
+if _SESSION_BACKEND not in _SESSION_ENGINES:
+    raise ImproperlyConfigured(
+        f"Unknown SESSION_BACKEND {_SESSION_BACKEND!r}; expected one of {', '.join(_SESSION_ENGINES)}."
+    )
+if _SESSION_BACKEND in ("cache", "cached_db") and not CACHE_URL:
+    raise ImproperlyConfigured(f"SESSION_BACKEND={_SESSION_BACKEND!r} requires a shared cache; set CACHE_URL.")
+SESSION_ENGINE = _SESSION_ENGINES[_SESSION_BACKEND]
 SESSION_COOKIE_SECURE = True
 SESSION_COOKIE_SAMESITE = "Lax"
-SESSION_SAVE_EVERY_REQUEST = True
+SESSION_SAVE_EVERY_REQUEST = os.getenv("SESSION_SAVE_EVERY_REQUEST", "true").lower() == "true"
 SECURE_SSL_REDIRECT = False # TLS is terminated at the load balancer
 
+# Seconds WorkOSSessionMiddleware may serve request.user from cache (0 = always query).
+# Only on by default with a shared cache: deactivating a user invalidates the
+# entry in the shared cache, but a per-process cache would keep serving it on
+# other workers until it expires.
+USER_CACHE_SECONDS = int(os.getenv("USER_CACHE_SECONDS", "30" if CACHE_URL else "0"))
+
+# Seconds to keep a user's org/project roles in the shared cache (0 = per-request only).
+MEMBERSHIP_CACHE_SECONDS = int(os.getenv("MEMBERSHIP_CACHE_SECONDS", "0"))
+
+# Traefik config long-polls (?wait=) each hold a worker thread while they wait.
+# At most this many wait at once per process; beyond that, requests are
+# answered straight away and Traefik falls back to its normal poll interval.
+TRAEFIK_LONG_POLL_MAX_WAITERS = int(os.getenv("TRAEFIK_LONG_POLL_MAX_WAITERS", "2"))
+
+# Month-end invoice runs: threads writing invoices, and concurrent Stripe calls.
+INVOICE_RUN_DB_WORKERS = int(os.getenv("INVOICE_RUN_DB_WORKERS", "4"))
+INVOICE_RUN_STRIPE_WORKERS = int(os.getenv("INVOICE_RUN_STRIPE_WORKERS", "8"))
+
 CSRF_TRUSTED_ORIGINS: list[str] = []
 for host in ALLOWED_HOSTS:
     CSRF_TRUSTED_ORIGINS.extend([f"https://{host}", f"http://{host}"])
@@ -149,6 +204,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "core.middleware.WorkOSSessionMiddleware",
+    "core.middleware.MembershipCacheMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "core.middleware.LoginRequiredMiddleware",
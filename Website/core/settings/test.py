@@ -33,6 +33,9 @@ class DisableMigrations:
 
 MIGRATION_MODULES = DisableMigrations()
 
+# Test data lives in the test case's transaction, which other threads cannot see.
+INVOICE_RUN_DB_WORKERS = 1
+
 # Relax security for tests
 SESSION_COOKIE_SECURE = False
 CSRF_COOKIE_SECURE = False
@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.utils import blob_storage
+from core.utils.blob_storage import get_blob_service_client, parse_range_header
+
+
+class ParseRangeHeaderTest(SimpleTestCase):
+    """Tests for single-range ``Range`` header parsing."""
+
+    def test_explicit_open_and_suffix_ranges(self):
+        self.assertEqual(parse_range_header("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range_header("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range_header("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range_header("bytes=990-2000", 1000), (990, 999))
+
+    def test_absent_malformed_or_multiple_ranges_serve_whole_blob(self):
+        for header in (None, "", "items=0-1", "bytes=0-1,5-9", "bytes=-", "bytes=9-1"):
+            self.assertIsNone(parse_range_header(header, 1000), header)
+
+    def test_range_past_end_is_unsatisfiable(self):
+        with self.assertRaises(ValueError):
+            parse_range_header("bytes=1000-", 1000)
+        with self.assertRaises(ValueError):
+            parse_range_header("bytes=-0", 1000)
+
+
+@patch("core.utils.blob_storage.BlobServiceClient")
+class GetBlobServiceClientTest(SimpleTestCase):
+    def setUp(self):
+        blob_storage._clients.clear()
+
+    def tearDown(self):
+        blob_storage._clients.clear()
+
+    def test_client_is_shared_per_connection_string(self, mock_client_cls):
+        first = get_blob_service_client("conn")
+        second = get_blob_service_client("conn")
+
+        self.assertIs(first, second)
+        mock_client_cls.from_connection_string.assert_called_once_with(
+            "conn",
+            max_single_get_size=blob_storage.DOWNLOAD_CHUNK_BYTES,
+            max_chunk_get_size=blob_storage.DOWNLOAD_CHUNK_BYTES,
+        )
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.test import TestCase, RequestFactory, override_settings
 
 from core.middleware import LoginRequiredMiddleware, WorkOSSessionMiddleware
@@ -43,6 +44,40 @@ class WorkOSSessionMiddlewareTest(TestCase):
         self.assertIsInstance(request.user, AnonymousUser)
         self.assertNotIn(WorkOSSessionMiddleware.SESSION_KEY, request.session)
 
+    @override_settings(USER_CACHE_SECONDS=60)
+    def test_repeat_requests_use_cached_user(self):
+        cache.clear()
+        for expected_queries in (2, 1):  # session + user, then session only
+            request = self.factory.get("/dashboard/")
+            self._add_session(request)
+            request.session[WorkOSSessionMiddleware.SESSION_KEY] = str(self.user.pk)
+            request.session.save()
+            request.session = type(request.session)(request.session.session_key)
+            with self.assertNumQueries(expected_queries):
+                self.middleware(request)
+            self.assertEqual(request.user, self.user)
+
+    @override_settings(USER_CACHE_SECONDS=60)
+    def test_profile_save_invalidates_cached_user(self):
+        cache.clear()
+        request = self.factory.get("/dashboard/")
+        self._add_session(request)
+        request.session[WorkOSSessionMiddleware.SESSION_KEY] = str(self.user.pk)
+        self.middleware(request)
+
+        self.user.first_name = "Alice"
+        self.user.save()
+        self.middleware(request)
+
+        self.assertEqual(request.user.first_name, "Alice")
+
+    def test_request_without_session_cookie_skips_database(self):
+        request = self.factory.get("/")
+        self._add_session(request)
+        with self.assertNumQueries(0):
+            self.middleware(request)
+        self.assertIsInstance(request.user, AnonymousUser)
+
 
 class LoginRequiredMiddlewareTest(TestCase):
     def setUp(self):
@@ -0,0 +1,61 @@
+from unittest.mock import patch, MagicMock
+
+from django.test import SimpleTestCase
+
+from core.utils.service_bus_sender import ServiceBusSenderPool
+
+
+@patch("core.utils.service_bus_sender.ServiceBusClient")
+class ServiceBusSenderPoolTest(SimpleTestCase):
+    """Tests for the pooled, reconnecting Service Bus sender."""
+
+    def test_reuses_client_across_sends(self, mock_client_cls):
+        pool = ServiceBusSenderPool()
+
+        pool.send("conn", "iac", ["m1"])
+        pool.send("conn", "iac", ["m2"])
+
+        mock_client_cls.from_connection_string.assert_called_once_with("conn")
+        sender = mock_client_cls.from_connection_string.return_value.get_queue_sender.return_value
+        self.assertEqual(sender.send_messages.call_count, 2)
+        self.assertEqual(pool.stats()["sends"], 2)
+        self.assertEqual(pool.stats()["reconnects"], 0)
+
+    def test_reconnects_when_link_dies(self, mock_client_cls):
+        dead_sender = MagicMock()
+        dead_sender.send_messages.side_effect = Exception("link detached")
+        live_sender = MagicMock()
+        mock_client_cls.from_connection_string.return_value.get_queue_sender.side_effect = [
+            dead_sender, live_sender,
+        ]
+        pool = ServiceBusSenderPool()
+
+        pool.send("conn", "iac", ["m1"])
+
+        dead_sender.close.assert_called_once()
+        live_sender.send_messages.assert_called_once_with(["m1"])
+        stats = pool.stats()
+        self.assertEqual(stats["reconnects"], 1)
+        self.assertEqual(stats["sends"], 1)
+        self.assertEqual(stats["failures"], 0)
+
+    def test_raises_and_counts_failure_when_retry_fails(self, mock_client_cls):
+        sender = mock_client_cls.from_connection_string.return_value.get_queue_sender.return_value
+        sender.send_messages.side_effect = Exception("unreachable")
+        pool = ServiceBusSenderPool()
+
+        with self.assertRaises(Exception):
+            pool.send("conn", "iac", ["m1"])
+
+        stats = pool.stats()
+        self.assertEqual(stats["failures"], 1)
+        self.assertEqual(stats["sends"], 0)
+
+    def test_close_releases_senders(self, mock_client_cls):
+        pool = ServiceBusSenderPool()
+        pool.send("conn", "iac", ["m1"])
+
+        pool.close()
+
+        mock_client_cls.from_connection_string.return_value.close.assert_called_once()
+        self.assertEqual(pool.stats()["open_senders"], 0)
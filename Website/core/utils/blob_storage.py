@@ -0,0 +1,72 @@
+"""
+Process-wide Azure Blob Storage clients and HTTP range helpers.
+
+``BlobServiceClient.from_connection_string`` parses the connection string and
+builds a fresh HTTP pipeline (and connection pool) every time, so we keep one
+client per connection string for the lifetime of the worker process.  Azure
+SDK clients are safe to share between threads.
+
+Clients are configured to fetch blobs in ``DOWNLOAD_CHUNK_BYTES`` pieces, so
+iterating ``download_blob().chunks()`` never holds more than one chunk of a
+large archive in memory.
+"""
+
+import re
+import threading
+
+from azure.storage.blob import BlobServiceClient
+
+DOWNLOAD_CHUNK_BYTES = 4 * 1024 * 1024  # 4 MB
+
+_clients: dict[str, BlobServiceClient] = {}
+_lock = threading.Lock()
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def get_blob_service_client(connection_string: str) -> BlobServiceClient:
+    """Return the shared ``BlobServiceClient`` for *connection_string*."""
+    client = _clients.get(connection_string)
+    if client is None:
+        with _lock:
+            client = _clients.get(connection_string)
+            if client is None:
+                client = BlobServiceClient.from_connection_string(
+                    connection_string,
+                    max_single_get_size=DOWNLOAD_CHUNK_BYTES,
+                    max_chunk_get_size=DOWNLOAD_CHUNK_BYTES,
+                )
+                _clients[connection_string] = client
+    return client
+
+
+def parse_range_header(header: str | None, size: int) -> tuple[int, int] | None:
+    """Resolve a single-range ``Range`` header against a blob of *size* bytes.
+
+    Returns an inclusive ``(start, end)`` pair, or ``None`` when the header is
+    absent, malformed or asks for several ranges (the whole blob is served).
+    Raises ``ValueError`` when the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Unsatisfiable range.")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Unsatisfiable range.")
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
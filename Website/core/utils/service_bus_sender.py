@@ -0,0 +1,195 @@
+"""
+Process-wide pool of long-lived Azure Service Bus queue senders.
+
+Opening a ``ServiceBusClient`` costs an AMQP connection plus a TLS handshake,
+so instead of building one per message we keep a single client/sender pair
+per queue for the lifetime of the worker process.  Senders are not safe to
+share between threads, so every send is serialized by a per-queue lock.
+
+If a send fails (e.g. the link was detached by the broker after idling) the
+pooled sender is torn down, rebuilt and the send is retried once.
+
+``send_batch`` packs many message bodies into as few ``ServiceBusMessageBatch``
+round-trips as the broker's size limit allows.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from azure.servicebus import ServiceBusClient, ServiceBusMessage
+from azure.servicebus.exceptions import MessageSizeExceededError
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledSender:
+    """A lazily-opened client + queue sender guarded by a lock."""
+
+    def __init__(self, connection_string: str, queue_name: str):
+        self.connection_string = connection_string
+        self.queue_name = queue_name
+        self.lock = threading.Lock()
+        self._client = None
+        self._sender = None
+
+    def get(self):
+        """Return the open sender, connecting first if needed.  Caller holds ``lock``."""
+        if self._sender is None:
+            self._client = ServiceBusClient.from_connection_string(self.connection_string)
+            self._sender = self._client.get_queue_sender(self.queue_name)
+        return self._sender
+
+    def close(self) -> None:
+        """Close the sender and client, swallowing errors from dead links.  Caller holds ``lock``."""
+        for handle in (self._sender, self._client):
+            if handle is None:
+                continue
+            try:
+                handle.close()
+            except Exception as exc:
+                logger.debug("Error closing Service Bus handle for %s: %s", self.queue_name, exc)
+        self._sender = None
+        self._client = None
+
+
+class ServiceBusSenderPool:
+    """Thread-safe registry of pooled senders keyed by (connection string, queue)."""
+
+    def __init__(self):
+        self._senders: dict[tuple[str, str], _PooledSender] = {}
+        self._registry_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "sends": 0,
+            "messages": 0,
+            "failures": 0,
+            "reconnects": 0,
+            "total_send_seconds": 0.0,
+            "last_send_seconds": 0.0,
+            "max_send_seconds": 0.0,
+        }
+
+    # ------------------------------------------------------------------ helpers
+
+    def _get_pooled(self, connection_string: str, queue_name: str) -> _PooledSender:
+        key = (connection_string, queue_name)
+        pooled = self._senders.get(key)
+        if pooled is None:
+            with self._registry_lock:
+                pooled = self._senders.get(key)
+                if pooled is None:
+                    pooled = _PooledSender(connection_string, queue_name)
+                    self._senders[key] = pooled
+        return pooled
+
+    def _record(self, elapsed: float, message_count: int = 0, failed: bool = False, reconnected: bool = False) -> None:
+        with self._stats_lock:
+            if failed:
+                self._stats["failures"] += 1
+            else:
+                self._stats["sends"] += 1
+                self._stats["messages"] += message_count
+                self._stats["total_send_seconds"] += elapsed
+                self._stats["last_send_seconds"] = elapsed
+                self._stats["max_send_seconds"] = max(self._stats["max_send_seconds"], elapsed)
+            if reconnected:
+                self._stats["reconnects"] += 1
+
+    def _send_with_retry(self, connection_string: str, queue_name: str, send_fn, message_count: int) -> None:
+        """Run ``send_fn(sender)`` on the pooled sender, reconnecting once on failure."""
+        pooled = self._get_pooled(connection_string, queue_name)
+        reconnected = False
+        start = time.monotonic()
+
+        with pooled.lock:
+            try:
+                send_fn(pooled.get())
+            except Exception as exc:
+                logger.warning(
+                    "Service Bus send to %s failed (%s); reconnecting and retrying once.",
+                    queue_name, exc,
+                )
+                pooled.close()
+                reconnected = True
+                try:
+                    send_fn(pooled.get())
+                except Exception:
+                    pooled.close()
+                    self._record(time.monotonic() - start, failed=True, reconnected=reconnected)
+                    raise
+
+        self._record(time.monotonic() - start, message_count=message_count, reconnected=reconnected)
+
+    # ------------------------------------------------------------------ public
+
+    def send(self, connection_string: str, queue_name: str, messages: list[ServiceBusMessage]) -> None:
+        """Send *messages* on the pooled sender for *queue_name*.
+
+        Reconnects and retries once if the first attempt fails.  Raises the
+        underlying Service Bus exception if the retry also fails.
+        """
+        self._send_with_retry(
+            connection_string,
+            queue_name,
+            lambda sender: sender.send_messages(messages),
+            len(messages),
+        )
+
+    def send_batch(self, connection_string: str, queue_name: str, bodies: list[str]) -> None:
+        """Send every string in *bodies* using size-bounded ``ServiceBusMessageBatch`` objects.
+
+        A retry after a partial failure may re-send batches that already went
+        out, so consumers must tolerate duplicates (IaC workers do, because an
+        operation can only be claimed once).
+        """
+        def _send_all(sender):
+            batch = sender.create_message_batch()
+            for body in bodies:
+                message = ServiceBusMessage(body)
+                try:
+                    batch.add_message(message)
+                except MessageSizeExceededError:
+                    if len(batch) == 0:
+                        raise
+                    sender.send_messages(batch)
+                    batch = sender.create_message_batch()
+                    batch.add_message(message)
+            if len(batch):
+                sender.send_messages(batch)
+
+        self._send_with_retry(connection_string, queue_name, _send_all, len(bodies))
+
+    def stats(self) -> dict:
+        """Return a snapshot of send/latency/reconnect counters."""
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        sends = snapshot["sends"]
+        snapshot["avg_send_seconds"] = (snapshot["total_send_seconds"] / sends) if sends else 0.0
+        snapshot["open_senders"] = len(self._senders)
+        return snapshot
+
+    def close(self) -> None:
+        """Close every pooled sender (called at interpreter shutdown)."""
+        with self._registry_lock:
+            pooled_senders = list(self._senders.values())
+            self._senders.clear()
+        for pooled in pooled_senders:
+            with pooled.lock:
+                pooled.close()
+
+
+_pool = None
+_lock = threading.Lock()
+
+
+def get_sender_pool() -> ServiceBusSenderPool:
+    """Lazy-initialise the process-wide ``ServiceBusSenderPool``."""
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ServiceBusSenderPool()
+                atexit.register(_pool.close)
+    return _pool
@@ -19,7 +19,7 @@ import stacks.services as stack_services
 from core.helpers import request_helpers
 from github.models import Webhook, Token
 from stacks.models import Stack
-from projects.models import ProjectMember
+from organizations.helpers.access import get_user_access
 
 # from stacks.services import get_stack
 from accounts.models import UserProfile
@@ -428,16 +428,20 @@ def github_webhook(request: HttpRequest) -> JsonResponse:
     # The container-app will pull the latest source from GitHub automatically
     # because the webhook/token info is resolved at queue-send time.
     try:
-        stack_services.trigger_iac_update(stack_id=str(webhook.stack.pk))
+        result = stack_services.trigger_iac_update(stack_id=str(webhook.stack.pk))
         logger.info(
             f"IAC update triggered for stack {webhook.stack.pk} "
-            f"(repo: {repository_name}, event: {event_type})"
+            f"(repo: {repository_name}, event: {event_type}, "
+            f"operation: {result['operation_id']}, coalesced: {result['coalesced']})"
         )
     except Exception as exc:
         logger.error(f"Failed to trigger IAC update for stack {webhook.stack.pk}: {exc}")
         return JsonResponse({"error": "Failed to trigger deployment"}, status=500)
 
-    return JsonResponse({"status": "success", "event_type": event_type}, status=200)
+    return JsonResponse(
+        {"status": "success", "event_type": event_type, "operation_id": result["operation_id"]},
+        status=200,
+    )
 
 
 def get_repos_json(request: HttpRequest) -> JsonResponse:
@@ -478,7 +482,7 @@ def disconnect_github_webhook(request: HttpRequest) -> JsonResponse:
         return JsonResponse({"error": "Stack not found"}, status=404)
 
     # Check if the user is a member of the stack's project
-    if not ProjectMember.objects.filter(project=stack.project, user=user).exists():
+    if not get_user_access(user).is_project_member(stack.project_id):
         logger.error(f"User {user.username} attempted to disconnect webhook for stack {stack_id} they don't have access to")
         return JsonResponse({"error": "You don't have permission to disconnect this webhook"}, status=403)
 
@@ -589,7 +593,7 @@ def get_webhook_status(request: HttpRequest) -> JsonResponse:
         return JsonResponse({"error": "Stack not found"}, status=404)
 
     # Check if the user is a member of the stack's project
-    if not ProjectMember.objects.filter(project=stack.project, user=user).exists():
+    if not get_user_access(user).is_project_member(stack.project_id):
         return JsonResponse({"error": "You don't have permission to access this stack"}, status=403)
 
     # Check if there's a webhook for this stack
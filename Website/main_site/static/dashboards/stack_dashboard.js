@@ -654,6 +654,7 @@ function getCookie(name) {
     let currentLogId = null;
     let afterLine = 0;
     let pollInterval = null;
+    let eventSource = null;
     let collapsed = false;
     const POLL_MS = 3000;
 
@@ -739,13 +740,46 @@ function getCookie(name) {
         }
     }
 
+    function handleLogEvent(e) {
+        const data = JSON.parse(e.data);
+        if (data.log_id !== currentLogId) return;
+        const skip = Math.max(afterLine - data.start_line, 0);
+        appendLines(data.lines.slice(skip));
+        afterLine = Math.max(afterLine, data.start_line + data.lines.length);
+    }
+
+    function handleLogStatusEvent(e) {
+        const data = JSON.parse(e.data);
+        if (data.log_id !== currentLogId) return;
+        updateStatusBadge(data.status);
+        if (data.status !== 'RUNNING') {
+            poll().then(stopPolling); // pick up any lines sent before the final status
+        }
+    }
+
+    function startStream() {
+        eventSource = new EventSource(`/api/v1/stacks/${stackId}/events/`, { withCredentials: true });
+        eventSource.addEventListener('log', handleLogEvent);
+        eventSource.addEventListener('log_status', handleLogStatusEvent);
+        // The stream starts at the newest event; catch up on anything appended before it opened.
+        eventSource.addEventListener('open', poll, { once: true });
+    }
+
     function startPolling() {
-        if (pollInterval) return;
+        if (pollInterval || eventSource) return;
+        if (window.EventSource) {
+            startStream();
+            return;
+        }
         pollInterval = setInterval(poll, POLL_MS);
         poll(); // immediate first poll
     }
 
     function stopPolling() {
+        if (eventSource) {
+            eventSource.close();
+            eventSource = null;
+        }
         if (pollInterval) {
             clearInterval(pollInterval);
             pollInterval = null;
@@ -18,6 +18,7 @@ from organizations.forms import (
     OrganizationMemberForm,
     NonexistantOrganizationMemberForm,
 )
+from organizations.helpers.access import get_user_access
 from organizations.models import (
     Organization,
     OrganizationMember,
@@ -25,7 +26,7 @@ from organizations.models import (
     ProjectTransferInvitation,
 )
 from projects.forms import ProjectCreateFormWithMembers, ProjectSettingsForm
-from projects.models import Project, ProjectMember
+from projects.models import Project
 from stacks.forms import EnvFileUploadForm, StackSettingsForm, EnvironmentVariablesForm
 from stacks.models import PurchasableStack, Stack
 from stacks.resources.resources_manager import ResourcesManager
@@ -101,9 +102,7 @@ class DashboardView(View):
         organization = Organization.objects.get(id=organization_id)
         members = OrganizationMember.objects.filter(organization=organization)
         projects = Project.objects.filter(organization_id=organization_id)
-        is_admin = OrganizationMember.objects.filter(
-            organization=organization, user=user, role="admin"
-        ).exists()
+        is_admin = get_user_access(user).is_org_admin(organization.id)
 
         # Get all organizations for the user for dropdown
         user_organizations = Organization.objects.filter(organizationmember__user=user)
@@ -156,8 +155,7 @@ class DashboardView(View):
         # Handle project deletion
         if request.method == 'POST' and request.POST.get('action') == 'delete':
             # Check if user has permission to delete the project
-            project_member = ProjectMember.objects.filter(user=user, project=project, role='admin').first()
-            if project_member:
+            if get_user_access(user).is_project_admin(project.id):
                 project.delete()
                 return redirect('main_site:organization_dashboard', organization_id=organization_id)
             else:
@@ -167,7 +165,7 @@ class DashboardView(View):
         stacks = Stack.objects.filter(project_id=project_id).exclude(status="Deleted")
 
         # Check if user is admin of the project
-        is_admin = ProjectMember.objects.filter(user=user, project=project, role='admin').exists()
+        is_admin = get_user_access(user).is_project_admin(project.id)
 
         # Get all organizations and projects for the user for dropdowns
         user_organizations = Organization.objects.filter(organizationmember__user=user)
@@ -203,8 +201,7 @@ class DashboardView(View):
             # Check if user has permission to delete the stack (project admin)
             try:
                 project = Project.objects.get(id=project_id)
-                project_member = ProjectMember.objects.filter(user=user, project=project, role='admin').first()
-                if project_member:
+                if get_user_access(user).is_project_admin(project.id):
                     stack.delete()
                     return redirect('main_site:project_dashboard', organization_id=organization_id, project_id=project_id)
                 else:
@@ -491,11 +488,7 @@ class DashboardView(View):
         user_organizations = Organization.objects.filter(organizationmember__user=user)
 
         # Check if user is admin of this organization
-        is_admin = OrganizationMember.objects.filter(
-            organization=organization,
-            user=user,
-            role="admin"
-        ).exists()
+        is_admin = get_user_access(user).is_org_admin(organization.id)
 
         return render(
             request,
@@ -548,7 +541,7 @@ class DashboardView(View):
         user_projects = Project.objects.filter(projectmember__user=user)
 
         # Check if user is admin of the project
-        is_admin = ProjectMember.objects.filter(user=user, project=project, role='admin').exists()
+        is_admin = get_user_access(user).is_project_admin(project.id)
 
         return render(
             request,
@@ -690,7 +683,7 @@ class DashboardView(View):
         user_projects = Project.objects.filter(projectmember__user=user)
 
         # Check if user is admin of the project
-        is_admin = ProjectMember.objects.filter(user=user, project=project, role='admin').exists()
+        is_admin = get_user_access(user).is_project_admin(project.id)
 
         return render(
             request,
@@ -827,7 +820,7 @@ class DashboardView(View):
             project = Project.objects.get(id=project_id, organization=organization)
             
             # Check if user is a member of the organization
-            if not OrganizationMember.objects.filter(user=user, organization=organization).exists():
+            if not get_user_access(user).is_org_member(organization.id):
                 messages.error(request, "You don't have access to this organization.")
                 return redirect('main_site:dashboard')
                 
@@ -906,7 +899,7 @@ class DashboardView(View):
             project = Project.objects.get(id=project_id, organization=organization)
             
             # Check if user is a member of the organization
-            if not OrganizationMember.objects.filter(user=user, organization=organization).exists():
+            if not get_user_access(user).is_org_member(organization.id):
                 messages.error(request, "You don't have access to this organization.")
                 return redirect('main_site:dashboard')
                 
@@ -951,7 +944,7 @@ class DashboardView(View):
             project = Project.objects.get(id=project_id, organization=organization)
             
             # Check if user is a member of the organization
-            if not OrganizationMember.objects.filter(user=user, organization=organization).exists():
+            if not get_user_access(user).is_org_member(organization.id):
                 messages.error(request, "You don't have access to this organization.")
                 return redirect('main_site:dashboard')
                 
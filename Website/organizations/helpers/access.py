@@ -0,0 +1,125 @@
+"""
+Request-scoped cache of a user's organization and project memberships.
+
+Access checks in the stacks API, the organization services and the dashboard
+views all ask the same questions ("is this user in org X?", "is this user a
+project admin?").  ``get_user_access(user)`` loads the user's org and project
+roles at most once per request and answers every such check from memory.
+
+The memo lives in a ``ContextVar`` opened by ``MembershipCacheMiddleware``;
+outside a request (shell, management commands, plain service tests) nothing is
+memoised and each ``UserAccess`` just loads lazily on first use.
+
+When ``settings.MEMBERSHIP_CACHE_SECONDS`` is non-zero the role maps are also
+kept in the shared Django cache for that long.  Membership saves and deletes
+drop both the shared entry and the current request's memo (see
+``organizations.signals``).
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+_request_access: ContextVar[Optional[dict]] = ContextVar("request_access", default=None)
+
+
+def _cache_key(user_id, kind: str) -> str:
+    return f"organizations:access:{user_id}:{kind}"
+
+
+class UserAccess:
+    """Organization and project roles for one user, loaded lazily."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._org_roles: Optional[dict[str, str]] = None
+        self._project_roles: Optional[dict[str, str]] = None
+
+    def _load(self, kind: str, queryset_factory) -> dict[str, str]:
+        if self.user_id is None:
+            return {}
+        timeout = getattr(settings, "MEMBERSHIP_CACHE_SECONDS", 0)
+        if timeout:
+            roles = cache.get(_cache_key(self.user_id, kind))
+            if roles is not None:
+                return roles
+        # Ordered by pk so ``org_ids``/``project_ids`` match ``.first()`` on the same membership table.
+        roles = dict(queryset_factory().order_by("pk").values_list(f"{kind}_id", "role"))
+        if timeout:
+            cache.set(_cache_key(self.user_id, kind), roles, timeout)
+        return roles
+
+    @property
+    def org_roles(self) -> dict[str, str]:
+        """``{organization_id: role}`` for every organization the user belongs to."""
+        if self._org_roles is None:
+            from organizations.models import OrganizationMember
+
+            self._org_roles = self._load(
+                "organization", lambda: OrganizationMember.objects.filter(user_id=self.user_id),
+            )
+        return self._org_roles
+
+    @property
+    def project_roles(self) -> dict[str, str]:
+        """``{project_id: role}`` for every project the user belongs to."""
+        if self._project_roles is None:
+            from projects.models import ProjectMember
+
+            self._project_roles = self._load(
+                "project", lambda: ProjectMember.objects.filter(user_id=self.user_id),
+            )
+        return self._project_roles
+
+    @property
+    def org_ids(self) -> list[str]:
+        return list(self.org_roles)
+
+    @property
+    def project_ids(self) -> list[str]:
+        return list(self.project_roles)
+
+    def is_org_member(self, organization_id) -> bool:
+        return str(organization_id) in self.org_roles
+
+    def is_org_admin(self, organization_id) -> bool:
+        return self.org_roles.get(str(organization_id)) == "admin"
+
+    def is_project_member(self, project_id) -> bool:
+        return str(project_id) in self.project_roles
+
+    def is_project_admin(self, project_id) -> bool:
+        return self.project_roles.get(str(project_id)) == "admin"
+
+
+def get_user_access(user) -> UserAccess:
+    """Return the ``UserAccess`` for *user*, shared across the current request."""
+    user_id = user.pk if getattr(user, "is_authenticated", False) else None
+    memo = _request_access.get()
+    if memo is None:
+        return UserAccess(user_id)
+    access = memo.get(user_id)
+    if access is None:
+        access = memo[user_id] = UserAccess(user_id)
+    return access
+
+
+def invalidate_user_access(user_id) -> None:
+    """Forget cached memberships for *user_id* (shared cache and current request)."""
+    cache.delete_many([_cache_key(user_id, "organization"), _cache_key(user_id, "project")])
+    memo = _request_access.get()
+    if memo is not None:
+        memo.pop(user_id, None)
+
+
+@contextmanager
+def access_scope():
+    """Memoise ``get_user_access`` results until the block exits."""
+    token = _request_access.set({})
+    try:
+        yield
+    finally:
+        _request_access.reset(token)
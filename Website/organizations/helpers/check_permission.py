@@ -2,7 +2,8 @@ from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 
 from accounts.models import UserProfile
-from organizations.models import Organization, OrganizationMember
+from organizations.helpers.access import get_user_access
+from organizations.models import Organization
 from typing import Union
 
 class OrganizationPermissionsError(Exception):
@@ -20,16 +21,14 @@ def check_permisssion(user: UserProfile, organization_id, requeired_role: Union[
         return organization
 
     organization = get_object_or_404(Organization, id=organization_id)
-    membership = OrganizationMember.objects.filter(
-        user=user, organization=organization
-    ).first()
+    access = get_user_access(user)
 
-    if not membership:
+    if not access.is_org_member(organization.id):
         raise OrganizationPermissionsError(
             "You don't have permission to access this organization.", status=403
         )
 
-    if requeired_role.lower() == "admin" and membership.role != "admin":
+    if requeired_role.lower() == "admin" and not access.is_org_admin(organization.id):
         raise OrganizationPermissionsError(
             "Admin role required for this action.", status=403
         )
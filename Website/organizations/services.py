@@ -17,8 +17,10 @@ from organizations.models import Organization, OrganizationMember, PendingInvite
 from projects.models import Project, ProjectMember
 from payments.models import Invoice
 from payments.services import create_stripe_customer
+from stacks.services import reassign_project_usage
 from .helpers.email_helpers import invite_org_member
 from .helpers import check_permission
+from .helpers.access import get_user_access
 
 logger = logging.getLogger(__name__)
 
@@ -54,12 +56,11 @@ def get_organizations(user: UserProfile) -> list[Organization]:
 def get_organization(user: UserProfile, organization_id: str) -> Union[Organization, None]:
     """Get organization if user is a member."""
     organization = Organization.objects.filter(id=organization_id).first()
-    organization_member = OrganizationMember.objects.filter(organization=organization, user=user).first()
 
     if not organization:
         return None
 
-    if not organization_member:
+    if not get_user_access(user).is_org_member(organization.id):
         return None
 
     return organization
@@ -119,7 +120,7 @@ def update_organization(user: UserProfile, organization_id: str, data: dict) ->
 def delete_organization(user: UserProfile, organization_id: str) -> dict:
     organization = get_object_or_404(Organization, id=organization_id)
 
-    if not OrganizationMember.objects.filter(user=user, organization=organization, role="admin").exists():
+    if not get_user_access(user).is_org_admin(organization.id):
         raise ForbiddenError("You are not authorized to delete this organization")
 
     project_count = Project.objects.filter(organization=organization).count()
@@ -140,7 +141,7 @@ def delete_organization(user: UserProfile, organization_id: str) -> dict:
     return {"message": "organization deleted"}
 
 def update_user(user: UserProfile, organization: object, user_id: str) -> dict:
-    permission_check = OrganizationMember.objects.filter(user=user, organization=organization, role="admin").exists()
+    permission_check = get_user_access(user).is_org_admin(organization.id)
     multiple_admin_check = OrganizationMember.objects.filter(organization=organization, role="admin")
 
     if not permission_check:
@@ -245,10 +246,7 @@ def initiate_project_transfer(user: UserProfile, project_id: str, client_email:
     except Project.DoesNotExist:
         raise NotFoundError("Project not found")
 
-    project_member = ProjectMember.objects.filter(
-        project=project, user=user, role="admin"
-    ).first()
-    if not project_member:
+    if not get_user_access(user).is_project_admin(project.id):
         raise ForbiddenError("You don't have permission to transfer this project")
 
     existing_transfer = ProjectTransferInvitation.objects.filter(
@@ -313,10 +311,10 @@ def accept_project_transfer(transfer_id: str, client_user: UserProfile) -> dict:
 
     # Get or create client organization
     client_organization = None
-    existing_membership = OrganizationMember.objects.filter(user=client_user).first()
+    client_org_ids = get_user_access(client_user).org_ids
 
-    if existing_membership:
-        client_organization = existing_membership.organization
+    if client_org_ids:
+        client_organization = Organization.objects.get(id=client_org_ids[0])
     elif hasattr(client_user, 'organization'):
         client_organization = client_user.organization
     else:
@@ -342,6 +340,7 @@ def accept_project_transfer(transfer_id: str, client_user: UserProfile) -> dict:
         project = transfer_invitation.project
         project.organization = client_organization
         project.save()
+        reassign_project_usage(project.id, client_organization.id)
 
         if transfer_invitation.keep_developer:
             ProjectMember.objects.get_or_create(
@@ -410,10 +409,7 @@ def cancel_project_transfer(user: UserProfile, transfer_id: str) -> dict:
     except ProjectTransferInvitation.DoesNotExist:
         raise NotFoundError("Transfer invitation not found or already processed")
 
-    project_member = ProjectMember.objects.filter(
-        project=transfer_invitation.project, user=user, role="admin"
-    ).first()
-    if not project_member:
+    if not get_user_access(user).is_project_admin(transfer_invitation.project_id):
         raise ForbiddenError("You don't have permission to cancel this transfer")
 
     transfer_invitation.status = "declined"
@@ -436,7 +432,7 @@ def get_user_transfer_invitations(user: UserProfile) -> dict:
     ).select_related('project', 'from_organization')
 
     sent_transfers = ProjectTransferInvitation.objects.filter(
-        from_organization__organizationmember__user=user,
+        from_organization_id__in=get_user_access(user).org_ids,
         status__in=["pending", "accepted", "declined"],
     ).select_related('project', 'to_organization')
 
@@ -484,10 +480,8 @@ def transfer_project_to_organization(user: UserProfile, project_id: str, target_
     except Project.DoesNotExist:
         raise NotFoundError("Project not found")
 
-    project_member = ProjectMember.objects.filter(
-        project=project, user=user, role="admin"
-    ).first()
-    if not project_member:
+    access = get_user_access(user)
+    if not access.is_project_admin(project.id):
         raise ForbiddenError("You don't have permission to transfer this project")
 
     try:
@@ -495,7 +489,7 @@ def transfer_project_to_organization(user: UserProfile, project_id: str, target_
     except Organization.DoesNotExist:
         raise NotFoundError("Target organization not found")
 
-    if not OrganizationMember.objects.filter(organization=target_organization, user=user).exists():
+    if not access.is_org_member(target_organization.id):
         raise ForbiddenError("You must be a member of the target organization")
 
     if project.organization.id == target_organization_id:
@@ -504,6 +498,7 @@ def transfer_project_to_organization(user: UserProfile, project_id: str, target_
     with transaction.atomic():
         project.organization = target_organization
         project.save()
+        reassign_project_usage(project.id, target_organization.id)
 
         if not keep_developer:
             ProjectMember.objects.filter(project=project).delete()
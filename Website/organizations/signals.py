@@ -0,0 +1,15 @@
+"""Model signal handlers for the organizations app."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from organizations.helpers.access import invalidate_user_access
+from organizations.models import OrganizationMember
+from projects.models import ProjectMember
+
+
+@receiver([post_save, post_delete], sender=OrganizationMember)
+@receiver([post_save, post_delete], sender=ProjectMember)
+def invalidate_membership_cache(sender, instance, **kwargs):
+    """Drop cached roles for the member whenever a membership row changes."""
+    invalidate_user_access(instance.user_id)
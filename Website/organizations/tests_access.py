@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from organizations.helpers.access import access_scope, get_user_access
+from organizations.models import Organization, OrganizationMember
+from projects.models import Project, ProjectMember
+
+UserProfile = get_user_model()
+
+
+class UserAccessTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserProfile.objects.create_user(
+            username="accessuser", email="access@example.com", password="pass123"
+        )
+        self.org = Organization.objects.create(name="Access Org", email="org@example.com")
+        self.other_org = Organization.objects.create(name="Other Org", email="other@example.com")
+        OrganizationMember.objects.create(user=self.user, organization=self.org, role="admin")
+        self.project = Project.objects.create(name="Access Project", organization=self.org)
+        ProjectMember.objects.create(user=self.user, project=self.project, role="member")
+
+    def test_roles_are_loaded_once_per_request(self):
+        with access_scope():
+            with self.assertNumQueries(2):
+                self.assertTrue(get_user_access(self.user).is_org_admin(self.org.id))
+                self.assertFalse(get_user_access(self.user).is_org_member(self.other_org.id))
+                self.assertTrue(get_user_access(self.user).is_project_member(self.project.id))
+                self.assertFalse(get_user_access(self.user).is_project_admin(self.project.id))
+                self.assertEqual(get_user_access(self.user).org_ids, [self.org.id])
+
+    def test_membership_change_invalidates_request_memo(self):
+        with access_scope():
+            self.assertFalse(get_user_access(self.user).is_org_member(self.other_org.id))
+            OrganizationMember.objects.create(user=self.user, organization=self.other_org, role="member")
+            self.assertTrue(get_user_access(self.user).is_org_member(self.other_org.id))
+
+    def test_no_memo_outside_a_request(self):
+        get_user_access(self.user).org_roles
+        OrganizationMember.objects.filter(user=self.user).update(role="member")
+
+        self.assertFalse(get_user_access(self.user).is_org_admin(self.org.id))
+
+    def test_anonymous_user_has_no_access_and_no_queries(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(get_user_access(AnonymousUser()).is_org_member(self.org.id))
+
+    @override_settings(MEMBERSHIP_CACHE_SECONDS=60)
+    def test_shared_cache_is_invalidated_on_membership_delete(self):
+        get_user_access(self.user).org_roles
+        with self.assertNumQueries(0):
+            self.assertTrue(get_user_access(self.user).is_org_member(self.org.id))
+
+        OrganizationMember.objects.filter(user=self.user, organization=self.org).delete()
+
+        self.assertFalse(get_user_access(self.user).is_org_member(self.org.id))
@@ -1,9 +1,11 @@
+from datetime import timedelta
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
 
-from organizations.models import Organization, OrganizationMember, PendingInvites
+from organizations.models import Organization, OrganizationMember, PendingInvites, ProjectTransferInvitation
 from organizations.services import (
     get_organizations,
     get_organization,
@@ -14,11 +16,13 @@ from organizations.services import (
     leave_organization,
     invite_new_user_to_org,
     remove_pending_invite,
+    transfer_project_to_organization,
+    accept_project_transfer,
     ForbiddenError,
     NotFoundError,
     ServiceError,
 )
-from projects.models import Project
+from projects.models import Project, ProjectMember
 
 UserProfile = get_user_model()
 
@@ -236,3 +240,52 @@ class FreeTierLimitsTest(_OrgTestMixin, TestCase):
         org = self._make_org("Org", admin=user, tier="consumption")
         Project.objects.create(name="P1", organization=org)
         self.assertFalse(org.has_reached_free_project_limit())
+
+
+class TransferProjectTest(_OrgTestMixin, TestCase):
+    def setUp(self):
+        self.admin = self._make_user("admin")
+        self.source = self._make_org("Source", admin=self.admin)
+        self.target = self._make_org("Target")
+        self.project = Project.objects.create(name="P1", organization=self.source)
+        ProjectMember.objects.create(user=self.admin, project=self.project, role="admin")
+
+    def test_requires_target_membership(self):
+        with self.assertRaises(ForbiddenError):
+            transfer_project_to_organization(self.admin, self.project.id, self.target.id)
+
+    def test_membership_added_after_check_is_seen(self):
+        with self.assertRaises(ForbiddenError):
+            transfer_project_to_organization(self.admin, self.project.id, self.target.id)
+        OrganizationMember.objects.create(user=self.admin, organization=self.target, role="member")
+
+        transfer_project_to_organization(self.admin, self.project.id, self.target.id)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.organization_id, self.target.id)
+
+    def test_non_project_admin_cannot_transfer(self):
+        member = self._make_user("member")
+        OrganizationMember.objects.create(user=member, organization=self.source, role="member")
+        OrganizationMember.objects.create(user=member, organization=self.target, role="member")
+        with self.assertRaises(ForbiddenError):
+            transfer_project_to_organization(member, self.project.id, self.target.id)
+
+
+class AcceptProjectTransferTest(_OrgTestMixin, TestCase):
+    @patch("organizations.services.invite_org_member")
+    def test_client_with_several_orgs_receives_project_in_first_membership_org(self, _mock_email):
+        client = self._make_user("client")
+        orgs = [self._make_org(f"Client{i}", admin=client) for i in range(3)]
+        source = self._make_org("Source", admin=self._make_user("owner"))
+        project = Project.objects.create(name="P1", organization=source)
+        transfer = ProjectTransferInvitation.objects.create(
+            project=project, from_organization=source, to_email=client.email, to_name="Client",
+            expires_at=timezone.now() + timedelta(days=7),
+        )
+        expected = OrganizationMember.objects.filter(user=client).order_by("pk").first().organization_id
+
+        accept_project_transfer(transfer.id, client)
+
+        project.refresh_from_db()
+        self.assertEqual(project.organization_id, expected)
+        self.assertIn(expected, [org.id for org in orgs])
@@ -0,0 +1,108 @@
+"""
+Billing engine — prices aggregated metric usage against rate cards.
+
+Rate cards are loaded once per billing run and compiled into ``RatePlan``
+objects (tiers sorted and converted to ``Decimal`` up front), so pricing a
+usage group is pure arithmetic with no queries and no JSON parsing.
+
+Tier semantics match ``InvoiceLineItem.save()``: each tier's ``up_to`` is the
+width of that band, tiers are applied in ascending ``up_to`` order and a
+``null`` ``up_to`` is the open-ended final band.
+"""
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.exceptions import ValidationError
+
+CENT = Decimal("0.01")
+
+
+@dataclass(frozen=True, slots=True)
+class RatePlan:
+    pricing_model: str
+    flat_rate_price: Decimal | None = None
+    price_per_unit: Decimal | None = None
+    tiers: tuple[tuple[Decimal | None, Decimal], ...] = ()
+
+    @classmethod
+    def from_rate_card(cls, rate_card) -> "RatePlan":
+        if rate_card.pricing_model == "per_unit" and rate_card.price_per_unit is None:
+            raise ValidationError("Price per unit must be set for per_unit pricing model")
+        if rate_card.pricing_model == "tiered" and rate_card.tiered_pricing_json is None:
+            raise ValidationError("Tiered pricing JSON must be set for tiered pricing model")
+
+        tiers = sorted(
+            rate_card.tiered_pricing_json or [],
+            key=lambda t: (t["up_to"] is None, t["up_to"] or float("inf")),
+        )
+        return cls(
+            pricing_model=rate_card.pricing_model,
+            flat_rate_price=rate_card.flat_rate_price,
+            price_per_unit=rate_card.price_per_unit,
+            tiers=tuple(
+                (None if t["up_to"] is None else Decimal(str(t["up_to"])), Decimal(str(t["price_per_unit"])))
+                for t in tiers
+            ),
+        )
+
+    def amount(self, units: Decimal) -> Decimal:
+        """Unrounded charge for *units* under this plan."""
+        if self.pricing_model == "flat_rate":
+            return self.flat_rate_price
+        if self.pricing_model == "per_unit":
+            return units * self.price_per_unit
+        if self.pricing_model == "tiered":
+            total = Decimal("0")
+            remaining = units
+            for limit, price in self.tiers:
+                if limit is None or remaining <= limit:
+                    return total + remaining * price
+                total += limit * price
+                remaining -= limit
+            return total
+        return Decimal("0")
+
+
+@dataclass(frozen=True, slots=True)
+class PricedUsage:
+    stack_id: str
+    rate_card: object
+    units_used: Decimal
+    line_amount: Decimal
+
+
+def load_rate_plans() -> dict:
+    """Return ``{metric_definition_id: (rate_card, plan)}`` in a single query.
+
+    When a metric has several rate cards the oldest (lowest id) wins, matching
+    the previous per-group ``RateCard.objects.filter(...).first()`` lookup.
+    """
+    from payments.models import RateCard
+
+    plans = {}
+    for rate_card in RateCard.objects.select_related("metric_definition").order_by("-id"):
+        plans[rate_card.metric_definition_id] = (rate_card, RatePlan.from_rate_card(rate_card))
+    return plans
+
+
+def price_usage(usage_groups, plans: dict) -> tuple[list[PricedUsage], list]:
+    """Price ``{"stack", "metric_definition", "total_used"}`` groups.
+
+    Returns ``(priced, unpriced_metric_ids)``.  Line amounts are rounded to
+    cents here so invoice totals can be summed without another query.
+    """
+    priced, unpriced = [], []
+    for group in usage_groups:
+        match = plans.get(group["metric_definition"])
+        if match is None:
+            unpriced.append(group["metric_definition"])
+            continue
+        rate_card, plan = match
+        units = group["total_used"] or Decimal("0")
+        priced.append(PricedUsage(
+            stack_id=group["stack"],
+            rate_card=rate_card,
+            units_used=units,
+            line_amount=plan.amount(units).quantize(CENT, rounding=ROUND_HALF_UP),
+        ))
+    return priced, unpriced
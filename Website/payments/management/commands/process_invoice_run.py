@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments import services
+
+
+class Command(BaseCommand):
+    help = 'Generate and sync month-end invoices (run monthly, e.g. from cron; safe to re-run)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--month',
+            help='Billing month as YYYY-MM (default: the previous month)'
+        )
+
+    def handle(self, *args, **options):
+        billing_month = None
+        if options['month']:
+            try:
+                billing_month = datetime.strptime(options['month'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--month must look like YYYY-MM')
+
+        # Creates the run on first use, and re-queues failed tasks of a run
+        # that completed with errors.
+        run = services.start_invoice_run(billing_month)
+        if run['status'] == 'completed':
+            self.stdout.write(f"Invoice run {run['run_id']} for {run['billing_month']} is already completed.")
+            return
+
+        run = services.process_invoice_run(run['run_id'])
+        message = f"Invoice run {run['run_id']} for {run['billing_month']}: {run['status']} {run['tasks']}"
+        if run['status'] == 'completed':
+            self.stdout.write(self.style.SUCCESS(message))
+        elif run['status'] == 'completed_with_errors':
+            raise CommandError(message)
+        else:
+            self.stdout.write(message)
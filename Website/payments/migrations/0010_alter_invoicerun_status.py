@@ -0,0 +1,18 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0009_invoicerun_invoiceruntask'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='invoicerun',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('completed_with_errors', 'Completed with errors')], default='pending', max_length=30),
+        ),
+    ]
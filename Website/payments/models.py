@@ -1,10 +1,10 @@
-from decimal import Decimal
 from typing import Iterable
 from django.core.exceptions import ValidationError
 from django.db import models
 from organizations.models import Organization
 from stacks.models import Stack
 from stacks.metrics.models import MetricDefinition
+from payments.billing import RatePlan
 
 
 class RateCard(models.Model):
@@ -97,28 +97,66 @@ class InvoiceLineItem(models.Model):
     
     def save(self, *args, **kwargs):
         if self.rate_card:
-            if self.rate_card.pricing_model == 'flat_rate':
-                self.line_amount = self.rate_card.flat_rate_price
-
-            elif self.rate_card.pricing_model == 'per_unit':
-                if self.rate_card.price_per_unit is None:
-                    raise ValidationError("Price per unit must be set for per_unit pricing model")
-                self.line_amount = self.units_used * self.rate_card.price_per_unit
-                
-            elif self.rate_card.pricing_model == 'tiered':
-                if self.rate_card.tiered_pricing_json is None:
-                    raise ValidationError("Tiered pricing JSON must be set for tiered pricing model")
-                total_units = self.units_used
-                amount = Decimal("0")
-                for tier in sorted(self.rate_card.tiered_pricing_json, key=lambda x: (x['up_to'] is None, x['up_to'] or float('inf'))):
-                    tier_limit = tier['up_to']
-                    tier_price = Decimal(str(tier['price_per_unit']))
-                    if tier_limit is None or total_units <= tier_limit:
-                        amount += total_units * tier_price
-                        break
-                    else:
-                        amount += Decimal(str(tier_limit)) * tier_price
-                        total_units -= tier_limit
-                self.line_amount = amount
+            self.line_amount = RatePlan.from_rate_card(self.rate_card).amount(self.units_used)
 
         return super().save(*args, **kwargs)
+
+
+class InvoiceRun(models.Model):
+    """A month-end invoice generation job, checkpointed per organization.
+
+    ``payments.services.process_invoice_run`` claims the run with a lease and
+    works through its ``InvoiceRunTask`` rows; if the worker dies the lease
+    expires and the next worker resumes from the unfinished tasks.  A run
+    that finished with failed tasks is ``completed_with_errors`` until it is
+    started again, which puts those tasks back to ``pending``.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('completed_with_errors', 'Completed with errors'),
+    ]
+
+    billing_month = models.DateField(unique=True)
+    status = models.CharField(max_length=30, choices=STATUS_CHOICES, default="pending")
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Invoice run {self.billing_month} ({self.status})"
+
+
+class InvoiceRunTask(models.Model):
+    """One organization's progress within an ``InvoiceRun``.
+
+    ``generated`` means the draft invoice is written and only the Stripe sync
+    is outstanding; ``done`` tasks are never touched again.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('generated', 'Generated'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    run = models.ForeignKey(InvoiceRun, on_delete=models.CASCADE, related_name="tasks")
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="invoice_run_tasks")
+    invoice = models.ForeignKey(Invoice, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(default="", blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("run", "organization")
+        indexes = [
+            models.Index(fields=["run", "status"], name="payments_runtask_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.run} - {self.organization_id} ({self.status})"
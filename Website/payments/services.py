@@ -7,17 +7,22 @@ Never imports Response, JsonResponse, or HttpResponse.
 import logging
 import random
 import calendar
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, timedelta
 from decimal import Decimal
 
 import stripe
 from django.conf import settings
-from django.db import transaction
-from django.db.models import Sum
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from organizations.models import Organization
-from payments.models import Invoice, InvoiceLineItem, RateCard
+from payments import billing
+from payments.models import Invoice, InvoiceLineItem, InvoiceRun, InvoiceRunTask
 
 logger = logging.getLogger(__name__)
 
@@ -156,34 +161,37 @@ def create_invoice(customer_id: str, dollar_amount: float, description: str, ide
 # ── Usage Data ───────────────────────────────────────────────────────────────
 
 def get_usage_data(organization: Organization) -> dict:
-    """Calculate usage statistics for an organization."""
-    from stacks.models import Stack
-    from stacks.metrics.models import MetricUsageRecord
+    """Calculate usage statistics for an organization.
+
+    Reads the ``DailyMetricUsage`` rollup, so the cost does not grow with the
+    number of raw usage records.
+    """
+    from stacks.metrics.models import DailyMetricUsage
 
     now = timezone.now()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    today = timezone.localdate(now)
+    month_start = today.replace(day=1)
     days_in_month = calendar.monthrange(now.year, now.month)[1]
     days_elapsed = now.day
 
-    org_stacks = Stack.objects.filter(project__organization=organization)
-
-    daily_agg = MetricUsageRecord.objects.filter(
-        stack__in=org_stacks, usage_datetime__gte=today_start,
-    ).aggregate(total=Sum("amount_used"))
-    current_daily_usage = daily_agg["total"] or Decimal("0.00")
-
-    month_agg = MetricUsageRecord.objects.filter(
-        stack__in=org_stacks, usage_datetime__gte=month_start,
-    ).aggregate(total=Sum("amount_used"))
-    current_usage = month_agg["total"] or Decimal("0.00")
+    totals = DailyMetricUsage.objects.filter(
+        organization=organization, usage_date__gte=month_start,
+    ).aggregate(
+        month=Sum("amount_used"),
+        today=Sum("amount_used", filter=Q(usage_date__gte=today)),
+    )
+    current_daily_usage = totals["today"] or Decimal("0.00")
+    current_usage = totals["month"] or Decimal("0.00")
 
     projected = (current_usage / days_elapsed) * days_in_month if days_elapsed > 0 else Decimal("0.00")
 
     draft_invoice = Invoice.objects.filter(
-        organization=organization, invoice_month=month_start.date(), status="draft",
+        organization=organization, invoice_month=month_start, status="draft",
     ).first()
-    actual_monthly_cost = draft_invoice.total_amount if draft_invoice else Decimal("0.00")
+    if draft_invoice:
+        actual_monthly_cost = draft_invoice.total_amount
+    else:
+        actual_monthly_cost = month_to_date_costs([organization.id]).get(organization.id, Decimal("0.00"))
 
     return {
         "current_daily_usage": f"{current_daily_usage:.2f}",
@@ -214,127 +222,145 @@ def get_billing_history(organization: Organization) -> list[dict]:
 
 # ── Monthly Invoice Generation ───────────────────────────────────────────────
 
+def _previous_month() -> date:
+    first_of_current = date.today().replace(day=1)
+    return (first_of_current - timedelta(days=1)).replace(day=1)
+
+
+def _usage_by_org(month_start: date, organization_ids=None) -> dict:
+    """Return ``{organization_id: [usage group, ...]}`` for the month in one query.
+
+    Groups come from the ``DailyMetricUsage`` rollup and carry ``stack``,
+    ``metric_definition`` and ``total_used``.
+    """
+    from stacks.metrics.models import DailyMetricUsage
+
+    days_in_month = calendar.monthrange(month_start.year, month_start.month)[1]
+    month_end = month_start.replace(day=days_in_month)
+
+    usage = DailyMetricUsage.objects.filter(usage_date__gte=month_start, usage_date__lte=month_end)
+    if organization_ids is not None:
+        usage = usage.filter(organization_id__in=organization_ids)
+
+    usage_by_org = defaultdict(list)
+    for group in (
+        usage.values("organization", "stack", "metric_definition")
+        .annotate(total_used=Sum("amount_used"))
+        .order_by()
+    ):
+        usage_by_org[group["organization"]].append(group)
+    return usage_by_org
+
+
+def month_to_date_costs(organization_ids=None, month_start: date = None) -> dict:
+    """Return ``{organization_id: Decimal}`` — usage so far this month, priced.
+
+    Priced exactly as the month's invoice will be.  Organizations without
+    usage are omitted.
+    """
+    month_start = month_start or timezone.localdate().replace(day=1)
+    plans = billing.load_rate_plans()
+    return {
+        org_id: sum((p.line_amount for p in billing.price_usage(groups, plans)[0]), Decimal("0.00"))
+        for org_id, groups in _usage_by_org(month_start, organization_ids).items()
+    }
+
+
+def _write_org_invoice(org: Organization, month_start: date, usage_groups, plans: dict) -> tuple[Invoice, int]:
+    """Price *usage_groups* and replace *org*'s draft invoice for the month.
+
+    Returns ``(invoice, line_item_count)``.
+    """
+    priced, unpriced = billing.price_usage(usage_groups, plans)
+    for metric_def_id in unpriced:
+        logger.warning(
+            "No RateCard for metric_definition_id=%s (org=%s). Skipping.",
+            metric_def_id,
+            org.name,
+        )
+
+    subtotal = sum((p.line_amount for p in priced), Decimal("0.00"))
+    tax_amount = Decimal("0.00")
+
+    with transaction.atomic():
+        # Get or create a draft invoice for this org + month
+        invoice, created = Invoice.objects.update_or_create(
+            organization=org,
+            invoice_month=month_start,
+            defaults={
+                "status": "draft",
+                "subtotal_amount": subtotal,
+                "tax_amount": tax_amount,
+                "total_amount": subtotal + tax_amount,
+            },
+        )
+
+        # Replace existing line items so re-runs are idempotent
+        invoice.line_items.all().delete()
+        InvoiceLineItem.objects.bulk_create([
+            InvoiceLineItem(
+                invoice=invoice,
+                stack_id=p.stack_id,
+                rate_card=p.rate_card,
+                description=f"{p.rate_card.metric_definition.name} usage",
+                units_used=p.units_used,
+                line_amount=p.line_amount,
+            )
+            for p in priced
+        ])
+
+    return invoice, len(priced)
+
+
+def _needs_stripe_sync(org: Organization, invoice: Invoice) -> bool:
+    return bool(org.stripe_customer_id) and invoice.total_amount > 0 and not invoice.stripe_invoice_id
+
+
+def _stripe_invoice_description(month_start: date) -> str:
+    return f"Deploy Box - {month_start.strftime('%B %Y')} usage"
+
+
+def _record_stripe_invoice(invoice: Invoice, stripe_invoice_id: str) -> None:
+    invoice.stripe_invoice_id = stripe_invoice_id
+    invoice.stripe_last_sync_date = timezone.now()
+    invoice.save(update_fields=["stripe_invoice_id", "stripe_last_sync_date"])
+
+
 def generate_monthly_invoices(billing_month: date = None) -> list[dict]:
     """Generate draft invoices for all organizations for the given month.
 
+    Runs synchronously in the calling thread; month-end billing goes through
+    ``start_invoice_run`` instead.
+
     Args:
         billing_month: First day of the month to bill. Defaults to previous month.
 
     Returns:
         List of dicts with invoice generation results per organization.
     """
-    from stacks.models import Stack
-    from stacks.metrics.models import MetricUsageRecord
-
-    if billing_month is None:
-        today = date.today()
-        first_of_current = today.replace(day=1)
-        billing_month = (first_of_current - timedelta(days=1)).replace(day=1)
-
-    month_start = billing_month
-    days_in_month = calendar.monthrange(billing_month.year, billing_month.month)[1]
-    month_end = billing_month.replace(day=days_in_month)
-
-    # Find organizations with usage in this billing period
-    org_ids = (
-        MetricUsageRecord.objects.filter(
-            usage_datetime__date__gte=month_start,
-            usage_datetime__date__lte=month_end,
-        )
-        .values_list("stack__project__organization", flat=True)
-        .distinct()
-    )
-    organizations = Organization.objects.filter(id__in=org_ids)
+    month_start = billing_month or _previous_month()
+
+    usage_by_org = _usage_by_org(month_start)
+    plans = billing.load_rate_plans()
+    organizations = Organization.objects.filter(id__in=list(usage_by_org))
 
     results = []
     for org in organizations:
         result = {"organization": org.name, "organization_id": str(org.id)}
         try:
-            with transaction.atomic():
-                # Get or create a draft invoice for this org + month
-                invoice, created = Invoice.objects.update_or_create(
-                    organization=org,
-                    invoice_month=month_start,
-                    defaults={
-                        "status": "draft",
-                        "subtotal_amount": Decimal("0.00"),
-                        "tax_amount": Decimal("0.00"),
-                        "total_amount": Decimal("0.00"),
-                    },
-                )
-
-                # Delete existing line items so re-runs are idempotent
-                invoice.line_items.all().delete()
-
-                # Get all stacks belonging to this org
-                org_stacks = Stack.objects.filter(project__organization=org)
-
-                # Query usage records within the billing period grouped by stack + metric
-                usage_groups = (
-                    MetricUsageRecord.objects.filter(
-                        stack__in=org_stacks,
-                        usage_datetime__date__gte=month_start,
-                        usage_datetime__date__lte=month_end,
-                    )
-                    .values("stack", "metric_definition")
-                    .annotate(total_used=Sum("amount_used"))
-                )
-
-                line_items_created = 0
-                for group in usage_groups:
-                    stack_id = group["stack"]
-                    metric_def_id = group["metric_definition"]
-                    total_used = group["total_used"] or Decimal("0")
-
-                    # Find matching rate card
-                    rate_card = RateCard.objects.filter(
-                        metric_definition_id=metric_def_id
-                    ).first()
-                    if not rate_card:
-                        logger.warning(
-                            "No RateCard for metric_definition_id=%s (org=%s). Skipping.",
-                            metric_def_id,
-                            org.name,
-                        )
-                        continue
-
-                    InvoiceLineItem.objects.create(
-                        invoice=invoice,
-                        stack_id=stack_id,
-                        rate_card=rate_card,
-                        description=f"{rate_card.metric_definition.name} usage",
-                        units_used=total_used,
-                        line_amount=Decimal("0"),  # save() auto-calculates from rate_card
-                    )
-                    line_items_created += 1
-
-                # Sum line items to compute totals
-                subtotal = (
-                    invoice.line_items.aggregate(total=Sum("line_amount"))["total"]
-                    or Decimal("0.00")
-                )
-                tax_amount = Decimal("0.00")
-                total_amount = subtotal + tax_amount
-
-                invoice.subtotal_amount = subtotal
-                invoice.tax_amount = tax_amount
-                invoice.total_amount = total_amount
-                invoice.save()
+            invoice, line_items_created = _write_org_invoice(org, month_start, usage_by_org[org.id], plans)
 
             # Stripe sync (outside the atomic block to avoid holding the txn)
-            if org.stripe_customer_id and total_amount > 0:
+            if _needs_stripe_sync(org, invoice):
                 try:
-                    description = f"Deploy Box - {billing_month.strftime('%B %Y')} usage"
                     stripe_result = create_invoice(
                         org.stripe_customer_id,
-                        float(total_amount),
-                        description,
+                        float(invoice.total_amount),
+                        _stripe_invoice_description(month_start),
                     )
                     if stripe_result:
                         stripe_invoice_id, _ = stripe_result
-                        invoice.stripe_invoice_id = stripe_invoice_id
-                        invoice.stripe_last_sync_date = timezone.now()
-                        invoice.save(update_fields=["stripe_invoice_id", "stripe_last_sync_date"])
+                        _record_stripe_invoice(invoice, stripe_invoice_id)
                         result["stripe_invoice_id"] = stripe_invoice_id
                 except Exception as e:
                     logger.error("Stripe sync failed for org %s: %s", org.name, e)
@@ -343,7 +369,7 @@ def generate_monthly_invoices(billing_month: date = None) -> list[dict]:
             result["status"] = "success"
             result["invoice_id"] = invoice.id
             result["line_items"] = line_items_created
-            result["total_amount"] = str(total_amount)
+            result["total_amount"] = str(invoice.total_amount)
 
         except Exception as e:
             logger.error("Invoice generation failed for org %s: %s", org.name, e)
@@ -355,6 +381,246 @@ def generate_monthly_invoices(billing_month: date = None) -> list[dict]:
     return results
 
 
+# ── Invoice Runs ─────────────────────────────────────────────────────────────
+#
+# Month-end billing as a resumable job.  An InvoiceRun has one InvoiceRunTask
+# per organization with usage.  Invoices are written by a small pool of DB
+# threads (each task is its own transaction); Stripe calls then go through a
+# separate bounded pool, keyed per run and organization so a retried call
+# can never bill twice.  Every task transition is persisted, so a run whose
+# worker died is resumed (not restarted) once its lease expires.
+#
+# The work itself is done by ``manage.py process_invoice_run``; the HTTP
+# endpoint only creates the run and reports its progress.
+
+INVOICE_RUN_LEASE_SECONDS = 300
+INVOICE_RUN_CHUNK_SIZE = 100
+INVOICE_RUN_MAX_ATTEMPTS = 3
+
+
+def _run_in_threads(fn, items: list, workers: int) -> None:
+    """Call *fn* on every item using up to *workers* threads.
+
+    *fn* must handle its own errors.  Each worker closes its database
+    connection on exit, since Django opens one per thread.
+    """
+    if workers <= 1 or len(items) <= 1:
+        for item in items:
+            fn(item)
+        return
+
+    queue = deque(items)
+
+    def worker():
+        try:
+            while True:
+                try:
+                    item = queue.popleft()
+                except IndexError:
+                    return
+                fn(item)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(workers, len(items)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _claim_invoice_run(run_id: int) -> bool:
+    """Take the run's lease if it is new or its previous worker has gone away."""
+    now = timezone.now()
+    return bool(
+        InvoiceRun.objects.filter(pk=run_id)
+        .filter(Q(status="pending") | Q(status="running", lease_expires_at__lt=now))
+        .update(
+            status="running",
+            lease_expires_at=now + timedelta(seconds=INVOICE_RUN_LEASE_SECONDS),
+            started_at=Coalesce("started_at", Value(now)),
+        )
+    )
+
+
+def _renew_invoice_run_lease(run_id: int) -> None:
+    InvoiceRun.objects.filter(pk=run_id, status="running").update(
+        lease_expires_at=timezone.now() + timedelta(seconds=INVOICE_RUN_LEASE_SECONDS),
+    )
+
+
+def _fail_task_attempt(task: InvoiceRunTask, error: str) -> None:
+    """Record a failed attempt; give up once ``INVOICE_RUN_MAX_ATTEMPTS`` is reached."""
+    task.attempts += 1
+    task.last_error = error
+    if task.attempts >= INVOICE_RUN_MAX_ATTEMPTS:
+        task.status = "failed"
+    task.save(update_fields=["status", "attempts", "last_error", "updated_at"])
+
+
+def _generate_run_invoices(run: InvoiceRun, plans: dict, workers: int) -> None:
+    """Write draft invoices for every pending task, one chunk at a time."""
+    while True:
+        tasks = list(
+            run.tasks.filter(status="pending").select_related("organization")
+            .order_by("id")[:INVOICE_RUN_CHUNK_SIZE]
+        )
+        if not tasks:
+            return
+        usage_by_org = _usage_by_org(run.billing_month, [t.organization_id for t in tasks])
+
+        def generate(task):
+            try:
+                invoice, _ = _write_org_invoice(
+                    task.organization, run.billing_month, usage_by_org.get(task.organization_id, []), plans,
+                )
+            except Exception as e:
+                logger.error("Invoice generation failed for org %s: %s", task.organization.name, e)
+                _fail_task_attempt(task, str(e))
+                return
+            task.invoice = invoice
+            task.status = "generated" if _needs_stripe_sync(task.organization, invoice) else "done"
+            task.attempts = 0
+            task.last_error = ""
+            task.save(update_fields=["invoice", "status", "attempts", "last_error", "updated_at"])
+
+        _run_in_threads(generate, tasks, workers)
+        _renew_invoice_run_lease(run.pk)
+
+
+def _sync_run_invoices(run: InvoiceRun, workers: int) -> None:
+    """Push generated invoices to Stripe through a bounded thread pool.
+
+    Only the Stripe calls run in the pool; results are recorded from this
+    thread.
+    """
+    description = _stripe_invoice_description(run.billing_month)
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        while True:
+            tasks = list(
+                run.tasks.filter(status="generated").select_related("organization", "invoice")
+                .order_by("id")[:INVOICE_RUN_CHUNK_SIZE]
+            )
+            if not tasks:
+                return
+
+            futures = {
+                pool.submit(
+                    create_invoice,
+                    task.organization.stripe_customer_id,
+                    float(task.invoice.total_amount),
+                    description,
+                    idempotency_key=f"invoice-run-{run.pk}-{task.organization_id}",
+                ): task
+                for task in tasks
+            }
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    stripe_result = future.result()
+                except Exception as e:
+                    stripe_result, error = None, str(e)
+                else:
+                    error = "Stripe invoice creation failed."
+                if not stripe_result:
+                    logger.error("Stripe sync failed for org %s: %s", task.organization.name, error)
+                    _fail_task_attempt(task, error)
+                    continue
+                _record_stripe_invoice(task.invoice, stripe_result[0])
+                task.status = "done"
+                task.save(update_fields=["status", "updated_at"])
+
+            _renew_invoice_run_lease(run.pk)
+
+
+def get_invoice_run_status(run_id: int) -> dict:
+    """Return the run's state and a count of its tasks per status."""
+    run = InvoiceRun.objects.filter(pk=run_id).first()
+    if run is None:
+        raise NotFoundError("Invoice run not found.")
+
+    counts = dict(run.tasks.values_list("status").annotate(n=Count("id")).order_by())
+    tasks = {status: counts.get(status, 0) for status, _ in InvoiceRunTask.STATUS_CHOICES}
+    return {
+        "run_id": run.pk,
+        "billing_month": run.billing_month.isoformat(),
+        "status": run.status,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "completed_at": run.completed_at.isoformat() if run.completed_at else None,
+        "tasks": tasks,
+        "total": sum(tasks.values()),
+    }
+
+
+def process_invoice_run(run_id: int, db_workers: int | None = None, stripe_workers: int | None = None) -> dict:
+    """Work through an invoice run until every task is done or has failed.
+
+    Returns immediately with the current status if another worker holds the
+    run's lease.
+    """
+    if not _claim_invoice_run(run_id):
+        return get_invoice_run_status(run_id)
+
+    if db_workers is None:
+        db_workers = getattr(settings, "INVOICE_RUN_DB_WORKERS", 4)
+    if stripe_workers is None:
+        stripe_workers = getattr(settings, "INVOICE_RUN_STRIPE_WORKERS", 8)
+
+    run = InvoiceRun.objects.get(pk=run_id)
+    _generate_run_invoices(run, billing.load_rate_plans(), db_workers)
+    _sync_run_invoices(run, stripe_workers)
+
+    failed = run.tasks.filter(status="failed").count()
+    InvoiceRun.objects.filter(pk=run_id).update(
+        status="completed_with_errors" if failed else "completed",
+        completed_at=timezone.now(),
+        lease_expires_at=None,
+    )
+    if failed:
+        logger.warning(
+            "Invoice run %s for %s completed with %s failed task(s); start it again to retry them",
+            run_id, run.billing_month, failed,
+        )
+    else:
+        logger.info("Invoice run %s for %s completed", run_id, run.billing_month)
+    return get_invoice_run_status(run_id)
+
+
+def start_invoice_run(billing_month: date = None) -> dict:
+    """Create the invoice run for *billing_month* and report its progress.
+
+    The first call creates one task per organization with usage that month.
+    Later calls are idempotent, except that a ``completed_with_errors`` run
+    has its failed tasks reset to ``pending`` (with a fresh attempt budget)
+    so the next ``process_invoice_run`` retries them.  No invoices are
+    generated here.
+    """
+    month_start = billing_month or _previous_month()
+
+    with transaction.atomic():
+        run, created = InvoiceRun.objects.select_for_update().get_or_create(billing_month=month_start)
+        if created:
+            InvoiceRunTask.objects.bulk_create(
+                [
+                    InvoiceRunTask(run=run, organization_id=org_id)
+                    for org_id in _usage_by_org(month_start)
+                ],
+                ignore_conflicts=True,
+            )
+        elif run.status == "completed_with_errors":
+            # Tasks that failed during Stripe sync keep their draft invoice and
+            # only need the sync retried.
+            run.tasks.filter(status="failed", invoice__isnull=False).update(
+                status="generated", attempts=0, updated_at=timezone.now(),
+            )
+            run.tasks.filter(status="failed").update(status="pending", attempts=0, updated_at=timezone.now())
+            run.status = "pending"
+            run.completed_at = None
+            run.save(update_fields=["status", "completed_at"])
+
+    return get_invoice_run_status(run.pk)
+
+
 # ── Webhook Helpers ──────────────────────────────────────────────────────────
 
 STACK_NAME_ADJECTIVES = [
@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from payments.billing import RatePlan, load_rate_plans, price_usage
+from payments.models import RateCard
+from payments.tests.test_models import _PaymentsTestMixin
+
+
+TIERS = [
+    {"up_to": None, "price_per_unit": 0.05},
+    {"up_to": 500, "price_per_unit": 0.08},
+    {"up_to": 100, "price_per_unit": 0.10},
+]
+
+
+class RatePlanTest(_PaymentsTestMixin, TestCase):
+    def test_tiers_are_sorted_and_applied_as_bands(self):
+        plan = RatePlan.from_rate_card(RateCard(pricing_model="tiered", tiered_pricing_json=TIERS))
+
+        self.assertEqual(plan.amount(Decimal("50")), Decimal("5.00"))
+        self.assertEqual(plan.amount(Decimal("250")), Decimal("22.00"))
+        self.assertEqual(plan.amount(Decimal("700")), Decimal("55.00"))
+
+    def test_flat_and_per_unit(self):
+        flat = RatePlan.from_rate_card(RateCard(pricing_model="flat_rate", flat_rate_price=Decimal("9.99")))
+        per_unit = RatePlan.from_rate_card(RateCard(pricing_model="per_unit", price_per_unit=Decimal("0.125")))
+
+        self.assertEqual(flat.amount(Decimal("1000")), Decimal("9.99"))
+        self.assertEqual(per_unit.amount(Decimal("3")), Decimal("0.375"))
+
+    def test_price_usage_rounds_to_cents_and_reports_unpriced(self):
+        metric = self._make_metric("requests")
+        other = self._make_metric("egress")
+        RateCard.objects.create(metric_definition=metric, pricing_model="per_unit", price_per_unit=Decimal("0.125"))
+
+        with self.assertNumQueries(1):
+            plans = load_rate_plans()
+        priced, unpriced = price_usage(
+            [
+                {"stack": "stk_1", "metric_definition": metric.id, "total_used": Decimal("3")},
+                {"stack": "stk_1", "metric_definition": other.id, "total_used": Decimal("3")},
+            ],
+            plans,
+        )
+
+        self.assertEqual([p.line_amount for p in priced], [Decimal("0.38")])
+        self.assertEqual(unpriced, [other.id])
+
+    def test_oldest_rate_card_wins(self):
+        metric = self._make_metric()
+        first = RateCard.objects.create(metric_definition=metric, pricing_model="per_unit", price_per_unit=Decimal("1"))
+        RateCard.objects.create(metric_definition=metric, pricing_model="per_unit", price_per_unit=Decimal("2"))
+
+        self.assertEqual(load_rate_plans()[metric.id][0], first)
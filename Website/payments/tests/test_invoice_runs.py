@@ -0,0 +1,166 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.middleware import WorkOSSessionMiddleware
+from organizations.models import Organization
+from payments import services
+from payments.models import Invoice, InvoiceRun, InvoiceRunTask, RateCard
+from payments.tests.test_models import _PaymentsTestMixin
+from projects.models import Project
+from stacks.metrics.models import MetricUsageRecord
+from stacks.models import Stack
+
+MARCH = date(2025, 3, 1)
+
+
+class InvoiceRunTestCase(_PaymentsTestMixin, TestCase):
+    def setUp(self):
+        self.org, _, self.stack = self._make_org_project_stack()
+        self.metric = self._make_metric()
+        RateCard.objects.create(metric_definition=self.metric, pricing_model="per_unit", price_per_unit=Decimal("2"))
+        self.orgs = [self.org]
+        for i in range(2):
+            org = Organization.objects.create(name=f"Org {i}", email=f"o{i}@t.com", stripe_customer_id=f"cus_{i}")
+            Stack.objects.create(
+                name=f"S{i}", project=Project.objects.create(name=f"P{i}", organization=org),
+                purchased_stack=self.stack.purchased_stack,
+            )
+            self.orgs.append(org)
+        for stack in Stack.objects.all():
+            MetricUsageRecord.objects.create(
+                metric_definition=self.metric, stack=stack, resource="r", amount_used=Decimal("5"),
+                usage_datetime=timezone.make_aware(timezone.datetime(2025, 3, 10, 12, 0)),
+            )
+
+    def _process(self):
+        return services.process_invoice_run(services.start_invoice_run(MARCH)["run_id"])
+
+    @patch("payments.services._write_org_invoice")
+    def test_start_only_creates_tasks(self, mock_write):
+        status = services.start_invoice_run(MARCH)
+
+        self.assertEqual(status["status"], "pending")
+        self.assertEqual(status["tasks"]["pending"], 3)
+        mock_write.assert_not_called()
+
+    @patch("payments.services.create_invoice")
+    def test_run_bills_every_org_once_with_idempotency_keys(self, mock_create_invoice):
+        mock_create_invoice.side_effect = lambda customer, amount, desc, idempotency_key: (f"in_{customer}", "")
+
+        status = self._process()
+
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["tasks"]["done"], 3)
+        self.assertEqual(Invoice.objects.filter(invoice_month=MARCH, total_amount=Decimal("10.00")).count(), 3)
+        keys = {call.kwargs["idempotency_key"] for call in mock_create_invoice.call_args_list}
+        run_id = status["run_id"]
+        self.assertEqual(keys, {f"invoice-run-{run_id}-{org.id}" for org in self.orgs})
+        self.assertEqual(Invoice.objects.get(organization=self.orgs[1]).stripe_invoice_id, "in_cus_0")
+
+        # Processing a completed run again does no work.
+        self.assertEqual(self._process()["status"], "completed")
+        self.assertEqual(mock_create_invoice.call_count, 3)
+
+    @patch("payments.services.create_invoice")
+    def test_crashed_run_resumes_from_checkpoint(self, mock_create_invoice):
+        mock_create_invoice.return_value = ("in_x", "")
+        with patch("payments.services._sync_run_invoices", side_effect=RuntimeError("worker died")):
+            with self.assertRaises(RuntimeError):
+                self._process()
+
+        run = InvoiceRun.objects.get(billing_month=MARCH)
+        self.assertEqual(run.status, "running")
+        self.assertEqual(run.tasks.filter(status="generated").count(), 3)
+
+        # A live lease keeps other workers out.
+        self.assertEqual(self._process()["status"], "running")
+        mock_create_invoice.assert_not_called()
+
+        InvoiceRun.objects.filter(pk=run.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        with patch("payments.services._write_org_invoice") as mock_write:
+            status = self._process()
+
+        mock_write.assert_not_called()
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["tasks"]["done"], 3)
+        self.assertEqual(mock_create_invoice.call_count, 3)
+
+    @patch("payments.services.create_invoice", return_value=None)
+    def test_stripe_failures_are_retried_then_marked_failed(self, mock_create_invoice):
+        status = self._process()
+
+        self.assertEqual(status["status"], "completed_with_errors")
+        self.assertEqual(status["tasks"]["failed"], 3)
+        self.assertEqual(mock_create_invoice.call_count, 3 * services.INVOICE_RUN_MAX_ATTEMPTS)
+        task = InvoiceRunTask.objects.first()
+        self.assertEqual(task.attempts, services.INVOICE_RUN_MAX_ATTEMPTS)
+        self.assertTrue(task.last_error)
+        # The draft invoice is kept even though the Stripe sync gave up.
+        self.assertIsNotNone(task.invoice_id)
+
+    @patch("payments.services.create_invoice")
+    def test_failed_tasks_are_retried_when_run_is_started_again(self, mock_create_invoice):
+        mock_create_invoice.return_value = None
+        with patch("payments.services._write_org_invoice", side_effect=RuntimeError("db down")):
+            self.assertEqual(self._process()["status"], "completed_with_errors")
+        run = InvoiceRun.objects.get(billing_month=MARCH)
+        self.assertEqual(run.tasks.filter(status="failed", invoice__isnull=True).count(), 3)
+
+        # Generation now works but Stripe still fails: drafts are kept.
+        self.assertEqual(self._process()["tasks"]["failed"], 3)
+        self.assertEqual(run.tasks.filter(invoice__isnull=False).count(), 3)
+
+        mock_create_invoice.reset_mock()
+        mock_create_invoice.return_value = ("in_x", "")
+        with patch("payments.services._write_org_invoice") as mock_write:
+            status = self._process()
+
+        mock_write.assert_not_called()
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["tasks"]["done"], 3)
+        self.assertEqual(mock_create_invoice.call_count, 3)
+
+    @patch("payments.services.create_invoice", return_value=("in_x", ""))
+    def test_process_invoice_run_command(self, _mock_create_invoice):
+        out = StringIO()
+        call_command("process_invoice_run", "--month", "2025-03", stdout=out)
+
+        self.assertIn("completed", out.getvalue())
+        self.assertEqual(InvoiceRun.objects.get(billing_month=MARCH).status, "completed")
+        with self.assertRaises(CommandError):
+            call_command("process_invoice_run", "--month", "March", stdout=StringIO())
+
+    def _login(self, is_staff):
+        user = get_user_model().objects.create_user(
+            username="cron" if is_staff else "someone", email="cron@t.com" if is_staff else "someone@t.com",
+            password="pw", is_staff=is_staff,
+        )
+        session = self.client.session
+        session[WorkOSSessionMiddleware.SESSION_KEY] = str(user.pk)
+        session.save()
+
+    def test_status_endpoint_requires_staff(self):
+        run = InvoiceRun.objects.create(billing_month=MARCH)
+        url = f"/api/v1/payments/invoice-runs/{run.pk}/"
+
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self._login(is_staff=False)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_status_endpoint(self):
+        run = InvoiceRun.objects.create(billing_month=MARCH)
+        InvoiceRunTask.objects.create(run=run, organization=self.org)
+        self._login(is_staff=True)
+
+        response = self.client.get(f"/api/v1/payments/invoice-runs/{run.pk}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["tasks"]["pending"], 1)
+        self.assertEqual(self.client.get("/api/v1/payments/invoice-runs/999/").status_code, 404)
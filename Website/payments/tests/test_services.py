@@ -128,3 +128,68 @@ class GenerateMonthlyInvoicesTestCase(_PaymentsTestMixin, TestCase):
         results = generate_monthly_invoices(billing_month=date(2025, 3, 1))
 
         mock_create_invoice.assert_not_called()
+
+    @patch('payments.services.create_invoice')
+    def test_mixed_pricing_models_across_orgs(self, mock_create_invoice):
+        """Flat and tiered cards price correctly and each org gets its own invoice."""
+        mock_create_invoice.return_value = None
+        storage = self._make_metric("storage_gb")
+        RateCard.objects.create(
+            metric_definition=storage, pricing_model="tiered",
+            tiered_pricing_json=[{"up_to": 100, "price_per_unit": 0.10}, {"up_to": None, "price_per_unit": 0.05}],
+        )
+        support = self._make_metric("support")
+        RateCard.objects.create(metric_definition=support, pricing_model="flat_rate", flat_rate_price=Decimal("15.00"))
+        other_org = Organization.objects.create(name="Other", email="x@t.com")
+        other_stack = Stack.objects.create(
+            name="S2", project=Project.objects.create(name="P2", organization=other_org),
+            purchased_stack=self.stack.purchased_stack,
+        )
+        for metric, stack, amount in [
+            (storage, self.stack, "250"), (support, self.stack, "1"), (storage, other_stack, "50"),
+        ]:
+            MetricUsageRecord.objects.create(
+                metric_definition=metric, stack=stack, resource="r",
+                amount_used=Decimal(amount),
+                usage_datetime=timezone.make_aware(timezone.datetime(2025, 3, 2, 12, 0)),
+            )
+
+        results = generate_monthly_invoices(billing_month=date(2025, 3, 1))
+
+        self.assertEqual({r["status"] for r in results}, {"success"})
+        invoice = Invoice.objects.get(organization=self.org, invoice_month=date(2025, 3, 1))
+        # cpu 20.00 + storage (100 × 0.10 + 150 × 0.05 = 17.50) + support 15.00
+        self.assertEqual(invoice.total_amount, Decimal("52.50"))
+        self.assertEqual(invoice.line_items.count(), 3)
+        other = Invoice.objects.get(organization=other_org, invoice_month=date(2025, 3, 1))
+        self.assertEqual(other.total_amount, Decimal("5.00"))
+
+    @patch('payments.services.create_invoice')
+    def test_query_count_does_not_grow_with_line_items(self, mock_create_invoice):
+        """Rate cards are loaded once and line items are written in one insert."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.org.stripe_customer_id = ""
+        self.org.save()
+
+        def add_metrics(count):
+            for _ in range(count):
+                metric = self._make_metric(f"metric_{MetricDefinition.objects.count()}")
+                RateCard.objects.create(metric_definition=metric, pricing_model="per_unit", price_per_unit=Decimal("1"))
+                MetricUsageRecord.objects.create(
+                    metric_definition=metric, stack=self.stack, resource="r", amount_used=Decimal("1"),
+                    usage_datetime=timezone.make_aware(timezone.datetime(2025, 3, 3, 12, 0)),
+                )
+
+        add_metrics(1)
+        with CaptureQueriesContext(connection) as baseline:
+            generate_monthly_invoices(billing_month=date(2025, 3, 1))
+
+        add_metrics(10)
+        with CaptureQueriesContext(connection) as queries:
+            results = generate_monthly_invoices(billing_month=date(2025, 3, 1))
+
+        self.assertEqual(results[0]["line_items"], 12)
+        # The re-run updates rather than inserts the invoice; otherwise identical.
+        self.assertLessEqual(len(queries), len(baseline))
@@ -260,12 +260,14 @@ class DeletePaymentMethodTestCase(TestCase):
 
 class UpdateBillingHistoryEndpointTestCase(TestCase):
     @patch('payments.views.payment_services')
-    def test_post_triggers_invoice_generation(self, mock_services):
-        """POST to update_billing_history should call generate_monthly_invoices."""
-        mock_services.generate_monthly_invoices.return_value = [{"status": "success"}]
+    def test_post_starts_invoice_run(self, mock_services):
+        """POST to update_billing_history should start the invoice run and return at once."""
+        mock_services.start_invoice_run.return_value = {"run_id": 1, "status": "running"}
         response = self.client.post("/api/v1/payments/update_billing_history/")
-        self.assertEqual(response.status_code, 200)
-        mock_services.generate_monthly_invoices.assert_called_once()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["run_id"], 1)
+        mock_services.start_invoice_run.assert_called_once()
+        mock_services.generate_monthly_invoices.assert_not_called()
 
     def test_get_returns_405(self):
         """GET to update_billing_history should return 405."""
@@ -14,4 +14,5 @@ urlpatterns = [
     path("usage/<str:org_id>/", views.get_usage_data, name="get_usage_data"),
     path("billing-history/<str:org_id>/", views.get_billing_history, name="get_billing_history"),
     path("update_billing_history/", views.update_billing_history, name="update_billing_history"),
+    path("invoice-runs/<int:run_id>/", views.invoice_run_status, name="invoice_run_status"),
 ]
@@ -584,15 +584,40 @@ def get_billing_history(request: HttpRequest, org_id: str) -> JsonResponse:
 
 @csrf_exempt  # Called by crontainer (machine-to-machine)
 def update_billing_history(request: HttpRequest) -> JsonResponse:
-    """Trigger monthly invoice generation. Called by crontainer cron job."""
+    """Create the month-end invoice run and report its progress. Called by crontainer cron job.
+
+    Invoices are generated by ``manage.py process_invoice_run``, never in
+    this request.  Posting again for a run that completed with errors queues
+    its failed tasks for retry; poll ``invoice_run_status`` for progress.
+    """
     if request.method != "POST":
         return JsonResponse({"error": "Only POST allowed"}, status=405)
 
     # TODO: Add authentication (e.g., shared secret or OAuth token check)
 
     try:
-        results = payment_services.generate_monthly_invoices()
-        return JsonResponse({"results": results, "count": len(results)})
+        run = payment_services.start_invoice_run()
+        return JsonResponse(run, status=200 if run["status"] == "completed" else 202)
     except Exception as e:
-        logger.error(f"Error generating invoices: {e}")
+        logger.error(f"Error creating invoice run: {e}")
         return JsonResponse({"error": "Invoice generation failed"}, status=500)
+
+
+def invoice_run_status(request: HttpRequest, run_id: int) -> JsonResponse:
+    """Report an invoice run's progress. Polled by the crontainer monthly job.
+
+    Restricted to staff accounts (the crontainer service user), like the
+    other machine-to-machine billing and usage endpoints.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required."}, status=401)
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Forbidden."}, status=403)
+
+    try:
+        return JsonResponse(payment_services.get_invoice_run_status(run_id))
+    except payment_services.ServiceError as e:
+        return JsonResponse({"error": str(e)}, status=e.status_code)
@@ -9,7 +9,8 @@ from django.shortcuts import get_object_or_404
 
 from projects.models import Project, ProjectMember
 from accounts.models import UserProfile
-from organizations.models import Organization, OrganizationMember
+from organizations.helpers.access import get_user_access
+from organizations.models import Organization
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,7 @@ class ForbiddenError(ServiceError):
 
 def get_projects(user: UserProfile) -> list[dict]:
     """Return all projects the user is a member of."""
-    project_ids = ProjectMember.objects.filter(user=user).values_list("project", flat=True)
+    project_ids = get_user_access(user).project_ids
     projects = Project.objects.filter(id__in=project_ids).values(
         "id", "name", "description", "created_at", "updated_at",
     )
@@ -58,7 +59,7 @@ def create_project(
     Raises ForbiddenError if user is not a member or free-tier limit reached.
     """
     organization = get_object_or_404(Organization, id=organization_id)
-    if not OrganizationMember.objects.filter(organization=organization, user=user).exists():
+    if not get_user_access(user).is_org_member(organization.id):
         raise ForbiddenError("You are not a member of this organization")
 
     if organization.has_reached_free_project_limit():
@@ -87,7 +88,7 @@ def update_project(project_id: str, name: str, description: str, user: UserProfi
     except Project.DoesNotExist:
         raise NotFoundError("Project not found")
 
-    if not ProjectMember.objects.filter(user=user, project=project).exists():
+    if not get_user_access(user).is_project_member(project.id):
         raise ForbiddenError("You are not a member of this project")
 
     project.name = name
@@ -110,7 +111,7 @@ def delete_project(project_id: str, user: UserProfile) -> dict:
     except Project.DoesNotExist:
         raise NotFoundError("Project not found")
 
-    if not ProjectMember.objects.filter(user=user, project=project).exists():
+    if not get_user_access(user).is_project_member(project.id):
         raise ForbiddenError("You are not a member of this project")
 
     project.delete()
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from stacks.metrics.partitions import add_months, detach_partitions_before, is_partitioned, list_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Detach MetricUsageRecord partitions older than the retention window. '
+        'Daily usage rollups are kept, so dashboards and invoices are unaffected.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-months',
+            type=int,
+            default=13,
+            help='Months of raw usage to keep, including the current month (default: 13)'
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop detached partitions instead of leaving them as standalone tables'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the partitions that would be detached without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        if options['keep_months'] < 2:
+            raise CommandError('--keep-months must be at least 2 so the month being billed is kept.')
+        if not is_partitioned(connection):
+            self.stdout.write('stacks_metricusagerecord is not partitioned on this database; nothing to do.')
+            return
+
+        this_month = timezone.now().date().replace(day=1)
+        cutoff = add_months(this_month, 1 - options['keep_months'])
+
+        if options['dry_run']:
+            for name, month in list_partitions(connection):
+                if month < cutoff:
+                    self.stdout.write(f'Would detach {name}')
+            return
+
+        with transaction.atomic():
+            detached = detach_partitions_before(connection, cutoff, drop=options['drop'])
+
+        verb = 'Dropped' if options['drop'] else 'Detached'
+        for name in detached:
+            self.stdout.write(self.style.SUCCESS(f'{verb} partition {name}'))
+        if not detached:
+            self.stdout.write(f'No partitions older than {cutoff:%Y-%m}.')
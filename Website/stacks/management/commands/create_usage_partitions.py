@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from stacks.metrics.partitions import add_months, ensure_partitions, is_partitioned
+
+
+class Command(BaseCommand):
+    help = 'Pre-create monthly MetricUsageRecord partitions (run monthly, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=3,
+            help='How many months after the current one to create (default: 3)'
+        )
+
+    def handle(self, *args, **options):
+        if not is_partitioned(connection):
+            self.stdout.write('stacks_metricusagerecord is not partitioned on this database; nothing to do.')
+            return
+
+        this_month = timezone.now().date().replace(day=1)
+        with transaction.atomic():
+            created = ensure_partitions(connection, this_month, add_months(this_month, options['months_ahead']))
+
+        for name in created:
+            self.stdout.write(self.style.SUCCESS(f'Created partition {name}'))
+        if not created:
+            self.stdout.write('All partitions already exist.')
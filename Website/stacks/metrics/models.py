@@ -39,4 +39,29 @@ class MetricUsageRecord(models.Model):
         unique_together = ("metric_definition", "stack", "resource", "usage_datetime")
 
     def __str__(self):
-        return f"{self.metric_definition} usage for {self.stack} on {self.usage_datetime} (Resource: {self.resource}) - Amount Used: {self.amount_used}"
\ No newline at end of file
+        return f"{self.metric_definition} usage for {self.stack} on {self.usage_datetime} (Resource: {self.resource}) - Amount Used: {self.amount_used}"
+
+class DailyMetricUsage(models.Model):
+    """Per-day usage totals rolled up from ``MetricUsageRecord``.
+
+    One row per stack, metric and calendar day (in ``TIME_ZONE``), with the
+    owning organization copied in so billing reads never join through
+    projects.  Rows are recomputed from the raw records by
+    ``stacks.services.refresh_daily_usage`` whenever usage is written, and
+    are kept when old raw records are archived.
+    """
+    organization = models.ForeignKey("organizations.Organization", on_delete=models.CASCADE, related_name="daily_metric_usage")
+    stack = models.ForeignKey(Stack, on_delete=models.CASCADE, related_name="daily_metric_usage")
+    metric_definition = models.ForeignKey(MetricDefinition, on_delete=models.CASCADE, related_name="daily_usage")
+    usage_date = models.DateField()
+    amount_used = models.DecimalField(max_digits=18, decimal_places=6)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("stack", "metric_definition", "usage_date")
+        indexes = [
+            models.Index(fields=["organization", "usage_date"], name="stacks_dailyusage_org_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.metric_definition} usage for {self.stack} on {self.usage_date}: {self.amount_used}"
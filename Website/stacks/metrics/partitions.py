@@ -0,0 +1,137 @@
+"""
+Monthly range partitions for ``MetricUsageRecord`` (PostgreSQL only).
+
+The usage table is partitioned by ``usage_datetime`` into one partition per
+calendar month (UTC), named ``stacks_metricusagerecord_pYYYYMM``, plus a
+``_default`` partition that catches rows for months that have no partition
+yet.  Queries that filter ``usage_datetime`` by range only scan the months
+they touch, and whole months can be detached for archival without a bulk
+``DELETE``.
+
+Partitions are created ahead of time by ``manage.py create_usage_partitions``
+and detached by ``manage.py archive_usage_partitions``.  On other databases
+(the SQLite test database) the table is a plain table and these helpers are
+no-ops.
+
+This module deliberately uses raw table names rather than the model so the
+partitioning migration can import it.
+"""
+
+import re
+from datetime import date
+
+PARENT_TABLE = "stacks_metricusagerecord"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+_PARTITION_RE = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month.year:04d}{month.month:02d}"
+
+
+def partition_month(name: str) -> date | None:
+    match = _PARTITION_RE.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def is_partitioned(connection) -> bool:
+    """True when the usage table is a PostgreSQL partitioned table."""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relkind FROM pg_class c WHERE c.oid = to_regclass(%s)", [PARENT_TABLE],
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def list_partitions(connection) -> list[tuple[str, date]]:
+    """Return ``(name, month)`` for every attached monthly partition, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.oid = to_regclass(%s)
+            """,
+            [PARENT_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return sorted(
+        ((name, month) for name in names if (month := partition_month(name)) is not None),
+        key=lambda item: item[1],
+    )
+
+
+def create_partition(connection, month: date) -> bool:
+    """Attach the partition for *month*, creating it if needed.
+
+    Rows for that month that already landed in the default partition are
+    moved into the new partition first, otherwise the attach would fail.
+    Returns ``False`` if the partition was already attached.
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    if any(existing == name for existing, _ in list_partitions(connection)):
+        return False
+
+    lower = month.isoformat()
+    upper = add_months(month, 1).isoformat()
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {qn(name)} (LIKE {qn(PARENT_TABLE)})")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {qn(DEFAULT_PARTITION)} "
+            f"WHERE usage_datetime >= %s AND usage_datetime < %s RETURNING *) "
+            f"INSERT INTO {qn(name)} SELECT * FROM moved",
+            [f"{lower} 00:00:00+00", f"{upper} 00:00:00+00"],
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(PARENT_TABLE)} ATTACH PARTITION {qn(name)} "
+            f"FOR VALUES FROM ('{lower} 00:00:00+00') TO ('{upper} 00:00:00+00')"
+        )
+    return True
+
+
+def ensure_partitions(connection, first_month: date, last_month: date) -> list[str]:
+    """Attach partitions for every month in ``[first_month, last_month]``."""
+    created = []
+    month = month_start(first_month)
+    while month <= last_month:
+        if create_partition(connection, month):
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def detach_partitions_before(connection, cutoff: date, drop: bool = False) -> list[str]:
+    """Detach every monthly partition for months before *cutoff*.
+
+    Detached partitions remain as standalone tables (ready to be dumped to
+    cold storage) unless *drop* is set.  The daily usage rollup is not
+    touched, so dashboards and invoices for those months keep working.
+    """
+    qn = connection.ops.quote_name
+    detached = []
+    with connection.cursor() as cursor:
+        for name, month in list_partitions(connection):
+            if month >= month_start(cutoff):
+                break
+            cursor.execute(f"ALTER TABLE {qn(PARENT_TABLE)} DETACH PARTITION {qn(name)}")
+            if drop:
+                cursor.execute(f"DROP TABLE {qn(name)}")
+            detached.append(name)
+    return detached
@@ -0,0 +1,37 @@
+# Generated manually
+
+import core.fields
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stacks', '0034_drop_legacy_resource_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', core.fields.ShortUUIDField(editable=False, max_length=16, primary_key=True, serialize=False, unique=True)),
+                ('request_type', models.CharField(max_length=50)),
+                ('body', models.JSONField(help_text='Full message envelope sent to the IaC queue.')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='PENDING messages are not dispatched before this time (retry backoff).')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('operation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbox_messages', to='stacks.operation')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [
+                    models.Index(fields=['status', 'available_at'], name='stacks_outbox_status_idx'),
+                ],
+            },
+        ),
+    ]
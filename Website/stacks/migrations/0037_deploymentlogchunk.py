@@ -0,0 +1,80 @@
+"""Move deployment log text into an append-only chunk table.
+
+Each existing log's ``log_text`` becomes a single chunk, then the column is
+dropped.
+"""
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _split_lines(text):
+    lines = text.split("\n") if text else []
+    if lines and lines[-1] == "":
+        lines = lines[:-1]
+    return lines
+
+
+def log_text_to_chunks(apps, schema_editor):
+    DeploymentLog = apps.get_model("stacks", "DeploymentLog")
+    DeploymentLogChunk = apps.get_model("stacks", "DeploymentLogChunk")
+
+    for log in DeploymentLog.objects.exclude(log_text="").iterator():
+        lines = _split_lines(log.log_text)
+        if not lines:
+            continue
+        DeploymentLogChunk.objects.create(
+            log=log,
+            seq=0,
+            start_line=0,
+            end_line=len(lines),
+            text="\n".join(lines) + "\n",
+        )
+        DeploymentLog.objects.filter(pk=log.pk).update(line_count=len(lines), chunk_count=1)
+
+
+def chunks_to_log_text(apps, schema_editor):
+    DeploymentLog = apps.get_model("stacks", "DeploymentLog")
+    DeploymentLogChunk = apps.get_model("stacks", "DeploymentLogChunk")
+
+    for log in DeploymentLog.objects.filter(chunk_count__gt=0).iterator():
+        text = "".join(
+            DeploymentLogChunk.objects.filter(log=log).order_by("seq").values_list("text", flat=True)
+        )
+        DeploymentLog.objects.filter(pk=log.pk).update(log_text=text)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stacks', '0036_edgeconfigversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deploymentlog',
+            name='chunk_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='DeploymentLogChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.IntegerField()),
+                ('start_line', models.IntegerField()),
+                ('end_line', models.IntegerField()),
+                ('text', models.TextField()),
+                ('log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='stacks.deploymentlog')),
+            ],
+            options={
+                'ordering': ['seq'],
+                'indexes': [models.Index(fields=['log', 'end_line'], name='stacks_logchunk_end_idx')],
+                'constraints': [models.UniqueConstraint(fields=('log', 'seq'), name='unique_deployment_log_chunk_seq')],
+            },
+        ),
+        migrations.RunPython(log_text_to_chunks, chunks_to_log_text),
+        migrations.RemoveField(
+            model_name='deploymentlog',
+            name='log_text',
+        ),
+    ]
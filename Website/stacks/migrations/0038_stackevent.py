@@ -0,0 +1,32 @@
+# Generated manually
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stacks', '0037_deploymentlogchunk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StackEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('LOG', 'Log lines'), ('LOG_STATUS', 'Log status'), ('OPERATION', 'Operation status')], max_length=20)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('chunk', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='stacks.deploymentlogchunk')),
+                ('stack', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='stacks.stack')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [
+                    models.Index(fields=['stack', 'id'], name='stacks_event_stack_id_idx'),
+                    models.Index(fields=['created_at'], name='stacks_event_created_idx'),
+                ],
+            },
+        ),
+    ]
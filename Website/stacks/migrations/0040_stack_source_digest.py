@@ -0,0 +1,18 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stacks', '0039_operation_status_lease_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stack',
+            name='source_digest',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 of the current uploaded source archive (blank if unknown).', max_length=64),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated manually
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_daily_usage(apps, schema_editor):
+    MetricUsageRecord = apps.get_model("stacks", "MetricUsageRecord")
+    DailyMetricUsage = apps.get_model("stacks", "DailyMetricUsage")
+
+    groups = (
+        MetricUsageRecord.objects
+        .annotate(usage_date=TruncDate("usage_datetime"))
+        .values("stack_id", "stack__project__organization_id", "metric_definition_id", "usage_date")
+        .annotate(total=Sum("amount_used"))
+        .order_by()
+    )
+    batch = []
+    for group in groups.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        batch.append(DailyMetricUsage(
+            organization_id=group["stack__project__organization_id"],
+            stack_id=group["stack_id"],
+            metric_definition_id=group["metric_definition_id"],
+            usage_date=group["usage_date"],
+            amount_used=group["total"],
+        ))
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            DailyMetricUsage.objects.bulk_create(batch)
+            batch = []
+    DailyMetricUsage.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0009_alter_organization_stripe_customer_id_and_more'),
+        ('stacks', '0040_stack_source_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetricUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('usage_date', models.DateField()),
+                ('amount_used', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('metric_definition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to='stacks.metricdefinition')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_metric_usage', to='organizations.organization')),
+                ('stack', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_metric_usage', to='stacks.stack')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'usage_date'], name='stacks_dailyusage_org_idx')],
+                'unique_together': {('stack', 'metric_definition', 'usage_date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,95 @@
+# Generated manually
+#
+# Converts stacks_metricusagerecord into a table range-partitioned by month on
+# usage_datetime (PostgreSQL only; other databases keep the plain table).
+# PostgreSQL requires the partition key in every unique constraint, so the
+# primary key becomes (id, usage_datetime); ids still come from the same
+# sequence and stay unique, which is all the ORM relies on.
+
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+from stacks.metrics.partitions import (
+    DEFAULT_PARTITION, PARENT_TABLE, add_months, ensure_partitions, is_partitioned,
+)
+
+LEGACY_TABLE = f"{PARENT_TABLE}_unpartitioned"
+PARTITIONS_AHEAD = 3
+
+
+def partition_usage_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or is_partitioned(connection):
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{PARENT_TABLE}" RENAME TO "{LEGACY_TABLE}"')
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'",
+            [LEGACY_TABLE],
+        )
+        is_identity = cursor.fetchone()[0] != ""
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [LEGACY_TABLE])
+        legacy_sequence = cursor.fetchone()[0]
+
+        cursor.execute(
+            f'CREATE TABLE "{PARENT_TABLE}" '
+            f'(LIKE "{LEGACY_TABLE}" INCLUDING DEFAULTS INCLUDING IDENTITY) '
+            f"PARTITION BY RANGE (usage_datetime)"
+        )
+        cursor.execute(f'ALTER TABLE "{PARENT_TABLE}" ADD PRIMARY KEY (id, usage_datetime)')
+        cursor.execute(
+            f'ALTER TABLE "{PARENT_TABLE}" ADD CONSTRAINT "stacks_metricusagerecord_usage_uniq" '
+            f"UNIQUE (metric_definition_id, stack_id, resource, usage_datetime)"
+        )
+        cursor.execute(
+            f'ALTER TABLE "{PARENT_TABLE}" ADD CONSTRAINT "stacks_metricusagerecord_metric_fk" '
+            f'FOREIGN KEY (metric_definition_id) REFERENCES "stacks_metricdefinition" (id) '
+            f"DEFERRABLE INITIALLY DEFERRED"
+        )
+        cursor.execute(
+            f'ALTER TABLE "{PARENT_TABLE}" ADD CONSTRAINT "stacks_metricusagerecord_stack_fk" '
+            f'FOREIGN KEY (stack_id) REFERENCES "stacks_stack" (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+        cursor.execute(
+            f'CREATE INDEX "stacks_mur_stack_time_idx" ON "{PARENT_TABLE}" (stack_id, usage_datetime)'
+        )
+        cursor.execute(
+            f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{PARENT_TABLE}" DEFAULT'
+        )
+
+        cursor.execute(f'SELECT MIN(usage_datetime) FROM "{LEGACY_TABLE}"')
+        oldest = cursor.fetchone()[0]
+        this_month = datetime.now(timezone.utc).date().replace(day=1)
+        first_month = oldest.astimezone(timezone.utc).date().replace(day=1) if oldest else this_month
+        ensure_partitions(connection, first_month, add_months(this_month, PARTITIONS_AHEAD))
+
+        overriding = "OVERRIDING SYSTEM VALUE" if is_identity else ""
+        cursor.execute(f'INSERT INTO "{PARENT_TABLE}" {overriding} SELECT * FROM "{LEGACY_TABLE}"')
+
+        if is_identity:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                f'COALESCE((SELECT MAX(id) FROM "{PARENT_TABLE}"), 0) + 1, false)',
+                [PARENT_TABLE],
+            )
+        elif legacy_sequence:
+            # The copied column default still uses the old serial sequence;
+            # hand it over so it survives dropping the legacy table.
+            cursor.execute(f'ALTER SEQUENCE {legacy_sequence} OWNED BY "{PARENT_TABLE}".id')
+
+        cursor.execute(f'DROP TABLE "{LEGACY_TABLE}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stacks', '0041_dailymetricusage'),
+    ]
+
+    operations = [
+        # Not reversible in place: un-partitioning means copying every row
+        # back into a plain table, which should be a deliberate operation.
+        migrations.RunPython(partition_usage_table, migrations.RunPython.noop),
+    ]
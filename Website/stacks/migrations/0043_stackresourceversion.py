@@ -0,0 +1,21 @@
+# Generated manually
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stacks', '0042_partition_metricusagerecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StackResourceVersion',
+            fields=[
+                ('stack', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resource_version', serialize=False, to='stacks.stack')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -1,6 +1,7 @@
 import json
 from django.db import models
 from django.db.models import UniqueConstraint
+from django.utils import timezone
 from projects.models import Project
 
 from core.fields import ShortUUIDField
@@ -58,6 +59,10 @@ class Stack(models.Model):
     parent_stack = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL, related_name='child_stacks')
     environment_type = models.CharField(max_length=50, default="DEV")
     environment_name = models.CharField(max_length=50, default="Development")
+    source_digest = models.CharField(
+        max_length=64, default="", blank=True,
+        help_text="SHA-256 of the current uploaded source archive (blank if unknown).",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -126,8 +131,8 @@ class DeploymentLog(models.Model):
     stack = models.ForeignKey(Stack, on_delete=models.CASCADE, related_name='deployment_logs')
     operation = models.CharField(max_length=20, choices=OPERATION_CHOICES)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='RUNNING')
-    log_text = models.TextField(default='', blank=True)
     line_count = models.IntegerField(default=0)
+    chunk_count = models.IntegerField(default=0)
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
@@ -141,6 +146,67 @@ class DeploymentLog(models.Model):
         return f"DeploymentLog {self.id} ({self.operation}) for Stack {self.stack_id}"
 
 
+class DeploymentLogChunk(models.Model):
+    """One appended piece of a deployment log.
+
+    Lines ``start_line`` (inclusive) to ``end_line`` (exclusive) of the log.
+    Appends insert a new row instead of rewriting a growing text column, and
+    polls with ``after_line`` only read chunks that end past that offset.
+    """
+
+    log = models.ForeignKey(DeploymentLog, on_delete=models.CASCADE, related_name='chunks')
+    seq = models.IntegerField()
+    start_line = models.IntegerField()
+    end_line = models.IntegerField()
+    text = models.TextField()
+
+    class Meta:
+        ordering = ['seq']
+        constraints = [
+            UniqueConstraint(fields=['log', 'seq'], name='unique_deployment_log_chunk_seq'),
+        ]
+        indexes = [
+            models.Index(fields=['log', 'end_line'], name='stacks_logchunk_end_idx'),
+        ]
+
+    def __str__(self):
+        return f"DeploymentLogChunk {self.log_id}#{self.seq} (lines {self.start_line}-{self.end_line})"
+
+
+
+class StackEvent(models.Model):
+    """Append-only feed of per-stack changes pushed to the dashboard event stream.
+
+    Rows are written in the same transaction as the change they describe, and
+    the auto-increment ``id`` doubles as the SSE event id clients resume from.
+    Log-line events point at their ``DeploymentLogChunk`` instead of copying
+    the text.
+    """
+
+    KIND_CHOICES = [
+        ('LOG', 'Log lines'),
+        ('LOG_STATUS', 'Log status'),
+        ('OPERATION', 'Operation status'),
+    ]
+
+    stack = models.ForeignKey(Stack, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    chunk = models.ForeignKey(
+        DeploymentLogChunk, on_delete=models.CASCADE, null=True, blank=True, related_name='+',
+    )
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['stack', 'id'], name='stacks_event_stack_id_idx'),
+            models.Index(fields=['created_at'], name='stacks_event_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"StackEvent {self.id} ({self.kind}) for Stack {self.stack_id}"
+
 class PrebuiltStack(models.Model):
     id = ShortUUIDField(primary_key=True)
     purchasable_stack = models.ForeignKey(PurchasableStack, on_delete=models.CASCADE, related_name="prebuilt_stacks")
@@ -206,6 +272,7 @@ class Operation(models.Model):
         indexes = [
             models.Index(fields=['stack', '-created_at']),
             models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['status', 'lease_expires_at'], name='stacks_op_status_lease_idx'),
         ]
 
     @property
@@ -215,3 +282,78 @@ class Operation(models.Model):
     def __str__(self):
         return f"Operation {self.id} ({self.operation_type} / {self.status}) for Stack {self.stack_id}"
 
+
+
+class OutboxMessage(models.Model):
+    """A queued IaC Service Bus message (transactional outbox).
+
+    Written in the same transaction as its ``Operation`` so that a failed or
+    skipped send can never leave an operation that nothing will pick up.
+    ``stacks.services.dispatch_outbox`` drains PENDING rows in batches and
+    reschedules failed sends with exponential backoff.
+    """
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    id = ShortUUIDField(primary_key=True)
+    operation = models.ForeignKey(
+        Operation, on_delete=models.CASCADE, null=True, blank=True, related_name='outbox_messages',
+    )
+    request_type = models.CharField(max_length=50)
+    body = models.JSONField(help_text="Full message envelope sent to the IaC queue.")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(default='', blank=True)
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="PENDING messages are not dispatched before this time (retry backoff).",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='stacks_outbox_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"OutboxMessage {self.id} ({self.request_type} / {self.status})"
+
+
+class EdgeConfigVersion(models.Model):
+    """Single-row counter bumped whenever a ``deployboxrm_edge`` resource changes.
+
+    The Traefik config endpoint caches its rendered config per version and
+    uses the version as the ETag, so unchanged polls cost one primary-key
+    lookup instead of a scan over every edge resource.
+    """
+
+    id = models.PositiveSmallIntegerField(primary_key=True, default=1)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"EdgeConfigVersion {self.version}"
+
+
+class StackResourceVersion(models.Model):
+    """Per-stack counter bumped on every ``Resource``/``ResourceDependency`` write.
+
+    The resource tree and dashboard endpoints cache each stack's serialized
+    tree per version and derive their ETags from it.  It lives in its own
+    table (like ``EdgeConfigVersion``) so a ``stack.save()`` from a stale
+    in-memory instance can never roll the version back.
+    """
+
+    stack = models.OneToOneField(
+        Stack, primary_key=True, on_delete=models.CASCADE, related_name="resource_version",
+    )
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"StackResourceVersion {self.stack_id}: {self.version}"
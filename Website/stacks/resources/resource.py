@@ -66,7 +66,13 @@ class Resource(models.Model):
     def __str__(self):
         return f"{self.resource_type}:{self.name}" if self.name else self.resource_type
 
-    def save(self, *args, **kwargs):
+    def fill_generated_fields(self, defn=None) -> None:
+        """Populate the prefixed id, provider_name and name if they are unset.
+
+        Called by ``save()``; bulk creation calls it directly (passing the
+        already-resolved registry *defn*) because ``bulk_create`` skips
+        ``save()``.
+        """
         # Generate ID using the resource-type prefix (e.g. res000, res002) so
         # that id.split('_')[0] gives the IaC ResourceManager prefix.
         if not self.pk and self.prefix:
@@ -75,9 +81,10 @@ class Resource(models.Model):
 
         # Auto-generate provider_name if not set (mirrors old save() logic)
         if not self.provider_name and self.stack_id:
-            from .type_registry import ResourceTypeRegistry
+            if defn is None:
+                from .type_registry import ResourceTypeRegistry
 
-            defn = ResourceTypeRegistry.get_by_type(self.resource_type)
+                defn = ResourceTypeRegistry.get_by_type(self.resource_type)
             if defn and defn.generate_provider_name:
                 self.provider_name = defn.generate_provider_name(
                     self.stack, self.index, self.prefix
@@ -87,6 +94,8 @@ class Resource(models.Model):
         if not self.name:
             self.name = f"{self.resource_type}_{self.index}"
 
+    def save(self, *args, **kwargs):
+        self.fill_generated_fields()
         super().save(*args, **kwargs)
 
 
@@ -10,11 +10,12 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import TYPE_CHECKING, Any, overload
+from typing import TYPE_CHECKING, Any, Callable, overload
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Max
+from django.utils import timezone
 
 from stacks.resources.resource import Resource
 from stacks.resources.type_registry import ResourceTypeRegistry
@@ -57,8 +58,19 @@ RESOURCE_TYPE_CATEGORIES: dict[str, str] = {
 # ---------------------------------------------------------------------------
 # Type-specific creation hooks
 # ---------------------------------------------------------------------------
+# Hooks receive ``find_first(resource_type)``, which returns the stack's
+# lowest-index resource of that type (or ``None``).  ``add_resource`` backs it
+# with a query; bulk ``create`` resolves it in memory.
+FindFirst = Callable[[str], "Resource | None"]
 
-def _prepare_edge_attributes(stack: "Stack", index: int, attrs: dict) -> dict:
+
+def _find_first_in_db(stack: "Stack") -> FindFirst:
+    def find_first(resource_type: str) -> Resource | None:
+        return Resource.objects.filter(stack=stack, resource_type=resource_type).first()
+    return find_first
+
+
+def _prepare_edge_attributes(stack: "Stack", index: int, attrs: dict, find_first: FindFirst) -> dict:
     """Auto-generate subdomain and resolved_root_base_url for edge resources."""
     if not attrs.get("subdomain"):
         attrs["subdomain"] = f"{stack.pk}{index}"
@@ -74,20 +86,18 @@ def _prepare_edge_attributes(stack: "Stack", index: int, attrs: dict) -> dict:
     return attrs
 
 
-def _prepare_container_app_attributes(stack: "Stack", index: int, attrs: dict) -> dict:
+def _prepare_container_app_attributes(stack: "Stack", index: int, attrs: dict, find_first: FindFirst) -> dict:
     """Auto-generate template_container_name for container apps."""
     if not attrs.get("template_container_name"):
         attrs["template_container_name"] = f"container-{stack.pk}"
     return attrs
 
 
-def _prepare_storage_account_attributes(stack: "Stack", index: int, attrs: dict) -> dict:
+def _prepare_storage_account_attributes(stack: "Stack", index: int, attrs: dict, find_first: FindFirst) -> dict:
     """Inject resource_group_name Terraform reference for the parent resource group."""
     if not attrs.get("resource_group_name"):
         # Find the parent resource group's name to build the reference
-        rg = Resource.objects.filter(
-            stack=stack, resource_type="azurerm_resource_group"
-        ).first()
+        rg = find_first("azurerm_resource_group")
         if rg:
             attrs["resource_group_name"] = (
                 f"${{azurerm_resource_group.{rg.name}.azurerm_name}}"
@@ -95,12 +105,10 @@ def _prepare_storage_account_attributes(stack: "Stack", index: int, attrs: dict)
     return attrs
 
 
-def _prepare_static_website_attributes(stack: "Stack", index: int, attrs: dict) -> dict:
+def _prepare_static_website_attributes(stack: "Stack", index: int, attrs: dict, find_first: FindFirst) -> dict:
     """Inject storage_account_id Terraform reference for the parent storage account."""
     if not attrs.get("storage_account_id"):
-        sa = Resource.objects.filter(
-            stack=stack, resource_type="azurerm_storage_account"
-        ).first()
+        sa = find_first("azurerm_storage_account")
         if sa:
             attrs["storage_account_id"] = (
                 f"${{azurerm_storage_account.{sa.name}.azurerm_id}}"
@@ -128,7 +136,23 @@ class ResourcesManager:
 
         Each entry in *resources* is a dict with at minimum ``resource_type``
         and optionally type-specific field overrides.
+
+        Parents and hook lookups are resolved in memory against the stack's
+        existing resources plus the ones created earlier in *resources*, ids
+        and names are generated up front, and everything is inserted with a
+        single ``bulk_create`` (parents always precede their children).
         """
+        # Lowest-index resource per type, as ``.first()`` would return it.
+        first_by_type: dict[str, Resource] = {}
+
+        def remember(resource: Resource) -> None:
+            current = first_by_type.get(resource.resource_type)
+            if current is None or resource.index < current.index:
+                first_by_type[resource.resource_type] = resource
+
+        for existing in Resource.objects.filter(stack=stack).only("id", "resource_type", "index", "name"):
+            remember(existing)
+
         created_resources: list[Resource] = []
 
         for idx, resource_data in enumerate(resources):
@@ -159,14 +183,10 @@ class ResourcesManager:
             # Run type-specific creation hook
             hook = _CREATION_HOOKS.get(rt)
             if hook:
-                attributes = hook(stack, idx, attributes)
+                attributes = hook(stack, idx, attributes, first_by_type.get)
 
             # Infer parent
-            parent = None
-            if defn.parent_type:
-                parent = Resource.objects.filter(
-                    stack=stack, resource_type=defn.parent_type
-                ).first()
+            parent = first_by_type.get(defn.parent_type) if defn.parent_type else None
 
             resource = Resource(
                 stack=stack,
@@ -179,8 +199,18 @@ class ResourcesManager:
                 tags=attributes.pop("tags", {}) or {},
                 attributes=attributes,
             )
-            resource.save()  # triggers provider_name + name auto-gen
+            resource.fill_generated_fields(defn)
             created_resources.append(resource)
+            remember(resource)
+
+        Resource.objects.bulk_create(created_resources)
+
+        # bulk_create skips post_save, so bump the cache versions here.
+        from stacks.services import EDGE_RESOURCE_TYPE, bump_edge_config_version, bump_stack_resource_version
+
+        bump_stack_resource_version([stack.pk])
+        if any(r.resource_type == EDGE_RESOURCE_TYPE for r in created_resources):
+            bump_edge_config_version()
 
         return created_resources
 
@@ -215,7 +245,7 @@ class ResourcesManager:
         # Run type-specific creation hook
         hook = _CREATION_HOOKS.get(rt)
         if hook:
-            attributes = hook(stack, next_index, attributes)
+            attributes = hook(stack, next_index, attributes, _find_first_in_db(stack))
 
         # Infer parent
         parent = None
@@ -304,16 +334,13 @@ class ResourcesManager:
         return serialize_resource_compat(resource)
 
     @staticmethod
-    def update_resource(resource_id: str, update_data: dict) -> Resource | None:
-        """Update a resource from a flat dict (e.g. IaC callback payload).
+    def _apply_update(resource: Resource, update_data: dict) -> set[str]:
+        """Merge a flat update dict into *resource* in memory.
 
         Maps promoted fields (provider_id, location, status, etc.) to model
-        columns and stores everything else in attributes.
+        columns and stores everything else in attributes.  Returns the names
+        of the fields whose values actually changed.
         """
-        resource = ResourcesManager._read_one(resource_id)
-        if resource is None:
-            return None
-
         from stacks.resources.compat_serializer import _PROVIDER_FIELD_MAP
 
         rt = resource.resource_type
@@ -323,22 +350,94 @@ class ResourcesManager:
         PROMOTED_COLUMNS = {"location", "status", "tags"}
         SKIP_KEYS = {"id", "stack", "index", "type", "created_at", "updated_at"}
 
+        changed: set[str] = set()
+
+        def assign(field: str, value) -> None:
+            if getattr(resource, field) != value:
+                setattr(resource, field, value)
+                changed.add(field)
+
         attrs = dict(resource.attributes) if resource.attributes else {}
 
         for k, v in update_data.items():
             if k in SKIP_KEYS:
                 continue
             elif k == "name":
-                resource.name = v
+                assign("name", v)
             elif k in PROMOTED_COLUMNS:
-                setattr(resource, k, v)
+                assign(k, v)
             elif provider_id_field and k == provider_id_field:
-                resource.provider_id = v or ""
+                assign("provider_id", v or "")
             elif provider_name_field and k == provider_name_field:
-                resource.provider_name = v or ""
+                assign("provider_name", v or "")
             else:
                 attrs[k] = v
 
-        resource.attributes = attrs
+        assign("attributes", attrs)
+        return changed
+
+    @staticmethod
+    def update_resource(resource_id: str, update_data: dict) -> Resource | None:
+        """Update a resource from a flat dict (e.g. IaC callback payload).
+
+        See ``_apply_update`` for how fields are mapped.
+        """
+        resource = ResourcesManager._read_one(resource_id)
+        if resource is None:
+            return None
+
+        ResourcesManager._apply_update(resource, update_data)
         resource.save()
         return resource
+
+    @staticmethod
+    def bulk_update(
+        updates: list[dict], resources: list[Resource] | None = None,
+    ) -> tuple[list[Resource], list[str]]:
+        """Apply many flat update dicts (keyed by ``"id"``) in one write.
+
+        Targets are fetched in a single query unless the caller already holds
+        them in *resources*.  Rows whose values did not change are not
+        written; the rest go out in one ``bulk_update``.
+
+        Returns ``(updated_resources, missing_ids)``.
+        """
+        ids = [str(u["id"]) for u in updates if u.get("id")]
+        if resources is None:
+            resources = list(Resource.objects.filter(pk__in=ids))
+        by_id = {str(r.pk): r for r in resources}
+
+        missing: list[str] = []
+        changed_fields: set[str] = set()
+        changed: dict[str, Resource] = {}
+
+        for update_data in updates:
+            rid = update_data.get("id")
+            if not rid:
+                continue
+            resource = by_id.get(str(rid))
+            if resource is None:
+                missing.append(str(rid))
+                continue
+            fields = ResourcesManager._apply_update(resource, update_data)
+            if fields:
+                changed_fields |= fields
+                changed[str(rid)] = resource
+
+        if not changed:
+            return [], missing
+
+        # bulk_update bypasses auto_now and post_save.
+        now = timezone.now()
+        for resource in changed.values():
+            resource.updated_at = now
+
+        from stacks.services import EDGE_RESOURCE_TYPE, bump_edge_config_version, bump_stack_resource_version
+
+        with transaction.atomic():
+            Resource.objects.bulk_update(list(changed.values()), [*sorted(changed_fields), "updated_at"])
+            bump_stack_resource_version({r.stack_id for r in changed.values()})
+            if any(r.resource_type == EDGE_RESOURCE_TYPE for r in changed.values()):
+                bump_edge_config_version()
+
+        return list(changed.values()), missing
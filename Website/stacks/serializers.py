@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Stack, PurchasableStack, Operation
+from .services import DEFAULT_LEASE_SECONDS, METRIC_INGEST_MAX_RECORDS
 from stacks.resources.resources_manager import RESOURCE_MANAGER_MAPPING
 
 
@@ -116,8 +117,19 @@ class OperationClaimSerializer(serializers.Serializer):
         help_text="Unique token generated by the worker to prove claim ownership.",
     )
     lease_duration_seconds = serializers.IntegerField(
-        default=1800, min_value=60, max_value=7200,
-        help_text="How long the worker expects to hold the lease (seconds).",
+        default=DEFAULT_LEASE_SECONDS, min_value=30, max_value=7200,
+        help_text="Initial lease length (seconds); renew it with the heartbeat endpoint.",
+    )
+
+
+class OperationHeartbeatSerializer(serializers.Serializer):
+    attempt_id = serializers.CharField(
+        max_length=64,
+        help_text="Must match the attempt_id used during claim.",
+    )
+    lease_duration_seconds = serializers.IntegerField(
+        default=DEFAULT_LEASE_SECONDS, min_value=30, max_value=7200,
+        help_text="New lease length, counted from now (seconds).",
     )
 
 
@@ -132,6 +144,13 @@ class OperationCompleteSerializer(serializers.Serializer):
     error_message = serializers.CharField(required=False, default='', allow_blank=True)
 
 
+class MetricUsageIngestSerializer(serializers.Serializer):
+    records = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=METRIC_INGEST_MAX_RECORDS,
+        help_text="Usage samples; each is validated individually and rejected rows are reported by index.",
+    )
+
+
 # ---------------------------------------------------------------------------
 # Unified Resource (Phase 1)
 # ---------------------------------------------------------------------------
@@ -221,7 +240,11 @@ class ResourceTreeSerializer(serializers.Serializer):
 
 
 class StackDashboardSerializer(serializers.Serializer):
-    """Serializes a stack with its full resource tree for the dashboard."""
+    """Serializes a stack with its full resource tree for the dashboard.
+
+    The tree and health summary come from the cached per-stack fragments
+    passed as ``context["fragments"]`` (see ``get_resource_fragments``).
+    """
     id = serializers.CharField()
     name = serializers.CharField()
     status = serializers.CharField()
@@ -234,19 +257,7 @@ class StackDashboardSerializer(serializers.Serializer):
         return stack.purchased_stack.name if stack.purchased_stack else None
 
     def get_resource_tree(self, stack):
-        resources = stack.unified_resources.all()
-        return ResourceTreeSerializer().to_representation(resources)
+        return self.context["fragments"][stack.id]["resource_tree"]
 
     def get_health_summary(self, stack):
-        resources = stack.unified_resources.all()
-        total = len(resources)
-        statuses = [r.status.lower() for r in resources]
-        healthy = sum(1 for s in statuses if s in ("active", "running", "succeeded", ""))
-        failed = sum(1 for s in statuses if s in ("failed", "error"))
-        degraded = total - healthy - failed
-        return {
-            "total_resources": total,
-            "healthy": healthy,
-            "degraded": degraded,
-            "failed": failed,
-        }
+        return self.context["fragments"][stack.id]["health_summary"]
@@ -7,27 +7,38 @@ exceptions on failure.  They never touch ``HttpRequest`` / ``HttpResponse``.
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import json
 import random
+import re
+import secrets
+import threading
+import time
 from dataclasses import dataclass
 from datetime import timedelta
-from typing import BinaryIO
+from typing import BinaryIO, Iterator
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.uploadedfile import UploadedFile
 from django.db import models, transaction
-from django.db.models import F
-from django.db.models.functions import Concat
+from django.db.models import Exists, F, OuterRef
 from django.utils import timezone
 
-from azure.storage.blob import BlobServiceClient
-from azure.servicebus import ServiceBusClient, ServiceBusMessage
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.storage.blob import BlobSasPermissions, BlobServiceClient, generate_blob_sas
+from azure.servicebus import ServiceBusMessage
 
+from core.utils.blob_storage import get_blob_service_client, parse_range_header
+from core.utils.service_bus_sender import get_sender_pool
 from projects.models import Project
-from organizations.models import OrganizationMember
+from organizations.helpers.access import get_user_access
 
-from stacks.models import Stack, PurchasableStack, DeploymentLog, Operation
+from stacks.models import (
+    Stack, PurchasableStack, DeploymentLog, DeploymentLogChunk, Operation, OutboxMessage,
+    EdgeConfigVersion, StackEvent, StackResourceVersion,
+)
 from stacks.resources.resources_manager import ResourcesManager
 
 logger = logging.getLogger(__name__)
@@ -37,9 +48,26 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 MAX_UPLOAD_SIZE_BYTES = 100 * 1024 * 1024  # 100 MB
 ZIP_MAGIC_BYTES = b"PK\x03\x04"
+SOURCE_UPLOAD_SAS_SECONDS = 30 * 60
+SOURCE_UPLOAD_BLOCK_BYTES = 4 * 1024 * 1024  # suggested client block size
+_UPLOAD_TOKEN_RE = re.compile(r"^[0-9a-f]{32}$")
+SOURCE_COPY_TIMEOUT_SECONDS = 60
+SOURCE_COPY_POLL_SECONDS = 0.5
 
 CUSTOM_STACK_TYPE = "CUSTOM"
 
+EDGE_RESOURCE_TYPE = "deployboxrm_edge"
+TRAEFIK_CONFIG_CACHE_TIMEOUT = 24 * 60 * 60  # seconds
+TRAEFIK_LONG_POLL_MAX_SECONDS = 30
+TRAEFIK_LONG_POLL_INTERVAL_SECONDS = 1.0
+
+RESOURCE_TREE_CACHE_TIMEOUT = 24 * 60 * 60  # seconds
+HEALTHY_RESOURCE_STATUSES = ("active", "running", "succeeded", "")
+FAILED_RESOURCE_STATUSES = ("failed", "error")
+
+METRIC_INGEST_MAX_RECORDS = 10_000
+METRIC_INGEST_BATCH_SIZE = 1000
+
 _ADJECTIVES = [
     "Superb", "Incredible", "Fantastic", "Amazing", "Awesome",
     "Brilliant", "Exceptional", "Outstanding", "Remarkable",
@@ -79,6 +107,14 @@ class ForbiddenError(ServiceError):
         super().__init__(message, status_code=403)
 
 
+class RangeNotSatisfiableError(ServiceError):
+    """Raised when a ``Range`` request falls outside the blob."""
+
+    def __init__(self, size: int):
+        super().__init__("Requested range not satisfiable.", status_code=416)
+        self.size = size
+
+
 # ---------------------------------------------------------------------------
 # Result dataclasses
 # ---------------------------------------------------------------------------
@@ -86,6 +122,28 @@ class ForbiddenError(ServiceError):
 class UploadResult:
     blob_name: str
     blob_url: str
+    digest: str = ""
+    changed: bool = True
+
+
+@dataclass
+class SourceDownload:
+    """A source archive being streamed from Blob Storage.
+
+    ``start``/``end`` are the inclusive byte offsets served; ``partial`` is
+    set when they come from a ``Range`` request.
+    """
+
+    file_name: str
+    size: int
+    start: int
+    end: int
+    partial: bool
+    chunks: Iterator[bytes]
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1 if self.size else 0
 
 
 # ---------------------------------------------------------------------------
@@ -102,9 +160,7 @@ def verify_project_access(user, project_id: str):
     except Project.DoesNotExist:
         raise NotFoundError("Project not found.")
 
-    if not OrganizationMember.objects.filter(
-        user=user, organization_id=project.organization_id
-    ).exists():
+    if not get_user_access(user).is_org_member(project.organization_id):
         raise NotFoundError("Project not found.")
 
     return project
@@ -168,8 +224,7 @@ def create_stack(project_id: str, purchasable_stack_id: str, user=None) -> dict:
         "resources": ResourcesManager.serialize(created_resources),
     }
 
-    operation = create_operation(str(stack.pk), "APPLY")
-    send_to_queue("IAC.APPLY", data, operation_id=str(operation.id))
+    enqueue_operation(str(stack.pk), "APPLY", "IAC.APPLY", data)
     return data
 
 
@@ -306,14 +361,17 @@ def delete_stack(stack_id: str) -> None:
     except Stack.DoesNotExist:
         raise NotFoundError("Stack not found.")
 
-    send_to_queue("IAC.DELETE", {"stack_id": stack.pk},
-                  operation_id=str(create_operation(str(stack.pk), "DELETE").id))
+    enqueue_operation(str(stack.pk), "DELETE", "IAC.DELETE", {"stack_id": stack.pk})
 
 
 def trigger_iac_update(stack_id: str) -> dict:
     """Enqueue an IAC.APPLY job for *stack_id*.
 
-    Returns the data dict sent to the queue.
+    Bursts of updates (repeated pushes, repeated Apply clicks) are coalesced:
+    if the stack's newest queued operation is already a PENDING APPLY, it is
+    refreshed with the current payload instead of queueing another apply.
+
+    Returns ``{"operation_id": str, "coalesced": bool}``.
     Raises ``NotFoundError`` if the stack does not exist.
     """
     try:
@@ -333,10 +391,13 @@ def trigger_iac_update(stack_id: str) -> dict:
     if github_data:
         data.update(github_data)
 
-    operation = create_operation(str(stack.pk), "APPLY")
-    if not send_to_queue("IAC.APPLY", data, operation_id=str(operation.id)):
-        raise ServiceError("Failed to send IAC apply to the service bus.")
-    return data
+    with transaction.atomic():
+        operation = _coalesce_pending_operation(str(stack.pk), "APPLY", "IAC.APPLY", data)
+        coalesced = operation is not None
+        if operation is None:
+            operation = enqueue_operation(str(stack.pk), "APPLY", "IAC.APPLY", data)
+
+    return {"operation_id": str(operation.pk), "coalesced": coalesced}
 
 
 def pause_stack(stack_id: str) -> None:
@@ -361,9 +422,7 @@ def pause_stack(stack_id: str) -> None:
         "resources": ResourcesManager.serialize(resources),
     }
 
-    operation = create_operation(str(stack.pk), "PAUSE")
-    if not send_to_queue("IAC.PAUSE", data, operation_id=str(operation.id)):
-        raise ServiceError("Failed to send IAC pause to the service bus.")
+    enqueue_operation(str(stack.pk), "PAUSE", "IAC.PAUSE", data)
 
 
 def resume_stack(stack_id: str) -> None:
@@ -388,61 +447,82 @@ def resume_stack(stack_id: str) -> None:
         "resources": ResourcesManager.serialize(resources),
     }
 
-    operation = create_operation(str(stack.pk), "RESUME")
-    if not send_to_queue("IAC.RESUME", data, operation_id=str(operation.id)):
-        raise ServiceError("Failed to send IAC resume to the service bus.")
+    enqueue_operation(str(stack.pk), "RESUME", "IAC.RESUME", data)
 
 
 def check_and_auto_pause_stacks() -> dict:
     """Check all organizations and pause stacks that exceed their credit allowance.
 
+    Runs in a constant number of queries regardless of how many organizations
+    exist: month-to-date cost comes from the ``DailyMetricUsage`` rollup priced
+    with the same rate cards as the invoice, one query (plus a resource
+    prefetch) loads the over-allowance organizations' Ready stacks, and the
+    PAUSE operations and outbox messages are written with ``bulk_create``.
+
     Returns a summary dict: ``{"paused": [<stack_ids>], "errors": [<messages>]}``.
     Called periodically by the crontainer credit-check job.
     """
-    from decimal import Decimal
-    from django.utils import timezone
-    from django.db.models import Sum
+    from django.db.models import Prefetch
     from organizations.models import Organization
-    from payments.models import MetricUsageRecord
-
-    now = timezone.now()
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-    paused_ids: list[str] = []
-    errors: list[str] = []
-
-    orgs = Organization.objects.filter(auto_pause_on_limit=True)
-    for org in orgs:
-        allowance = org.monthly_credit_allowance
-        if allowance is None or allowance <= 0:
-            continue
+    from payments.services import month_to_date_costs
+    from stacks.resources.resource import Resource
 
-        org_stacks = Stack.objects.filter(project__organization=org)
+    allowances = dict(
+        Organization.objects
+        .filter(auto_pause_on_limit=True, monthly_credit_allowance__gt=0)
+        .values_list("id", "monthly_credit_allowance")
+    )
+    if not allowances:
+        return {"paused": [], "errors": []}
 
-        # Total dollar amount billed this month (sum of instance_usage_bill_amount)
-        month_cost = org_stacks.aggregate(
-            total=Sum("instance_usage_bill_amount")
-        )["total"] or Decimal("0.00")
+    over_limit = {
+        org_id: cost
+        for org_id, cost in month_to_date_costs(list(allowances)).items()
+        if cost >= allowances[org_id]
+    }
+    if not over_limit:
+        return {"paused": [], "errors": []}
+
+    ready_stacks = list(
+        Stack.objects
+        .filter(project__organization_id__in=over_limit.keys(), status="Ready")
+        .select_related("project__organization")
+        .prefetch_related(
+            Prefetch("unified_resources", queryset=Resource.objects.order_by("index"))
+        )
+    )
+    if not ready_stacks:
+        return {"paused": [], "errors": []}
+
+    items = [
+        (
+            stack,
+            "PAUSE",
+            "IAC.PAUSE",
+            {
+                "stack_id": stack.pk,
+                "resources": ResourcesManager.serialize(list(stack.unified_resources.all())),
+            },
+        )
+        for stack in ready_stacks
+    ]
 
-        if month_cost < allowance:
-            continue
+    try:
+        enqueue_operations(items)
+    except Exception as exc:
+        msg = f"Failed to auto-pause {len(ready_stacks)} stack(s): {exc}"
+        logger.error(msg)
+        return {"paused": [], "errors": [msg]}
 
-        # Over limit — pause all Ready stacks for this org
-        ready_stacks = org_stacks.filter(status="Ready")
-        for stack in ready_stacks:
-            try:
-                pause_stack(stack.pk)
-                paused_ids.append(stack.pk)
-                logger.info(
-                    "Auto-paused stack %s (org %s): cost $%s exceeds allowance $%s",
-                    stack.pk, org.pk, month_cost, allowance,
-                )
-            except Exception as exc:
-                msg = f"Failed to auto-pause stack {stack.pk}: {exc}"
-                logger.error(msg)
-                errors.append(msg)
+    for stack in ready_stacks:
+        organization = stack.project.organization
+        logger.info(
+            "Auto-paused stack %s (org %s): cost $%s exceeds allowance $%s",
+            stack.pk, organization.pk, over_limit[organization.pk],
+            organization.monthly_credit_allowance,
+        )
 
-    return {"paused": paused_ids, "errors": errors}
+    return {"paused": [stack.pk for stack in ready_stacks], "errors": []}
 
 
 def _get_github_info_for_stack(stack: Stack) -> dict | None:
@@ -480,43 +560,333 @@ def _get_github_info_for_stack(stack: Stack) -> dict | None:
     }
 
 
+# ---------------------------------------------------------------------------
+# Metric usage ingestion
+# ---------------------------------------------------------------------------
+
+
+def _parse_usage_sample(sample, metric_ids_by_name: dict, metric_ids: set, stack_ids: set):
+    """Validate one ingestion sample; return ``(record_kwargs, None)`` or ``(None, error)``."""
+    from datetime import timezone as dt_timezone
+    from decimal import Decimal, InvalidOperation
+    from django.utils.dateparse import parse_datetime
+
+    if not isinstance(sample, dict):
+        return None, "Sample must be an object."
+
+    if sample.get("metric_definition_id") is not None:
+        metric_id = sample["metric_definition_id"]
+        if metric_id not in metric_ids:
+            return None, f"Unknown metric_definition_id {metric_id!r}."
+    elif sample.get("metric"):
+        matches = metric_ids_by_name.get(sample["metric"], [])
+        if len(matches) != 1:
+            problem = "Unknown" if not matches else "Ambiguous"
+            return None, f"{problem} metric {sample['metric']!r}; send metric_definition_id."
+        metric_id = matches[0]
+    else:
+        return None, "metric or metric_definition_id is required."
+
+    stack_id = sample.get("stack_id")
+    if stack_id not in stack_ids:
+        return None, f"Unknown stack_id {stack_id!r}."
+
+    resource = sample.get("resource")
+    if not isinstance(resource, str) or not resource or len(resource) > 255:
+        return None, "resource must be a non-empty string of at most 255 characters."
+
+    try:
+        amount = Decimal(str(sample.get("amount_used")))
+    except (InvalidOperation, ValueError):
+        return None, "amount_used must be a number."
+    if not amount.is_finite() or amount < 0 or amount.as_tuple().exponent < -6 or abs(amount) >= 10 ** 12:
+        return None, "amount_used must be a non-negative number with at most 6 decimal places."
+
+    try:
+        usage_datetime = parse_datetime(str(sample.get("usage_datetime") or ""))
+    except ValueError:
+        usage_datetime = None
+    if usage_datetime is None:
+        return None, "usage_datetime must be an ISO 8601 datetime."
+    if timezone.is_naive(usage_datetime):
+        usage_datetime = usage_datetime.replace(tzinfo=dt_timezone.utc)
+
+    return {
+        "metric_definition_id": metric_id,
+        "stack_id": stack_id,
+        "resource": resource,
+        "amount_used": amount,
+        "usage_datetime": usage_datetime,
+    }, None
+
+
+def ingest_metric_usage(samples: list) -> dict:
+    """Validate and upsert a batch of metric usage samples.
+
+    Each sample names its metric by ``metric_definition_id`` (or an
+    unambiguous ``metric`` name) and carries ``stack_id``, ``resource``,
+    ``amount_used`` and ``usage_datetime``.  Metrics and stacks are each
+    resolved in one query; valid samples are upserted on
+    ``(metric_definition, stack, resource, usage_datetime)`` so a recorder can
+    safely re-send a batch, and the daily rollup is refreshed once for the
+    days touched.  A later duplicate within the batch wins.
+
+    Returns ``{"accepted": <count>, "rejected": [{"index", "error"}, ...]}``.
+    """
+    from stacks.metrics.models import MetricDefinition, MetricUsageRecord
+
+    if len(samples) > METRIC_INGEST_MAX_RECORDS:
+        raise ValidationError(f"At most {METRIC_INGEST_MAX_RECORDS} samples per request.")
+
+    dicts = [s for s in samples if isinstance(s, dict)]
+    names = {s["metric"] for s in dicts if isinstance(s.get("metric"), str)}
+    ids = {s["metric_definition_id"] for s in dicts if isinstance(s.get("metric_definition_id"), int)}
+    metric_ids_by_name: dict[str, list[int]] = {}
+    metric_ids = set()
+    for metric_id, name in MetricDefinition.objects.filter(
+        models.Q(pk__in=ids) | models.Q(name__in=names)
+    ).values_list("pk", "name"):
+        metric_ids.add(metric_id)
+        metric_ids_by_name.setdefault(name, []).append(metric_id)
+    stack_ids = set(
+        Stack.objects.filter(pk__in={s.get("stack_id") for s in dicts if isinstance(s.get("stack_id"), str)})
+        .values_list("pk", flat=True)
+    )
+
+    records: dict[tuple, MetricUsageRecord] = {}
+    rejected = []
+    for index, sample in enumerate(samples):
+        fields, error = _parse_usage_sample(sample, metric_ids_by_name, metric_ids, stack_ids)
+        if error:
+            rejected.append({"index": index, "error": error})
+            continue
+        key = (fields["metric_definition_id"], fields["stack_id"], fields["resource"], fields["usage_datetime"])
+        records.pop(key, None)
+        records[key] = MetricUsageRecord(**fields)
+
+    if records:
+        with transaction.atomic():
+            MetricUsageRecord.objects.bulk_create(
+                list(records.values()),
+                batch_size=METRIC_INGEST_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["metric_definition", "stack", "resource", "usage_datetime"],
+                update_fields=["amount_used", "updated_at"],
+            )
+            refresh_daily_usage({
+                (stack_id, metric_id, timezone.localdate(usage_datetime))
+                for metric_id, stack_id, _, usage_datetime in records
+            })
+
+    return {"accepted": len(records), "rejected": rejected}
+
+
+# ---------------------------------------------------------------------------
+# Usage rollup
+# ---------------------------------------------------------------------------
+
+
+def refresh_daily_usage(buckets) -> int:
+    """Recompute ``DailyMetricUsage`` rows from the raw usage records.
+
+    *buckets* is an iterable of ``(stack_id, metric_definition_id, usage_date)``
+    tuples touched by an ingest.  Recomputing (rather than adding deltas) keeps
+    the rollup correct when a record is re-sent with a corrected amount.  One
+    grouped read, one upsert and at most one delete, however many buckets.
+
+    Returns the number of rollup rows written.
+    """
+    from datetime import datetime, time as dt_time
+    from django.db.models import Q, Sum
+    from django.db.models.functions import TruncDate
+    from stacks.metrics.models import DailyMetricUsage, MetricUsageRecord
+
+    buckets = set(buckets)
+    if not buckets:
+        return 0
+
+    stack_ids = {b[0] for b in buckets}
+    metric_ids = {b[1] for b in buckets}
+    dates = {b[2] for b in buckets}
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(min(dates), dt_time.min), tz)
+    end = timezone.make_aware(datetime.combine(max(dates) + timedelta(days=1), dt_time.min), tz)
+
+    totals = {
+        (row["stack_id"], row["metric_definition_id"], row["usage_date"]): row["total"]
+        for row in (
+            MetricUsageRecord.objects.filter(
+                stack_id__in=stack_ids,
+                metric_definition_id__in=metric_ids,
+                usage_datetime__gte=start,
+                usage_datetime__lt=end,
+            )
+            .annotate(usage_date=TruncDate("usage_datetime"))
+            .values("stack_id", "metric_definition_id", "usage_date")
+            .annotate(total=Sum("amount_used"))
+            .order_by()
+        )
+    }
+    org_by_stack = dict(
+        Stack.objects.filter(pk__in=stack_ids).values_list("pk", "project__organization_id")
+    )
+
+    rows = [
+        DailyMetricUsage(
+            organization_id=org_by_stack[stack_id],
+            stack_id=stack_id,
+            metric_definition_id=metric_id,
+            usage_date=usage_date,
+            amount_used=totals[(stack_id, metric_id, usage_date)],
+        )
+        for stack_id, metric_id, usage_date in buckets
+        if (stack_id, metric_id, usage_date) in totals and stack_id in org_by_stack
+    ]
+    DailyMetricUsage.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["stack", "metric_definition", "usage_date"],
+        update_fields=["organization", "amount_used", "updated_at"],
+    )
+
+    emptied = [b for b in buckets if b not in totals]
+    if emptied:
+        stale = Q()
+        for stack_id, metric_id, usage_date in emptied:
+            stale |= Q(stack_id=stack_id, metric_definition_id=metric_id, usage_date=usage_date)
+        DailyMetricUsage.objects.filter(stale).delete()
+
+    return len(rows)
+
+
+def reassign_project_usage(project_id: str, organization_id: str) -> int:
+    """Move the open month's ``DailyMetricUsage`` rows of *project_id* to *organization_id*.
+
+    Called inside the transaction that transfers a project, so the rest of
+    the month is invoiced and credit-checked against the new owner.  Earlier
+    months stay with the organization that was billed for them.
+
+    Returns the number of rollup rows re-pointed.
+    """
+    from stacks.metrics.models import DailyMetricUsage
+
+    return DailyMetricUsage.objects.filter(
+        stack__project_id=project_id,
+        usage_date__gte=timezone.localdate().replace(day=1),
+    ).exclude(organization_id=organization_id).update(organization_id=organization_id)
+
+
 # ---------------------------------------------------------------------------
 # Bulk resource updates
 # ---------------------------------------------------------------------------
-def bulk_update_resources(resources_data: list[dict]) -> None:
+def bulk_update_resources(resources_data: list[dict], resources=None) -> None:
     """Update a batch of resources in-place.
 
-    Uses ``ResourcesManager.update_resource()`` which maps flat IaC callback
-    fields to the unified Resource model (promoted columns + attributes).
-    Silently skips resources that cannot be found.
+    Uses ``ResourcesManager.bulk_update()``, which maps flat IaC callback
+    fields to the unified Resource model (promoted columns + attributes) and
+    writes every changed row in one statement.  Pass *resources* when the
+    caller has already loaded the targets.  Silently skips resources that
+    cannot be found.
     """
+    entries = []
     for resource in resources_data:
-        resource_id = resource.get("id")
         resource.pop("stack", None)
-
-        if not resource_id:
+        if not resource.get("id"):
             logger.warning("Resource entry missing 'id', skipping.")
             continue
-
-        updated = ResourcesManager.update_resource(resource_id, resource)
-        if updated:
-            logger.info("Resource %s updated successfully.", resource_id)
-        else:
-            logger.warning("Resource with ID %s not found.", resource_id)
+        entries.append(resource)
+
+    updated, missing = ResourcesManager.bulk_update(entries, resources)
+    for resource_id in missing:
+        logger.warning("Resource with ID %s not found.", resource_id)
+    logger.info(
+        "Updated %d of %d resources (%d unchanged).",
+        len(updated), len(entries), len(entries) - len(updated) - len(missing),
+    )
 
 
 # ---------------------------------------------------------------------------
 # Traefik config
 # ---------------------------------------------------------------------------
+def bump_edge_config_version() -> None:
+    """Invalidate the cached Traefik config after an edge resource changed.
+
+    Runs inside the caller's transaction, so the new version becomes visible
+    together with the resource change that caused it.
+    """
+    updated = EdgeConfigVersion.objects.filter(pk=1).update(version=F("version") + 1)
+    if not updated:
+        _, created = EdgeConfigVersion.objects.get_or_create(pk=1, defaults={"version": 1})
+        if not created:
+            EdgeConfigVersion.objects.filter(pk=1).update(version=F("version") + 1)
+
+
+def get_edge_config_version() -> int:
+    """Return the current edge config version (0 before any edge change)."""
+    version = EdgeConfigVersion.objects.filter(pk=1).values_list("version", flat=True).first()
+    return version or 0
+
+
+def _edge_config_etag(version: int) -> str:
+    return f'"edge-{version}"'
+
+
+def get_edge_config_etag() -> str:
+    """Return the ETag of the current Traefik config without rendering it."""
+    return _edge_config_etag(get_edge_config_version())
+
+
+def get_traefik_config_payload() -> tuple[str, str]:
+    """Return ``(etag, json_body)`` for the current Traefik config.
+
+    The rendered JSON is cached per edge config version, so repeated polls
+    only cost the version lookup until an edge resource changes.
+    """
+    version = get_edge_config_version()
+    cache_key = f"stacks:traefik-config:{version}"
+    body = cache.get(cache_key)
+    if body is None:
+        body = json.dumps(get_traefik_config())
+        cache.set(cache_key, body, TRAEFIK_CONFIG_CACHE_TIMEOUT)
+    return _edge_config_etag(version), body
+
+
+_edge_long_poll_slots = threading.BoundedSemaphore(
+    max(getattr(settings, "TRAEFIK_LONG_POLL_MAX_WAITERS", 2), 1)
+)
+
+
+def wait_for_edge_config_change(known_etags: list[str], timeout: float) -> str:
+    """Block until the edge config ETag is not in *known_etags*, or *timeout* passes.
+
+    Returns the current ETag.  *timeout* is capped at
+    ``TRAEFIK_LONG_POLL_MAX_SECONDS``.  A waiting request ties up a sync
+    worker thread, so only ``TRAEFIK_LONG_POLL_MAX_WAITERS`` may wait at once
+    per process; any others return the current ETag without waiting.
+    """
+    etag = get_edge_config_etag()
+    if etag not in known_etags or not _edge_long_poll_slots.acquire(blocking=False):
+        return etag
+    try:
+        deadline = time.monotonic() + min(max(timeout, 0), TRAEFIK_LONG_POLL_MAX_SECONDS)
+        while etag in known_etags and time.monotonic() < deadline:
+            time.sleep(min(TRAEFIK_LONG_POLL_INTERVAL_SECONDS, max(deadline - time.monotonic(), 0)))
+            etag = get_edge_config_etag()
+    finally:
+        _edge_long_poll_slots.release()
+    return etag
+
+
 def get_traefik_config() -> dict:
     """Build the Traefik HTTP config for all tenant edge resources.
 
-    Returns a dict suitable for JSON serialisation.
+    Returns a dict suitable for JSON serialisation.  Uncached; the endpoint
+    goes through ``get_traefik_config_payload``.
     """
     from stacks.resources.resource import Resource
 
     base_domain = settings.BASE_DOMAIN
-    edges = Resource.objects.filter(resource_type="deployboxrm_edge")
+    edges = Resource.objects.filter(resource_type=EDGE_RESOURCE_TYPE).only("attributes")
 
     routers: dict = {}
     svc: dict = {}
@@ -576,18 +946,125 @@ def get_traefik_config() -> dict:
     return traefik_config
 
 
+# ---------------------------------------------------------------------------
+# Resource tree cache
+# ---------------------------------------------------------------------------
+def bump_stack_resource_version(stack_ids) -> None:
+    """Invalidate the cached resource tree of each stack in *stack_ids*.
+
+    Runs inside the caller's transaction, so the new version becomes visible
+    together with the resource change that caused it.
+    """
+    stack_ids = {str(stack_id) for stack_id in stack_ids if stack_id}
+    if not stack_ids:
+        return
+    versions = StackResourceVersion.objects.filter(stack_id__in=stack_ids)
+    if versions.update(version=F("version") + 1) < len(stack_ids):
+        # First change for some stacks: create their rows at 0, then bump only those.
+        existing = set(versions.values_list("stack_id", flat=True))
+        missing = stack_ids - existing
+        StackResourceVersion.objects.bulk_create(
+            [StackResourceVersion(stack_id=stack_id) for stack_id in missing], ignore_conflicts=True,
+        )
+        StackResourceVersion.objects.filter(stack_id__in=missing).update(version=F("version") + 1)
+
+
+def summarize_resource_health(resources) -> dict:
+    """Count *resources* by health bucket (``healthy``/``degraded``/``failed``)."""
+    statuses = [r.status.lower() for r in resources]
+    healthy = sum(1 for s in statuses if s in HEALTHY_RESOURCE_STATUSES)
+    failed = sum(1 for s in statuses if s in FAILED_RESOURCE_STATUSES)
+    return {
+        "total_resources": len(statuses),
+        "healthy": healthy,
+        "degraded": len(statuses) - healthy - failed,
+        "failed": failed,
+    }
+
+
+def _resource_fragment_key(stack_id: str, version: int) -> str:
+    return f"stacks:resource-tree:{stack_id}:{version}"
+
+
+def _build_resource_fragments(stack_ids) -> dict[str, dict]:
+    """Serialize the resource tree and health summary of *stack_ids* in one query."""
+    from django.db.models import Prefetch
+    from stacks.resources.resource import Resource, ResourceDependency
+    from stacks.serializers import ResourceTreeSerializer
+
+    by_stack = {stack_id: [] for stack_id in stack_ids}
+    resources = (
+        Resource.objects
+        .filter(stack_id__in=by_stack)
+        .select_related("parent")
+        .prefetch_related(
+            Prefetch("dependencies", queryset=ResourceDependency.objects.select_related("depends_on"))
+        )
+        .order_by("index")
+    )
+    for resource in resources:
+        by_stack[resource.stack_id].append(resource)
+
+    return {
+        stack_id: {
+            "resource_tree": ResourceTreeSerializer().to_representation(stack_resources),
+            "health_summary": summarize_resource_health(stack_resources),
+        }
+        for stack_id, stack_resources in by_stack.items()
+    }
+
+
+def get_resource_fragments(versions: dict[str, int]) -> dict[str, dict]:
+    """Return ``{stack_id: {"resource_tree", "health_summary"}}`` for ``{stack_id: resource_version}``.
+
+    Fragments are cached per stack version, so this is one ``get_many`` when
+    everything is warm; stacks that miss are rebuilt together in a single
+    resource query.  The versions must be read before the resources, so a
+    fragment is never older than the version it is cached under.
+    """
+    keys = {stack_id: _resource_fragment_key(stack_id, version) for stack_id, version in versions.items()}
+    cached = cache.get_many(list(keys.values()))
+    fragments = {stack_id: cached[key] for stack_id, key in keys.items() if key in cached}
+
+    missing = [stack_id for stack_id in keys if stack_id not in fragments]
+    if missing:
+        built = _build_resource_fragments(missing)
+        cache.set_many({keys[stack_id]: built[stack_id] for stack_id in missing}, RESOURCE_TREE_CACHE_TIMEOUT)
+        fragments.update(built)
+    return fragments
+
+
+def resource_tree_etag(stack_id: str, version: int) -> str:
+    return f'"tree-{stack_id}-{version}"'
+
+
+def project_dashboard_etag(stack_rows) -> str:
+    """ETag over everything the project dashboard renders.
+
+    *stack_rows* are the per-stack tuples the dashboard shows (including
+    resource version), so any stack or resource change yields a new tag.
+    """
+    digest = hashlib.sha256(repr(sorted(stack_rows)).encode()).hexdigest()[:32]
+    return f'"dashboard-{digest}"'
+
+
 # ---------------------------------------------------------------------------
 # Source-code download
 # ---------------------------------------------------------------------------
-def download_stack_source(stack_id: str) -> tuple[bytes, str]:
-    """Download the source-code ZIP for *stack_id* from Azure Blob Storage.
+def download_stack_source(stack_id: str, range_header: str | None = None) -> SourceDownload:
+    """Open the source-code ZIP for *stack_id* in Azure Blob Storage for streaming.
 
-    Returns ``(file_bytes, file_name)``.
-    Raises ``NotFoundError`` if the stack doesn't exist and ``ServiceError``
-    on configuration or network problems.
+    The archive is read lazily in ``DOWNLOAD_CHUNK_BYTES`` pieces through the
+    shared ``BlobServiceClient``, so memory use does not grow with its size.
+    A single-range *range_header* (``bytes=start-end``) is honoured.
+
+    Returns a ``SourceDownload``.
+    Raises ``NotFoundError`` if the stack or archive doesn't exist,
+    ``RangeNotSatisfiableError`` for a range past the end of the archive, and
+    ``ServiceError`` on configuration or network problems.
     """
     try:
-        stack = Stack.objects.get(id=stack_id)
+        stack = Stack.objects.select_related("purchased_stack").get(id=stack_id)
     except Stack.DoesNotExist:
         raise NotFoundError("Stack not found.")
 
@@ -602,33 +1079,124 @@ def download_stack_source(stack_id: str) -> tuple[bytes, str]:
     )
 
     try:
-        container_client = (
-            BlobServiceClient.from_connection_string(conn_str)
-            .get_container_client(container)
-        )
-        download_stream = container_client.download_blob(file_name)
-        file_bytes = download_stream.readall()
+        blob_client = get_blob_service_client(conn_str).get_blob_client(container, file_name)
+        byte_range = None
+        if range_header:
+            size = blob_client.get_blob_properties().size
+            try:
+                byte_range = parse_range_header(range_header, size)
+            except ValueError:
+                raise RangeNotSatisfiableError(size)
+
+        if byte_range:
+            start, end = byte_range
+            stream = blob_client.download_blob(offset=start, length=end - start + 1)
+        else:
+            stream = blob_client.download_blob()
+            size = stream.size
+            start, end = 0, max(size - 1, 0)
+    except ServiceError:
+        raise
+    except ResourceNotFoundError:
+        raise NotFoundError("Source archive not found.")
     except Exception as exc:
         logger.exception("Failed to download blob %s from %s", file_name, container)
         raise ServiceError(
             f"Failed to download file from Azure Blob Storage: {exc}"
         )
 
-    return file_bytes, file_name
+    return SourceDownload(
+        file_name=file_name,
+        size=size,
+        start=start,
+        end=end,
+        partial=byte_range is not None,
+        chunks=_iter_blob_chunks(stream, file_name),
+    )
+
+
+def _iter_blob_chunks(stream, file_name: str) -> Iterator[bytes]:
+    """Yield *stream*'s chunks; a failure mid-response can only be logged."""
+    try:
+        yield from stream.chunks()
+    except Exception:
+        logger.exception("Blob stream for %s failed mid-download", file_name)
+        raise
 
 
 # ---------------------------------------------------------------------------
 # Source-code upload
 # ---------------------------------------------------------------------------
+def _source_archive_blob_name(digest: str) -> str:
+    """Content-addressed location of an uploaded source archive."""
+    return f"sources/sha256/{digest}.zip"
+
+
+def _copy_source_blob(target_client, source_url: str) -> None:
+    """Server-side copy *source_url* over *target_client*'s blob and wait for it.
+
+    Same-account copies normally complete synchronously; a ``pending`` copy
+    is polled until it succeeds.  Raises ``ServiceError`` if the copy fails
+    or is still pending after ``SOURCE_COPY_TIMEOUT_SECONDS`` (it is aborted
+    then), so callers never deploy a half-copied archive.
+    """
+    copy = target_client.start_copy_from_url(source_url)
+    copy_status = copy.get("copy_status")
+    deadline = time.monotonic() + SOURCE_COPY_TIMEOUT_SECONDS
+    while copy_status == "pending":
+        if time.monotonic() >= deadline:
+            try:
+                target_client.abort_copy(copy.get("copy_id"))
+            except Exception:
+                logger.exception("Failed to abort copy to %s", target_client.url)
+            raise ServiceError("Timed out publishing the source archive. Please try again.")
+        time.sleep(SOURCE_COPY_POLL_SECONDS)
+        copy_status = target_client.get_blob_properties().copy.status
+
+    if copy_status != "success":
+        logger.error("Copy of %s to %s ended as %s", source_url, target_client.url, copy_status)
+        raise ServiceError("Failed to publish the source archive. Please try again.")
+
+
+def _source_deploy_settled(stack_id: str) -> bool:
+    """True when the stack's newest APPLY is queued, running or succeeded.
+
+    A failed or timed-out deploy (or none at all) means re-uploading the
+    same archive should deploy it again rather than report "unchanged".
+    """
+    latest = (
+        Operation.objects
+        .filter(stack_id=stack_id, operation_type="APPLY")
+        .values_list("status", flat=True)
+        .first()
+    )
+    return latest in ("PENDING", "RUNNING", "SUCCEEDED")
+
+
+def clear_source_digest(stack_id: str) -> None:
+    """Forget which archive the stack runs, so the next upload is always deployed."""
+    Stack.objects.filter(pk=stack_id).update(source_digest="")
+
+
 def upload_source_code(uploaded_file: UploadedFile, stack_id: str) -> UploadResult:
     """Validate and upload *uploaded_file* to Azure Blob Storage.
 
+    Archives are content-addressed: the file is hashed (SHA-256) in chunks,
+    stored once under ``sources/sha256/<digest>.zip`` and the stack keeps a
+    pointer to its current digest in ``Stack.source_digest``.  Re-uploading
+    the archive the stack already runs writes nothing and returns
+    ``changed=False`` so the caller can skip the IaC apply, unless the last
+    apply failed.  When the digest changes, ``{stack_id}/user-files.zip`` is
+    refreshed with a server-side copy of the content-addressed blob; the
+    digest is cleared before the copy starts and recorded only once it has
+    succeeded.
+
     Returns an ``UploadResult`` on success.
     Raises ``ValidationError`` / ``NotFoundError`` / ``ServiceError`` on failure.
     """
     # 1. Validate the stack exists
     try:
-        Stack.objects.get(id=stack_id)
+        stack = Stack.objects.only("id", "source_digest").get(id=stack_id)
     except Stack.DoesNotExist:
         raise NotFoundError("Stack not found.")
 
@@ -660,40 +1228,224 @@ def upload_source_code(uploaded_file: UploadedFile, stack_id: str) -> UploadResu
     if not conn_str or not container:
         raise ServiceError("Azure storage configuration missing.")
 
-    # 6. Upload to Azure Blob Storage
-    try:
-        blob_service_client = BlobServiceClient.from_connection_string(conn_str)
-        container_client = blob_service_client.get_container_client(container)
+    # 6. Hash the archive; nothing to do if the stack already runs it
+    hasher = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        hasher.update(chunk)
+    uploaded_file.seek(0)
+    digest = hasher.hexdigest()
+
+    container_client = get_blob_service_client(conn_str).get_container_client(container)
+    blob_name = f"{stack_id}/user-files.zip"
+    blob_client = container_client.get_blob_client(blob_name)
 
-        blob_name = f"{stack_id}/user-files.zip"
-        blob_client = container_client.get_blob_client(blob_name)
+    if digest == stack.source_digest:
+        # The live blob already holds this archive; redeploy only if the last
+        # apply did not go through.
+        changed = not _source_deploy_settled(stack_id)
+        logger.info(
+            "Source code for stack %s unchanged (sha256 %s); skipping upload%s",
+            stack_id, digest, ", redeploying" if changed else "",
+        )
+        return UploadResult(blob_name=blob_name, blob_url=blob_client.url, digest=digest, changed=changed)
 
+    # 7. Store the archive by digest (once across all stacks) and point the
+    #    stack's blob at it
+    try:
+        archive_client = container_client.get_blob_client(_source_archive_blob_name(digest))
         file_stream = (
             uploaded_file.file if hasattr(uploaded_file, "file") else uploaded_file
         )
-        blob_client.upload_blob(file_stream, overwrite=True)
+        try:
+            archive_client.upload_blob(file_stream, overwrite=False)
+        except ResourceExistsError:
+            logger.info("Source archive %s already stored; reusing it", digest)
+
+        # Same-account copies are authorised by our own credentials and
+        # normally finish immediately; no bytes pass through this worker.
+        clear_source_digest(stack_id)
+        _copy_source_blob(blob_client, archive_client.url)
 
         logger.info(
-            "Source code uploaded for stack %s — blob: %s (%.2f MB)",
+            "Source code uploaded for stack %s — blob: %s (sha256 %s, %.2f MB)",
             stack_id,
             blob_name,
+            digest,
             uploaded_file.size / (1024 * 1024),
         )
+    except ServiceError:
+        raise
     except Exception:
         logger.exception("Failed uploading source zip to Azure for stack %s", stack_id)
         raise ServiceError("Failed to upload file. Please try again.")
 
+    Stack.objects.filter(pk=stack_id).update(source_digest=digest)
+    return UploadResult(blob_name=blob_name, blob_url=blob_client.url, digest=digest)
+
+
+def _source_upload_target(stack_id: str):
+    """Return ``(blob_service_client, container, blob_name)`` for *stack_id*'s live archive."""
+    try:
+        Stack.objects.only("id").get(id=stack_id)
+    except Stack.DoesNotExist:
+        raise NotFoundError("Stack not found.")
+
+    azure_cfg = getattr(settings, "AZURE", {})
+    conn_str = azure_cfg.get("STORAGE_CONNECTION_STRING")
+    container = azure_cfg.get("CONTAINER_NAME") or getattr(
+        settings, "CONTAINER_NAME", None
+    )
+    if not conn_str or not container:
+        raise ServiceError("Azure storage configuration missing.")
+
+    return get_blob_service_client(conn_str), container, f"{stack_id}/user-files.zip"
+
+
+def _staged_upload_blob_name(stack_id: str, upload_token: str) -> str:
+    """Per-upload staging blob that a direct upload writes to."""
+    if not isinstance(upload_token, str) or not _UPLOAD_TOKEN_RE.match(upload_token):
+        raise ValidationError("Invalid or missing upload token.")
+    return f"{stack_id}/uploads/{upload_token}.zip"
+
+
+def create_source_upload_url(stack_id: str) -> dict:
+    """Issue a short-lived, write-only SAS URL for uploading *stack_id*'s source ZIP.
+
+    The client uploads straight to Blob Storage (``Put Block`` in parallel,
+    then ``Put Block List``), so the archive never passes through a web
+    worker.  The SAS only grants access to a fresh staging blob
+    (``{stack_id}/uploads/<token>.zip``), never to the live
+    ``user-files.zip`` the IaC worker deploys from, so an abandoned or bad
+    upload cannot replace the current archive.  Blocks already staged
+    survive a dropped connection, so an interrupted upload can resume with
+    the same URL.  Call ``finalize_source_upload`` with the returned
+    ``upload_token`` once the block list is committed.
+
+    Raises ``NotFoundError`` if the stack doesn't exist and ``ServiceError``
+    when storage is not configured for account-key SAS signing.
+    """
+    client, container, _ = _source_upload_target(stack_id)
+
+    account_key = getattr(client.credential, "account_key", None)
+    if not account_key:
+        raise ServiceError("Direct uploads are not available for this storage account.", status_code=503)
+
+    upload_token = secrets.token_hex(16)
+    blob_name = _staged_upload_blob_name(stack_id, upload_token)
+    expires_at = timezone.now() + timedelta(seconds=SOURCE_UPLOAD_SAS_SECONDS)
+    sas_token = generate_blob_sas(
+        account_name=client.account_name,
+        container_name=container,
+        blob_name=blob_name,
+        account_key=account_key,
+        permission=BlobSasPermissions(create=True, write=True),
+        expiry=expires_at,
+    )
+
+    return {
+        "blob_name": blob_name,
+        "upload_token": upload_token,
+        "upload_url": f"{client.get_blob_client(container, blob_name).url}?{sas_token}",
+        "expires_at": expires_at.isoformat(),
+        "max_size_bytes": MAX_UPLOAD_SIZE_BYTES,
+        "block_size_bytes": SOURCE_UPLOAD_BLOCK_BYTES,
+    }
+
+
+def finalize_source_upload(stack_id: str, upload_token: str) -> UploadResult:
+    """Validate a directly uploaded source ZIP and make it the stack's live archive.
+
+    Checks the staging blob's size from its properties and its ZIP magic
+    bytes with a ranged read of the first four bytes; the archive itself is
+    never downloaded.  A staging blob that fails validation is deleted and
+    the live archive is left untouched.  A valid one is server-side copied
+    over ``{stack_id}/user-files.zip`` and then deleted.
+
+    Returns an ``UploadResult`` on success.
+    Raises ``ValidationError`` / ``NotFoundError`` / ``ServiceError`` on failure.
+    """
+    staged_name = _staged_upload_blob_name(stack_id, upload_token)
+    client, container, blob_name = _source_upload_target(stack_id)
+    staged_client = client.get_blob_client(container, staged_name)
+    blob_client = client.get_blob_client(container, blob_name)
+
+    try:
+        size = staged_client.get_blob_properties().size
+        header = (
+            staged_client.download_blob(offset=0, length=len(ZIP_MAGIC_BYTES)).readall()
+            if size >= len(ZIP_MAGIC_BYTES) else b""
+        )
+    except ResourceNotFoundError:
+        raise NotFoundError("No uploaded file found. Upload the archive before finalizing.")
+    except Exception:
+        logger.exception("Failed to inspect uploaded source zip for stack %s", stack_id)
+        raise ServiceError("Failed to verify the uploaded file. Please try again.")
+
+    error = None
+    if size > MAX_UPLOAD_SIZE_BYTES:
+        limit_mb = MAX_UPLOAD_SIZE_BYTES // (1024 * 1024)
+        actual_mb = round(size / (1024 * 1024), 2)
+        error = ValidationError(
+            f"File too large ({actual_mb} MB). Maximum allowed size is {limit_mb} MB.",
+            status_code=413,
+        )
+    elif header != ZIP_MAGIC_BYTES:
+        error = ValidationError("Invalid file format. Only ZIP archives are accepted.")
+
+    if error is not None:
+        try:
+            staged_client.delete_blob()
+        except Exception:
+            logger.exception("Failed to delete rejected upload %s", staged_name)
+        raise error
+
+    # The archive bypassed hashing, so the stored digest no longer describes
+    # the live blob once the copy starts.
+    clear_source_digest(stack_id)
+    try:
+        _copy_source_blob(blob_client, staged_client.url)
+    except ServiceError:
+        raise
+    except Exception:
+        logger.exception("Failed to publish uploaded source zip for stack %s", stack_id)
+        raise ServiceError("Failed to publish the uploaded file. Please try again.")
+
+    try:
+        staged_client.delete_blob()
+    except Exception:
+        logger.exception("Failed to delete staged upload %s", staged_name)
+
+    logger.info(
+        "Source code uploaded directly for stack %s — blob: %s (%.2f MB)",
+        stack_id,
+        blob_name,
+        size / (1024 * 1024),
+    )
     return UploadResult(blob_name=blob_name, blob_url=blob_client.url)
 
 
 # ---------------------------------------------------------------------------
 # Azure Service Bus messaging
 # ---------------------------------------------------------------------------
+def _build_queue_message(request_type: str, message_data: dict, operation_id: str | None = None) -> dict:
+    """Build the versioned envelope the IaC job expects on the queue."""
+    data: dict = {
+        "schema_version": 2,
+        "request_type": request_type,
+        "data": message_data,
+    }
+    if operation_id:
+        data["operation_id"] = operation_id
+    return data
+
+
 def send_to_queue(request_type: str, message_data: dict, operation_id: str | None = None) -> bool:
     """Send a message to Azure Service Bus.
 
     When *operation_id* is provided it is included at the top level of the
     message payload so the IaC job can track which operation it is processing.
+    Messages go out on the process-wide pooled sender, so repeated calls reuse
+    one AMQP connection instead of opening a new one per message.
 
     Returns ``True`` on success, ``False`` on failure.
     """
@@ -704,31 +1456,223 @@ def send_to_queue(request_type: str, message_data: dict, operation_id: str | Non
         logger.error("Azure Service Bus configuration is missing.")
         return False
 
-    data: dict = {
-        "schema_version": 2,
-        "request_type": request_type,
-        "data": message_data,
-    }
-    if operation_id:
-        data["operation_id"] = operation_id
+    data = _build_queue_message(request_type, message_data, operation_id)
 
     try:
-        with ServiceBusClient.from_connection_string(
-            service_bus_connection_str
-        ) as client:
-            with client.get_queue_sender(queue_name) as sender:
-                message = ServiceBusMessage(json.dumps(data))
-                sender.send_messages(message)
-                logger.info(
-                    "Successfully sent message to Azure Service Bus queue: %s",
-                    queue_name,
-                )
-                return True
+        get_sender_pool().send(
+            service_bus_connection_str,
+            queue_name,
+            [ServiceBusMessage(json.dumps(data))],
+        )
+        logger.info(
+            "Successfully sent message to Azure Service Bus queue: %s",
+            queue_name,
+        )
+        return True
     except Exception as exc:
         logger.error("Failed to send message to Azure Service Bus: %s", exc)
         return False
 
 
+def get_queue_stats() -> dict:
+    """Return send-latency and reconnect counters for the pooled Service Bus sender."""
+    return get_sender_pool().stats()
+
+
+# ---------------------------------------------------------------------------
+# Transactional outbox
+# ---------------------------------------------------------------------------
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_BASE_SECONDS = 15
+
+
+def enqueue_operation(stack_id: str, operation_type: str, request_type: str, message_data: dict) -> Operation:
+    """Create a PENDING operation and its outbox message in one transaction.
+
+    The message is dispatched once the surrounding transaction commits.  If
+    that send fails the row stays PENDING and a later ``dispatch_outbox`` run
+    retries it, so the operation is never orphaned.
+
+    Raises ``NotFoundError`` / ``ValidationError`` from ``create_operation``.
+    """
+    with transaction.atomic():
+        operation = create_operation(stack_id, operation_type)
+        OutboxMessage.objects.create(
+            operation=operation,
+            request_type=request_type,
+            body=_build_queue_message(request_type, message_data, str(operation.id)),
+        )
+        transaction.on_commit(_dispatch_outbox_after_commit)
+
+    return operation
+
+
+def _coalesce_pending_operation(
+    stack_id: str, operation_type: str, request_type: str, message_data: dict,
+) -> Operation | None:
+    """Fold a new request into the stack's queued operation of the same type.
+
+    Only the stack's newest PENDING operation is considered, so coalescing
+    never moves work ahead of something queued after it.  The stack row is
+    locked first so concurrent requests for one stack serialise here.  The
+    operation's outbox message is rewritten with *message_data*: an unsent
+    message goes out with it, and a worker claiming the operation gets it back
+    as the claim ``payload``.
+
+    Returns the coalesced operation, or ``None`` if a new one must be queued.
+    Call inside a transaction.
+    """
+    list(Stack.objects.select_for_update().filter(pk=stack_id).values_list("pk", flat=True))
+
+    latest = (
+        Operation.objects
+        .select_for_update()
+        .filter(stack_id=stack_id, status='PENDING')
+        .order_by("-created_at")
+        .first()
+    )
+    if latest is None or latest.operation_type != operation_type:
+        return None
+
+    OutboxMessage.objects.filter(operation=latest).update(
+        request_type=request_type,
+        body=_build_queue_message(request_type, message_data, str(latest.id)),
+    )
+    logger.info("Coalesced %s for stack %s into pending operation %s", request_type, stack_id, latest.pk)
+    return latest
+
+
+def enqueue_operations(items: list[tuple[Stack, str, str, dict]]) -> list[Operation]:
+    """Bulk variant of ``enqueue_operation`` for already-loaded stacks.
+
+    *items* is a list of ``(stack, operation_type, request_type, message_data)``
+    tuples.  All operations and outbox messages are inserted with two
+    ``bulk_create`` calls in one transaction, and a single dispatch runs after
+    commit.
+    """
+    valid_types = {c[0] for c in Operation.OPERATION_CHOICES}
+    for _stack, operation_type, _request_type, _data in items:
+        if operation_type not in valid_types:
+            raise ValidationError(f"Invalid operation type: {operation_type}")
+
+    with transaction.atomic():
+        operations = Operation.objects.bulk_create([
+            Operation(stack=stack, operation_type=operation_type)
+            for stack, operation_type, _request_type, _data in items
+        ])
+        OutboxMessage.objects.bulk_create([
+            OutboxMessage(
+                operation=operation,
+                request_type=request_type,
+                body=_build_queue_message(request_type, message_data, str(operation.id)),
+            )
+            for operation, (_stack, _type, request_type, message_data) in zip(operations, items)
+        ])
+        transaction.on_commit(_dispatch_outbox_after_commit)
+
+    return operations
+
+
+def _dispatch_outbox_after_commit() -> None:
+    """``on_commit`` hook — never let a dispatch failure escape into the request."""
+    try:
+        dispatch_outbox()
+    except Exception:
+        logger.exception("Outbox dispatch after commit failed; rows will be retried.")
+
+
+def _defer_outbox_messages(messages: list[OutboxMessage], error: str, now) -> tuple[int, int]:
+    """Reschedule *messages* after a failed send.
+
+    Messages that have used up ``OUTBOX_MAX_ATTEMPTS`` are marked FAILED and
+    their still-PENDING operations are failed too, so the stack does not wait
+    on work that will never be delivered.  Returns ``(retrying, failed)``.
+    """
+    exhausted_operation_ids: list[str] = []
+    for message in messages:
+        message.attempts += 1
+        message.last_error = error[:1000]
+        if message.attempts >= OUTBOX_MAX_ATTEMPTS:
+            message.status = 'FAILED'
+            if message.operation_id:
+                exhausted_operation_ids.append(message.operation_id)
+        else:
+            backoff = OUTBOX_RETRY_BASE_SECONDS * (2 ** (message.attempts - 1))
+            message.available_at = now + timedelta(seconds=backoff)
+
+    OutboxMessage.objects.bulk_update(
+        messages, ["attempts", "last_error", "status", "available_at"],
+    )
+
+    if exhausted_operation_ids:
+        Operation.objects.filter(pk__in=exhausted_operation_ids, status='PENDING').update(
+            status='FAILED',
+            error_message='IaC message could not be delivered to the service bus.',
+            completed_at=now,
+        )
+
+    failed = len(exhausted_operation_ids)
+    return len(messages) - failed, failed
+
+
+def dispatch_outbox(max_batches: int = 10) -> dict:
+    """Send due PENDING outbox messages to Service Bus in batches.
+
+    Rows are locked with ``SKIP LOCKED`` so concurrent dispatchers never send
+    the same message twice.  Each batch of up to ``OUTBOX_BATCH_SIZE`` rows is
+    sent via ``ServiceBusMessageBatch`` on the pooled sender.
+
+    Returns ``{"sent": int, "retrying": int, "failed": int}``.
+    """
+    result = {"sent": 0, "retrying": 0, "failed": 0}
+
+    service_bus_connection_str = settings.AZURE_SERVICE_BUS.get("CONNECTION_STRING")
+    queue_name = settings.AZURE_SERVICE_BUS.get("QUEUE_NAME")
+    if not service_bus_connection_str or not queue_name:
+        logger.error("Azure Service Bus configuration is missing; outbox not dispatched.")
+        return result
+
+    for _ in range(max_batches):
+        now = timezone.now()
+        with transaction.atomic():
+            messages = list(
+                OutboxMessage.objects
+                .select_for_update(skip_locked=True)
+                .filter(status='PENDING', available_at__lte=now)
+                .order_by("created_at")[:OUTBOX_BATCH_SIZE]
+            )
+            if not messages:
+                break
+
+            try:
+                get_sender_pool().send_batch(
+                    service_bus_connection_str,
+                    queue_name,
+                    [json.dumps(message.body) for message in messages],
+                )
+            except Exception as exc:
+                logger.error("Outbox batch of %d message(s) failed to send: %s", len(messages), exc)
+                retrying, failed = _defer_outbox_messages(messages, str(exc), now)
+                result["retrying"] += retrying
+                result["failed"] += failed
+                break
+
+            OutboxMessage.objects.filter(pk__in=[m.pk for m in messages]).update(
+                status='SENT',
+                sent_at=timezone.now(),
+                attempts=F("attempts") + 1,
+            )
+            result["sent"] += len(messages)
+
+        if len(messages) < OUTBOX_BATCH_SIZE:
+            break
+
+    if result["sent"]:
+        logger.info("Dispatched %d outbox message(s) to queue %s", result["sent"], queue_name)
+    return result
+
+
 # ---------------------------------------------------------------------------
 # IAC deployment helper
 # ---------------------------------------------------------------------------
@@ -736,12 +1680,10 @@ class DeployBoxIAC:
     """Triggers IAC deployment via the Azure Service Bus."""
 
     def deploy(self, stack_id: str, resource_group: str, iac_state: dict) -> None:
-        operation = create_operation(stack_id, "DEPLOY")
-        if not send_to_queue("IAC.DEPLOY", {
+        enqueue_operation(stack_id, "DEPLOY", "IAC.DEPLOY", {
             "resource_group": resource_group,
             "iac_state": iac_state,
-        }, operation_id=str(operation.id)):
-            raise ServiceError("Failed to send deployment to service bus.")
+        })
 
 
 # ---------------------------------------------------------------------------
@@ -796,6 +1738,69 @@ def update_stack_iac_only(stack_id: str, new_iac_state: dict) -> bool:
         return False
 
 
+# ---------------------------------------------------------------------------
+# Stack events — feed behind the dashboard event stream
+# ---------------------------------------------------------------------------
+STACK_EVENT_RETENTION = timedelta(days=1)
+STACK_EVENT_BATCH_SIZE = 200
+
+
+def _record_stack_event(stack_id: str, kind: str, data: dict, chunk: DeploymentLogChunk | None = None) -> None:
+    """Append an event to the stack's feed.  Call inside the writing transaction."""
+    StackEvent.objects.create(stack_id=stack_id, kind=kind, data=data, chunk=chunk)
+
+
+def _operation_event_data(op: Operation, stack_status: str | None = None) -> dict:
+    return {
+        "operation_id": str(op.id),
+        "operation_type": op.operation_type,
+        "status": op.status,
+        "error_message": op.error_message,
+        "stack_status": stack_status,
+    }
+
+
+def get_latest_stack_event_id(stack_id: str) -> int:
+    """Return the id of the newest event for *stack_id* (0 if none)."""
+    latest = (
+        StackEvent.objects
+        .filter(stack_id=stack_id)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    )
+    return latest or 0
+
+
+def get_stack_events(stack_id: str, after_id: int, limit: int = STACK_EVENT_BATCH_SIZE) -> list[dict]:
+    """Return up to *limit* events for *stack_id* newer than *after_id*, oldest first.
+
+    Each entry has ``id``, ``event`` (``log``, ``log_status`` or
+    ``operation``) and ``data``.  Log events carry their new ``lines``.
+    """
+    events = (
+        StackEvent.objects
+        .filter(stack_id=stack_id, id__gt=after_id)
+        .select_related("chunk")
+        .order_by("id")[:limit]
+    )
+    result = []
+    for event in events:
+        data = dict(event.data)
+        if event.chunk is not None:
+            data["lines"] = event.chunk.text.split("\n")[:-1]
+        result.append({"id": event.id, "event": event.kind.lower(), "data": data})
+    return result
+
+
+def _prune_stack_events(stack_id: str) -> int:
+    """Delete events older than ``STACK_EVENT_RETENTION``.  Returns the count."""
+    deleted, _ = StackEvent.objects.filter(
+        stack_id=stack_id, created_at__lt=timezone.now() - STACK_EVENT_RETENTION,
+    ).delete()
+    return deleted
+
+
 # ---------------------------------------------------------------------------
 # Deployment Logs
 # ---------------------------------------------------------------------------
@@ -817,19 +1822,26 @@ def create_deployment_log(stack_id: str, operation: str) -> dict:
     if operation not in valid_operations:
         raise ValidationError(f"Invalid operation: {operation}")
 
-    log = DeploymentLog.objects.create(stack=stack, operation=operation)
+    with transaction.atomic():
+        log = DeploymentLog.objects.create(stack=stack, operation=operation)
+        _record_stack_event(
+            stack.pk, "LOG_STATUS",
+            {"log_id": str(log.id), "operation": log.operation, "status": log.status},
+        )
 
     _cleanup_old_deployment_logs(stack_id)
+    _prune_stack_events(stack_id)
 
     return {"id": str(log.id), "operation": log.operation, "status": log.status}
 
 
 def append_deployment_log(log_id: str, text: str) -> bool:
-    """Atomically append text to a deployment log.
+    """Append text to a deployment log as a new chunk.
 
-    Uses ``Concat`` + ``F()`` for a single UPDATE query — safe under
-    concurrent reads with no read-modify-write race.  Returns ``True``
-    on success, ``False`` if the log doesn't exist or isn't RUNNING.
+    Locks the log row, inserts one ``DeploymentLogChunk`` and bumps the
+    line/chunk counters, so the cost is proportional to *text* rather than
+    to the size of the log.  Returns ``True`` on success, ``False`` if the
+    log doesn't exist or isn't RUNNING.
     """
     if not text:
         return True
@@ -838,13 +1850,34 @@ def append_deployment_log(log_id: str, text: str) -> bool:
     if not text.endswith("\n"):
         text += "\n"
 
-    updated = DeploymentLog.objects.filter(
-        pk=log_id, status="RUNNING"
-    ).update(
-        log_text=Concat(F("log_text"), models.Value(text)),
-        line_count=F("line_count") + new_lines,
-    )
-    return updated > 0
+    with transaction.atomic():
+        counters = (
+            DeploymentLog.objects
+            .select_for_update()
+            .filter(pk=log_id, status="RUNNING")
+            .values("stack_id", "line_count", "chunk_count")
+            .first()
+        )
+        if counters is None:
+            return False
+
+        chunk = DeploymentLogChunk.objects.create(
+            log_id=log_id,
+            seq=counters["chunk_count"],
+            start_line=counters["line_count"],
+            end_line=counters["line_count"] + new_lines,
+            text=text,
+        )
+        DeploymentLog.objects.filter(pk=log_id).update(
+            line_count=F("line_count") + new_lines,
+            chunk_count=F("chunk_count") + 1,
+        )
+        _record_stack_event(
+            counters["stack_id"], "LOG",
+            {"log_id": log_id, "start_line": counters["line_count"]},
+            chunk=chunk,
+        )
+    return True
 
 
 def complete_deployment_log(log_id: str, final_status: str = "COMPLETED") -> bool:
@@ -855,12 +1888,19 @@ def complete_deployment_log(log_id: str, final_status: str = "COMPLETED") -> boo
     if final_status not in ("COMPLETED", "FAILED"):
         raise ValidationError(f"Invalid final status: {final_status}")
 
-    updated = DeploymentLog.objects.filter(
-        pk=log_id, status="RUNNING"
-    ).update(
-        status=final_status,
-        completed_at=timezone.now(),
-    )
+    with transaction.atomic():
+        updated = DeploymentLog.objects.filter(
+            pk=log_id, status="RUNNING"
+        ).update(
+            status=final_status,
+            completed_at=timezone.now(),
+        )
+        if updated:
+            log = DeploymentLog.objects.only("stack_id", "operation").get(pk=log_id)
+            _record_stack_event(
+                log.stack_id, "LOG_STATUS",
+                {"log_id": log_id, "operation": log.operation, "status": final_status},
+            )
     return updated > 0
 
 
@@ -889,24 +1929,33 @@ def get_deployment_log_content(log_id: str, after_line: int = 0):
     """Return a deployment log's content, optionally from a line offset.
 
     Returns ``None`` if the log doesn't exist.  The ``lines`` key contains
-    only lines after the given offset for efficient polling.
+    only lines after the given offset; only chunks ending past the offset
+    are read, so polling cost tracks the new output, not the whole log.
     """
     log = DeploymentLog.objects.filter(pk=log_id).first()
     if not log:
         return None
 
-    all_lines = log.log_text.split("\n") if log.log_text else []
-    # Remove trailing empty string from final newline
-    if all_lines and all_lines[-1] == "":
-        all_lines = all_lines[:-1]
+    chunks = list(
+        DeploymentLogChunk.objects
+        .filter(log_id=log_id, end_line__gt=after_line)
+        .order_by("seq")
+        .values_list("start_line", "text")
+    )
 
-    new_lines = all_lines[after_line:] if after_line < len(all_lines) else []
+    new_lines: list[str] = []
+    if chunks:
+        first_line = chunks[0][0]
+        new_lines = "".join(text for _, text in chunks).split("\n")[:-1]
+        new_lines = new_lines[max(after_line - first_line, 0):]
 
     return {
         "id": str(log.id),
         "operation": log.operation,
         "status": log.status,
-        "line_count": len(all_lines),
+        # Chunks committed after ``log`` was read are included in ``lines``,
+        # so report the offset the caller should resume from.
+        "line_count": after_line + len(new_lines) if new_lines else log.line_count,
         "after_line": after_line,
         "lines": new_lines,
         "started_at": log.started_at.isoformat(),
@@ -930,14 +1979,16 @@ def _cleanup_old_deployment_logs(stack_id: str) -> int:
     if not ids_to_delete:
         return 0
 
-    deleted, _ = DeploymentLog.objects.filter(id__in=ids_to_delete).delete()
-    return deleted
+    # Chunks cascade with their log; count only the logs themselves.
+    _, deleted_per_model = DeploymentLog.objects.filter(id__in=ids_to_delete).delete()
+    return deleted_per_model.get(DeploymentLog._meta.label, 0)
 
 
 # ---------------------------------------------------------------------------
 # Operations — lifecycle management
 # ---------------------------------------------------------------------------
-DEFAULT_LEASE_SECONDS = 1800  # 30 minutes
+DEFAULT_LEASE_SECONDS = 120  # workers renew via heartbeat_operation
+OPERATION_TIMEOUT_BATCH_SIZE = 500
 
 
 def create_operation(stack_id: str, operation_type: str) -> Operation:
@@ -1005,18 +2056,69 @@ def claim_operation(operation_id: str, attempt_id: str, lease_duration_seconds:
                 status_code=409,
             )
 
-        # Claim it
-        op.status = 'RUNNING'
-        op.attempt_id = attempt_id
-        op.started_at = now
-        op.lease_expires_at = lease_expires
-        op.save()
+        return _start_operation(op, attempt_id, now, lease_expires)
+
+
+def claim_next_operation(attempt_id: str, lease_duration_seconds: int = DEFAULT_LEASE_SECONDS) -> dict | None:
+    """Claim the oldest runnable PENDING operation across all stacks.
+
+    An operation is runnable when its stack has no RUNNING operation and no
+    older PENDING one, so the per-stack ordering that ``claim_operation``
+    enforces still holds.  The candidate row is locked with ``SKIP LOCKED``:
+    concurrent workers each get a different operation instead of blocking or
+    racing for the same one.
+
+    Returns the same dict as ``claim_operation``, or ``None`` when there is
+    nothing to run.
+    """
+    now = timezone.now()
+    lease_expires = now + timedelta(seconds=lease_duration_seconds)
+
+    running_on_stack = Operation.objects.filter(stack_id=OuterRef("stack_id"), status='RUNNING')
+    older_pending = Operation.objects.filter(
+        stack_id=OuterRef("stack_id"), status='PENDING', created_at__lt=OuterRef("created_at"),
+    )
+
+    with transaction.atomic():
+        op = (
+            Operation.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='PENDING')
+            .filter(~Exists(running_on_stack), ~Exists(older_pending))
+            .order_by("created_at")
+            .first()
+        )
+        if op is None:
+            return None
+
+        return _start_operation(op, attempt_id, now, lease_expires)
+
+
+def _start_operation(op: Operation, attempt_id: str, now, lease_expires) -> dict:
+    """Move a locked PENDING *op* to RUNNING.  Call inside the locking transaction."""
+    op.status = 'RUNNING'
+    op.attempt_id = attempt_id
+    op.started_at = now
+    op.lease_expires_at = lease_expires
+    op.save()
+    _record_stack_event(op.stack_id, "OPERATION", _operation_event_data(op))
+
+    # Latest payload for the operation; newer than the queued message when
+    # later requests were coalesced into it.
+    body = (
+        OutboxMessage.objects
+        .filter(operation=op)
+        .order_by("-created_at")
+        .values_list("body", flat=True)
+        .first()
+    )
 
     return {
         "operation_id": str(op.id),
         "stack_id": str(op.stack_id),
         "operation_type": op.operation_type,
         "lease_expires_at": lease_expires.isoformat(),
+        "payload": body["data"] if body else None,
     }
 
 
@@ -1058,15 +2160,18 @@ def complete_operation(operation_id: str, attempt_id: str, status: str, error_me
         op.save()
 
         # Derive stack status from operation type + result (not from worker input)
+        new_stack_status = None
         if status == 'SUCCEEDED':
             new_stack_status = Operation.SUCCESS_STATUS_MAP.get(op.operation_type)
             if new_stack_status:
                 Stack.objects.filter(pk=op.stack_id).update(status=new_stack_status)
         elif status == 'FAILED':
+            new_stack_status = 'Error'
             Stack.objects.filter(pk=op.stack_id).update(
                 status='Error',
                 error_message=error_message[:500] if error_message else '',
             )
+        _record_stack_event(op.stack_id, "OPERATION", _operation_event_data(op, new_stack_status))
 
     return {
         "operation_id": str(op.id),
@@ -1075,6 +2180,45 @@ def complete_operation(operation_id: str, attempt_id: str, status: str, error_me
     }
 
 
+def heartbeat_operation(operation_id: str, attempt_id: str, lease_duration_seconds: int = DEFAULT_LEASE_SECONDS) -> dict:
+    """Extend the lease of a RUNNING operation held by *attempt_id*.
+
+    Workers call this periodically while a long apply is in progress, so the
+    claim lease can stay short and crashed workers are detected quickly by
+    ``timeout_stale_operations``.  The renewal is a single conditional UPDATE.
+
+    Returns a dict with the new ``lease_expires_at``.
+    Raises ``NotFoundError`` if the operation doesn't exist.
+    Raises ``ValidationError`` (409) if it is no longer RUNNING or is held by
+    another attempt.
+    """
+    now = timezone.now()
+    lease_expires = now + timedelta(seconds=lease_duration_seconds)
+
+    renewed = Operation.objects.filter(
+        pk=operation_id, status='RUNNING', attempt_id=attempt_id,
+    ).update(lease_expires_at=lease_expires, updated_at=now)
+
+    if not renewed:
+        op = Operation.objects.filter(pk=operation_id).only("status", "attempt_id").first()
+        if op is None:
+            raise NotFoundError("Operation not found.")
+        if op.status != 'RUNNING':
+            raise ValidationError(
+                f"Operation lease cannot be renewed (current status: {op.status}).",
+                status_code=409,
+            )
+        raise ValidationError(
+            "attempt_id does not match the claiming worker.",
+            status_code=409,
+        )
+
+    return {
+        "operation_id": str(operation_id),
+        "lease_expires_at": lease_expires.isoformat(),
+    }
+
+
 def get_stack_operations(stack_id: str, limit: int = 20) -> list[dict]:
     """Return recent operations for a stack."""
     try:
@@ -1097,31 +2241,58 @@ def get_stack_operations(stack_id: str, limit: int = 20) -> list[dict]:
     ]
 
 
-def timeout_stale_operations() -> int:
+def timeout_stale_operations(max_batches: int = 20) -> dict:
     """Mark RUNNING operations past their lease as TIMED_OUT.
 
-    Called periodically (e.g. by crontainer) to recover stuck stacks.
-    Returns the number of operations timed out.
+    Called periodically (e.g. by crontainer) to recover stuck stacks.  Expired
+    operations are swept set-wise in batches of up to
+    ``OPERATION_TIMEOUT_BATCH_SIZE``: each batch locks its rows with
+    ``SKIP LOCKED`` (so a concurrent sweeper or a worker completing an
+    operation is never waited on), then issues one UPDATE for the operations,
+    one for their stacks and one INSERT for the stack events.
+
+    Returns ``{"timed_out": int, "elapsed_seconds": float}``.
     """
+    started = time.monotonic()
     now = timezone.now()
-    stale_ops = Operation.objects.filter(
-        status='RUNNING',
-        lease_expires_at__lt=now,
-    )
+    error_message = 'Operation exceeded lease duration and was marked as timed out.'
     count = 0
-    for op in stale_ops:
-        with transaction.atomic():
-            locked_op = Operation.objects.select_for_update().get(pk=op.pk)
-            if locked_op.status == 'RUNNING' and locked_op.lease_expires_at and locked_op.lease_expires_at < now:
-                locked_op.status = 'TIMED_OUT'
-                locked_op.completed_at = now
-                locked_op.error_message = 'Operation exceeded lease duration and was marked as timed out.'
-                locked_op.save()
-                Stack.objects.filter(pk=locked_op.stack_id).update(
-                    status='Error',
-                    error_message='IaC operation timed out.',
-                )
-                count += 1
-                logger.warning("Timed out stale operation %s for stack %s", op.pk, op.stack_id)
 
-    return count
+    for _ in range(max_batches):
+        with transaction.atomic():
+            stale = list(
+                Operation.objects
+                .select_for_update(skip_locked=True)
+                .filter(status='RUNNING', lease_expires_at__lt=now)
+                .order_by("lease_expires_at")
+                .only("id", "stack_id", "operation_type")[:OPERATION_TIMEOUT_BATCH_SIZE]
+            )
+            if not stale:
+                break
+
+            Operation.objects.filter(pk__in=[op.pk for op in stale]).update(
+                status='TIMED_OUT',
+                completed_at=now,
+                error_message=error_message,
+                updated_at=now,
+            )
+            Stack.objects.filter(pk__in={op.stack_id for op in stale}).update(
+                status='Error',
+                error_message='IaC operation timed out.',
+            )
+            for op in stale:
+                op.status = 'TIMED_OUT'
+                op.error_message = error_message
+            StackEvent.objects.bulk_create([
+                StackEvent(stack_id=op.stack_id, kind="OPERATION", data=_operation_event_data(op, 'Error'))
+                for op in stale
+            ])
+
+        count += len(stale)
+        if len(stale) < OPERATION_TIMEOUT_BATCH_SIZE:
+            break
+
+    elapsed = time.monotonic() - started
+    if count:
+        logger.warning("Timed out %d stale operation(s) in %.2fs", count, elapsed)
+    return {"timed_out": count, "elapsed_seconds": elapsed}
@@ -0,0 +1,58 @@
+"""Model signal handlers for the stacks app."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from stacks.metrics.models import MetricUsageRecord
+from stacks.resources.resource import Resource, ResourceDependency
+from stacks.services import (
+    EDGE_RESOURCE_TYPE, bump_edge_config_version, bump_stack_resource_version, refresh_daily_usage,
+)
+
+
+@receiver([post_save, post_delete], sender=Resource)
+def invalidate_traefik_config(sender, instance, **kwargs):
+    """Bump the edge config version whenever an edge resource is written or removed.
+
+    Also fires for edges removed by a cascading stack delete.
+    """
+    if instance.resource_type == EDGE_RESOURCE_TYPE:
+        bump_edge_config_version()
+
+
+def _deleted_with_stack(origin) -> bool:
+    """True when a delete cascaded from something above the resource tree (stack, project, ...).
+
+    The stack is going away too, so there is no tree left to invalidate and
+    creating its version row would violate the cascade.
+    """
+    model = getattr(origin, "model", type(origin))
+    return origin is not None and model not in (Resource, ResourceDependency)
+
+
+@receiver([post_save, post_delete], sender=Resource)
+def invalidate_resource_tree(sender, instance, origin=None, **kwargs):
+    """Bump the owning stack's resource version so its cached tree is rebuilt."""
+    if not _deleted_with_stack(origin):
+        bump_stack_resource_version([instance.stack_id])
+
+
+@receiver([post_save, post_delete], sender=ResourceDependency)
+def invalidate_resource_tree_dependency(sender, instance, origin=None, **kwargs):
+    """Dependencies are rendered in the tree too; bump the stack that owns them."""
+    if not _deleted_with_stack(origin):
+        stack_ids = Resource.objects.filter(pk=instance.resource_id).values_list("stack_id", flat=True)
+        bump_stack_resource_version(stack_ids)
+
+
+@receiver(post_save, sender=MetricUsageRecord)
+def refresh_usage_rollup(sender, instance, **kwargs):
+    """Keep the day's ``DailyMetricUsage`` row in step with a saved record.
+
+    Deletes are deliberately not propagated: archiving old raw records must
+    leave the rollup (and therefore billing history) intact.
+    """
+    refresh_daily_usage([
+        (instance.stack_id, instance.metric_definition_id, timezone.localdate(instance.usage_datetime)),
+    ])
@@ -0,0 +1,125 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from payments.models import RateCard
+
+from stacks.metrics.models import MetricDefinition, MetricUsageRecord
+from stacks.models import Stack, PurchasableStack, Operation, OutboxMessage
+from stacks.resources.resources_manager import ResourcesManager
+from stacks.services import check_and_auto_pause_stacks
+from projects.models import Project
+from organizations.models import Organization
+
+
+class CheckAndAutoPauseStacksTestCase(TestCase):
+    def setUp(self):
+        self.purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_pause",
+        )
+        self.metric = MetricDefinition.objects.create(
+            name="compute", applicable_resources=[], unit_name="Credits", record_frequency_cron="0 * * * *",
+        )
+        RateCard.objects.create(metric_definition=self.metric, pricing_model="per_unit", price_per_unit=Decimal("1"))
+
+    def _make_org(self, name, cost, allowance="10.00", auto_pause=True, stacks=1):
+        organization = Organization.objects.create(
+            name=name,
+            monthly_credit_allowance=Decimal(allowance),
+            auto_pause_on_limit=auto_pause,
+        )
+        project = Project.objects.create(name=f"{name} project", organization=organization)
+        created = []
+        for i in range(stacks):
+            stack = Stack.objects.create(
+                name=f"{name} stack {i}",
+                project=project,
+                purchased_stack=self.purchasable_stack,
+                status="Ready",
+            )
+            MetricUsageRecord.objects.create(
+                metric_definition=self.metric, stack=stack, resource="app",
+                amount_used=Decimal(cost) / stacks, usage_datetime=timezone.now(),
+            )
+            ResourcesManager.add_resource(stack, "AZURERM_RESOURCE_GROUP")
+            created.append(stack)
+        return organization, created
+
+    def test_pauses_only_over_limit_organizations(self):
+        _, over_stacks = self._make_org("Over", cost="12.00", stacks=2)
+        _, under_stacks = self._make_org("Under", cost="5.00")
+        _, opted_out = self._make_org("OptedOut", cost="50.00", auto_pause=False)
+
+        result = check_and_auto_pause_stacks()
+
+        self.assertEqual(sorted(result["paused"]), sorted(s.pk for s in over_stacks))
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(
+            Operation.objects.filter(operation_type="PAUSE").count(), len(over_stacks)
+        )
+        self.assertFalse(Operation.objects.filter(stack__in=under_stacks + opted_out).exists())
+
+    def test_message_payload_matches_pause_stack(self):
+        _, (stack,) = self._make_org("Over", cost="10.00")
+
+        check_and_auto_pause_stacks()
+
+        message = OutboxMessage.objects.get(operation__stack=stack)
+        expected = ResourcesManager.serialize(ResourcesManager.get_from_stack(stack))
+        self.assertEqual(message.request_type, "IAC.PAUSE")
+        self.assertEqual(message.body["data"], {"stack_id": stack.pk, "resources": expected})
+
+    def test_skips_stacks_that_are_not_ready(self):
+        _, (stack,) = self._make_org("Over", cost="20.00")
+        Stack.objects.filter(pk=stack.pk).update(status="Paused")
+
+        result = check_and_auto_pause_stacks()
+
+        self.assertEqual(result, {"paused": [], "errors": []})
+
+    def test_query_count_is_independent_of_organization_count(self):
+        self._make_org("Over 1", cost="20.00")
+        self._make_org("Under 1", cost="1.00")
+        with CaptureQueriesContext(connection) as small:
+            check_and_auto_pause_stacks()
+        Operation.objects.all().delete()
+        Stack.objects.update(status="Ready")
+
+        for i in range(2, 7):
+            self._make_org(f"Over {i}", cost="20.00", stacks=2)
+            self._make_org(f"Under {i}", cost="1.00")
+        with CaptureQueriesContext(connection) as large:
+            result = check_and_auto_pause_stacks()
+
+        self.assertEqual(len(result["paused"]), 11)
+        self.assertEqual(len(small), len(large))
+
+    def test_cost_comes_from_priced_month_to_date_usage(self):
+        organization, (stack,) = self._make_org("Tiered", cost="0.00", allowance="10.00")
+        tiered = MetricDefinition.objects.create(
+            name="egress", applicable_resources=[], unit_name="GB", record_frequency_cron="0 * * * *",
+        )
+        RateCard.objects.create(
+            metric_definition=tiered, pricing_model="tiered",
+            tiered_pricing_json=[{"up_to": 100, "price_per_unit": 0}, {"up_to": None, "price_per_unit": 1}],
+        )
+        # Usage from last month never counts against this month's allowance.
+        MetricUsageRecord.objects.create(
+            metric_definition=tiered, stack=stack, resource="cdn", amount_used=Decimal("500"),
+            usage_datetime=timezone.now().replace(day=1) - timedelta(days=1),
+        )
+        MetricUsageRecord.objects.create(
+            metric_definition=tiered, stack=stack, resource="cdn", amount_used=Decimal("105"),
+            usage_datetime=timezone.now(),
+        )
+        self.assertEqual(check_and_auto_pause_stacks()["paused"], [])
+
+        MetricUsageRecord.objects.create(
+            metric_definition=tiered, stack=stack, resource="cdn-2", amount_used=Decimal("5"),
+            usage_datetime=timezone.now(),
+        )
+        self.assertEqual(check_and_auto_pause_stacks()["paused"], [stack.pk])
@@ -4,7 +4,7 @@ from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from unittest.mock import patch, MagicMock
 
-from stacks.models import Stack, PurchasableStack
+from stacks.models import Stack, PurchasableStack, OutboxMessage
 from stacks.resources.resources_manager import ResourcesManager, RESOURCE_MANAGER_MAPPING
 from stacks.resources.resource import Resource, ResourceDependency
 from stacks.resources.type_registry import ResourceTypeRegistry
@@ -266,8 +266,7 @@ class CustomStackAPITestCase(_StackTestMixin, APITestCase):
         self.assertIn("AZURERM_CONTAINER_APP", types)
         self.assertIn("AZURERM_LINUX_VIRTUAL_MACHINE", types)
 
-    @patch("stacks.services.send_to_queue", return_value=True)
-    def test_add_resource_with_auto_deploy(self, mock_queue):
+    def test_add_resource_with_auto_deploy(self):
         url = reverse("stacks:stack-add_resource", kwargs={"pk": str(self.stack.pk)})
         response = self.client.post(
             url,
@@ -275,10 +274,11 @@ class CustomStackAPITestCase(_StackTestMixin, APITestCase):
             format="json",
         )
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        mock_queue.assert_called_once()
+        self.assertEqual(
+            OutboxMessage.objects.filter(operation__stack=self.stack, request_type="IAC.APPLY").count(), 1
+        )
 
-    @patch("stacks.services.send_to_queue", return_value=True)
-    def test_remove_resource_with_auto_deploy(self, mock_queue):
+    def test_remove_resource_with_auto_deploy(self):
         resource = ResourcesManager.add_resource(self.stack, "AZURERM_CONTAINER_APP")
         url = reverse("stacks:stack-remove_resource", kwargs={"pk": str(self.stack.pk)})
         response = self.client.post(
@@ -287,7 +287,9 @@ class CustomStackAPITestCase(_StackTestMixin, APITestCase):
             format="json",
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        mock_queue.assert_called_once()
+        self.assertEqual(
+            OutboxMessage.objects.filter(operation__stack=self.stack, request_type="IAC.APPLY").count(), 1
+        )
 
     def test_unauthenticated_add_resource_rejected(self):
         self.client.logout()
@@ -687,6 +689,35 @@ class UnifiedBulkUpdateTestCase(_StackTestMixin, TestCase):
         self.assertEqual(updated.attributes["revision_mode"], "Multiple")
         self.assertEqual(updated.attributes["ingress_target_port"], 8080)
 
+    def test_bulk_update_uses_constant_queries_and_skips_unchanged(self):
+        """One SELECT and one UPDATE (plus the tree version bump) regardless of batch size; unchanged rows are not written."""
+        from stacks.services import bulk_update_resources
+        apps = [ResourcesManager.add_resource(self.stack, "AZURERM_CONTAINER_APP") for _ in range(5)]
+        before = Resource.objects.get(pk=apps[0].pk).updated_at
+
+        payload = [{"id": apps[0].pk, "status": apps[0].status}]
+        payload += [{"id": app.pk, "status": "Running"} for app in apps[1:]]
+        payload.append({"id": "res_missing", "status": "Running"})
+        with self.assertNumQueries(5):  # SELECT, SAVEPOINT, UPDATE, version bump, RELEASE
+            bulk_update_resources(payload)
+
+        self.assertEqual(Resource.objects.get(pk=apps[0].pk).updated_at, before)
+        self.assertEqual(
+            Resource.objects.filter(stack=self.stack, status="Running").count(), 4,
+        )
+
+    def test_bulk_update_edge_bumps_traefik_version(self):
+        """Edge changes invalidate the Traefik config even though post_save is skipped."""
+        from stacks.services import bulk_update_resources, get_edge_config_version
+        edge = ResourcesManager.add_resource(self.stack, "DEPLOYBOXRM_EDGE", {"subdomain": "shop"})
+        version = get_edge_config_version()
+
+        bulk_update_resources([{"id": edge.pk, "subdomain": "shop"}])
+        self.assertEqual(get_edge_config_version(), version)
+
+        bulk_update_resources([{"id": edge.pk, "subdomain": "store"}])
+        self.assertGreater(get_edge_config_version(), version)
+
 
 class CompatSerializerTestCase(_StackTestMixin, TestCase):
     """Tests for the compatibility serializer directly."""
@@ -0,0 +1,72 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from stacks import services
+from stacks.models import Stack, PurchasableStack, DeploymentLog, DeploymentLogChunk
+from projects.models import Project
+from organizations.models import Organization
+
+
+class DeploymentLogChunkTestCase(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Log Org")
+        project = Project.objects.create(name="Log Project", organization=organization)
+        purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_log",
+        )
+        self.stack = Stack.objects.create(
+            name="Log Stack", project=project, purchased_stack=purchasable_stack,
+        )
+        self.log_id = services.create_deployment_log(str(self.stack.pk), "APPLY")["id"]
+
+    def test_append_writes_chunks_with_line_offsets(self):
+        services.append_deployment_log(self.log_id, "one\ntwo\n")
+        services.append_deployment_log(self.log_id, "three")
+
+        chunks = list(DeploymentLogChunk.objects.filter(log_id=self.log_id).values_list(
+            "seq", "start_line", "end_line", "text",
+        ))
+        self.assertEqual(chunks, [(0, 0, 2, "one\ntwo\n"), (1, 2, 3, "three\n")])
+        log = DeploymentLog.objects.get(pk=self.log_id)
+        self.assertEqual((log.line_count, log.chunk_count), (3, 2))
+
+    def test_content_after_line_spans_chunk_boundaries(self):
+        services.append_deployment_log(self.log_id, "a\nb\n")
+        services.append_deployment_log(self.log_id, "c\n\nd\n")
+
+        self.assertEqual(services.get_deployment_log_content(self.log_id)["lines"], ["a", "b", "c", "", "d"])
+        content = services.get_deployment_log_content(self.log_id, after_line=1)
+        self.assertEqual(content["lines"], ["b", "c", "", "d"])
+        self.assertEqual(content["line_count"], 5)
+        self.assertEqual(services.get_deployment_log_content(self.log_id, after_line=5)["lines"], [])
+
+    def test_poll_only_reads_new_chunks(self):
+        for i in range(20):
+            services.append_deployment_log(self.log_id, f"line {i}")
+
+        with CaptureQueriesContext(connection) as queries:
+            content = services.get_deployment_log_content(self.log_id, after_line=19)
+
+        self.assertEqual(content["lines"], ["line 19"])
+        self.assertEqual(len(queries), 2)
+
+    def test_append_to_completed_log_is_rejected(self):
+        services.complete_deployment_log(self.log_id)
+
+        self.assertFalse(services.append_deployment_log(self.log_id, "late"))
+        self.assertFalse(DeploymentLogChunk.objects.exists())
+
+    def test_cleanup_removes_chunks_and_counts_logs(self):
+        for _ in range(services.MAX_DEPLOYMENT_LOGS_PER_STACK + 1):
+            log_id = services.create_deployment_log(str(self.stack.pk), "APPLY")["id"]
+            services.append_deployment_log(log_id, "x\ny")
+            services.complete_deployment_log(log_id)
+
+        # The first log is still RUNNING, so the eleven completed logs exceed the limit by one.
+        deleted = services._cleanup_old_deployment_logs(str(self.stack.pk))
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(
+            DeploymentLogChunk.objects.count(), services.MAX_DEPLOYMENT_LOGS_PER_STACK,
+        )
@@ -0,0 +1,140 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from organizations.models import Organization
+from projects.models import Project
+from stacks import services
+from stacks.metrics.models import DailyMetricUsage, MetricDefinition, MetricUsageRecord
+from stacks.models import PurchasableStack, Stack
+
+UserProfile = get_user_model()
+
+
+class _IngestFixtureMixin:
+    def _make_fixtures(self):
+        organization = Organization.objects.create(name="Ingest Org")
+        project = Project.objects.create(name="Ingest Project", organization=organization)
+        purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_ingest",
+        )
+        self.stack = Stack.objects.create(name="Ingest Stack", project=project, purchased_stack=purchasable_stack)
+        self.metric = MetricDefinition.objects.create(
+            name="db_storage", applicable_resources=[], unit_name="Bytes", record_frequency_cron="0 * * * *",
+        )
+        self.hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+
+    def _sample(self, **overrides):
+        sample = {
+            "metric_definition_id": self.metric.pk,
+            "stack_id": self.stack.pk,
+            "resource": "mongo-main",
+            "amount_used": "1024",
+            "usage_datetime": self.hour.isoformat(),
+        }
+        sample.update(overrides)
+        return sample
+
+
+class IngestMetricUsageTestCase(_IngestFixtureMixin, TestCase):
+    def setUp(self):
+        self._make_fixtures()
+
+    def test_upserts_and_refreshes_rollup(self):
+        result = services.ingest_metric_usage([
+            self._sample(resource="a"),
+            self._sample(resource="b", amount_used="10"),
+            self._sample(metric="db_storage", metric_definition_id=None, resource="c", amount_used="1"),
+        ])
+        self.assertEqual(result, {"accepted": 3, "rejected": []})
+
+        # Re-sending a sample corrects it instead of duplicating it.
+        services.ingest_metric_usage([self._sample(resource="a", amount_used="2048")])
+
+        self.assertEqual(MetricUsageRecord.objects.count(), 3)
+        self.assertEqual(DailyMetricUsage.objects.get().amount_used, Decimal("2059"))
+
+    def test_reports_rejected_rows_and_keeps_the_rest(self):
+        result = services.ingest_metric_usage([
+            self._sample(metric_definition_id=999),
+            self._sample(stack_id="stk_missing"),
+            self._sample(amount_used="-1"),
+            self._sample(amount_used="0.0000001"),
+            self._sample(usage_datetime="yesterday"),
+            self._sample(resource=""),
+            "not a sample",
+            self._sample(),
+        ])
+
+        self.assertEqual(result["accepted"], 1)
+        self.assertEqual([r["index"] for r in result["rejected"]], [0, 1, 2, 3, 4, 5, 6])
+        self.assertIn("metric_definition_id", result["rejected"][0]["error"])
+
+    def test_ambiguous_metric_name_is_rejected(self):
+        MetricDefinition.objects.create(
+            name="db_storage", applicable_resources=[], unit_name="GB", record_frequency_cron="0 * * * *",
+        )
+
+        result = services.ingest_metric_usage([self._sample(metric="db_storage", metric_definition_id=None)])
+
+        self.assertEqual(result["accepted"], 0)
+        self.assertIn("Ambiguous", result["rejected"][0]["error"])
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        def batch(n, start):
+            return [
+                self._sample(resource=f"db-{i}", usage_datetime=(self.hour - timedelta(hours=i)).isoformat())
+                for i in range(start, start + n)
+            ]
+
+        services.ingest_metric_usage(batch(2, 0))
+        # Metric lookup, stack lookup, then inside one transaction: upsert,
+        # rollup read, organization lookup, rollup upsert.
+        with self.assertNumQueries(8):
+            result = services.ingest_metric_usage(batch(100, 2))
+
+        self.assertEqual(result["accepted"], 100)
+
+    def test_batch_size_limit(self):
+        with self.assertRaises(services.ValidationError):
+            services.ingest_metric_usage([{}] * (services.METRIC_INGEST_MAX_RECORDS + 1))
+
+
+class IngestMetricUsageViewTestCase(_IngestFixtureMixin, APITestCase):
+    def setUp(self):
+        self._make_fixtures()
+        self.user = UserProfile.objects.create_user(
+            username="recorder", email="recorder@example.com", password="testpass123", is_staff=True,
+        )
+        self.url = reverse("stacks:metric-usage-ingest")
+
+    def test_requires_authentication(self):
+        response = self.client.post(self.url, {"records": [self._sample()]}, format="json")
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_rejects_non_staff_users(self):
+        member = UserProfile.objects.create_user(
+            username="member", email="member@example.com", password="testpass123",
+        )
+        self.client.force_authenticate(user=member)
+
+        response = self.client.post(self.url, {"records": [self._sample(amount_used="0")]}, format="json")
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(MetricUsageRecord.objects.exists())
+
+    def test_ingests_batch(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(
+            self.url, {"records": [self._sample(), self._sample(stack_id="nope")]}, format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["accepted"], 1)
+        self.assertEqual(response.json()["rejected"][0]["index"], 1)
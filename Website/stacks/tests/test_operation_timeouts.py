@@ -0,0 +1,171 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from stacks import services
+from stacks.models import Stack, PurchasableStack, Operation, StackEvent
+from projects.models import Project
+from organizations.models import Organization
+
+
+class TimeoutStaleOperationsTestCase(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Timeout Org")
+        self.project = Project.objects.create(name="Timeout Project", organization=organization)
+        self.purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_timeout",
+        )
+
+    def _running_operation(self, lease_delta):
+        stack = Stack.objects.create(
+            name="Timeout Stack", project=self.project, purchased_stack=self.purchasable_stack,
+        )
+        return Operation.objects.create(
+            stack=stack, operation_type="APPLY", status="RUNNING",
+            lease_expires_at=timezone.now() + lease_delta,
+        )
+
+    def test_times_out_only_expired_operations(self):
+        expired = self._running_operation(timedelta(minutes=-5))
+        live = self._running_operation(timedelta(minutes=5))
+
+        result = services.timeout_stale_operations()
+
+        self.assertEqual(result["timed_out"], 1)
+        self.assertGreaterEqual(result["elapsed_seconds"], 0)
+        expired.refresh_from_db()
+        live.refresh_from_db()
+        self.assertEqual((expired.status, live.status), ("TIMED_OUT", "RUNNING"))
+        self.assertIsNotNone(expired.completed_at)
+        self.assertEqual(Stack.objects.get(pk=expired.stack_id).status, "Error")
+        self.assertEqual(Stack.objects.get(pk=live.stack_id).status, Stack._meta.get_field("status").default)
+
+        event = StackEvent.objects.get(stack_id=expired.stack_id)
+        self.assertEqual(event.data["status"], "TIMED_OUT")
+        self.assertEqual(event.data["stack_status"], "Error")
+
+    def test_query_count_is_independent_of_operation_count(self):
+        for _ in range(12):
+            self._running_operation(timedelta(minutes=-5))
+
+        # SAVEPOINT, SELECT, UPDATE ops, UPDATE stacks, INSERT events, RELEASE.
+        with self.assertNumQueries(6):
+            result = services.timeout_stale_operations()
+
+        self.assertEqual(result["timed_out"], 12)
+
+    @patch("stacks.services.OPERATION_TIMEOUT_BATCH_SIZE", 5)
+    def test_sweeps_in_bounded_batches(self):
+        for _ in range(12):
+            self._running_operation(timedelta(minutes=-5))
+
+        self.assertEqual(services.timeout_stale_operations()["timed_out"], 12)
+        self.assertFalse(Operation.objects.filter(status="RUNNING").exists())
+
+        self._running_operation(timedelta(minutes=-5))
+        self.assertEqual(services.timeout_stale_operations(max_batches=1)["timed_out"], 1)
+
+
+class HeartbeatOperationTestCase(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Lease Org")
+        project = Project.objects.create(name="Lease Project", organization=organization)
+        purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_lease",
+        )
+        stack = Stack.objects.create(name="Lease Stack", project=project, purchased_stack=purchasable_stack)
+        self.op = Operation.objects.create(stack=stack, operation_type="APPLY")
+        services.claim_operation(str(self.op.pk), "attempt-1")
+
+    def test_claim_uses_short_default_lease(self):
+        self.op.refresh_from_db()
+        lease = self.op.lease_expires_at - self.op.started_at
+        self.assertEqual(lease, timedelta(seconds=services.DEFAULT_LEASE_SECONDS))
+
+    def test_heartbeat_extends_lease_and_survives_sweep(self):
+        Operation.objects.filter(pk=self.op.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+        with self.assertNumQueries(1):
+            services.heartbeat_operation(str(self.op.pk), "attempt-1", lease_duration_seconds=300)
+
+        self.assertEqual(services.timeout_stale_operations()["timed_out"], 0)
+        self.op.refresh_from_db()
+        self.assertGreater(self.op.lease_expires_at, timezone.now() + timedelta(seconds=290))
+
+    def test_heartbeat_rejects_other_attempt(self):
+        with self.assertRaises(services.ValidationError) as ctx:
+            services.heartbeat_operation(str(self.op.pk), "attempt-2")
+        self.assertEqual(ctx.exception.status_code, 409)
+
+    def test_heartbeat_after_completion_is_rejected(self):
+        services.complete_operation(str(self.op.pk), "attempt-1", "SUCCEEDED")
+
+        with self.assertRaises(services.ValidationError):
+            services.heartbeat_operation(str(self.op.pk), "attempt-1")
+
+    def test_heartbeat_unknown_operation(self):
+        with self.assertRaises(services.NotFoundError):
+            services.heartbeat_operation("op_missing", "attempt-1")
+
+
+class ClaimNextOperationTestCase(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Queue Org")
+        self.project = Project.objects.create(name="Queue Project", organization=organization)
+        self.purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_queue",
+        )
+
+    def _stack(self):
+        return Stack.objects.create(
+            name="Queue Stack", project=self.project, purchased_stack=self.purchasable_stack,
+        )
+
+    def _pending(self, stack, operation_type="APPLY", age_minutes=0):
+        op = Operation.objects.create(stack=stack, operation_type=operation_type)
+        Operation.objects.filter(pk=op.pk).update(created_at=timezone.now() - timedelta(minutes=age_minutes))
+        return op
+
+    def test_claims_oldest_pending_per_stack_in_order(self):
+        stack = self._stack()
+        first = self._pending(stack, "APPLY", age_minutes=2)
+        second = self._pending(stack, "PAUSE", age_minutes=1)
+
+        claimed = services.claim_next_operation("worker-1")
+        self.assertEqual(claimed["operation_id"], str(first.pk))
+
+        # The stack now has a RUNNING operation, so its next one must wait.
+        self.assertIsNone(services.claim_next_operation("worker-2"))
+
+        services.complete_operation(str(first.pk), "worker-1", "SUCCEEDED")
+        self.assertEqual(services.claim_next_operation("worker-2")["operation_id"], str(second.pk))
+
+    def test_workers_get_operations_from_other_stacks(self):
+        busy, idle = self._stack(), self._stack()
+        self._pending(busy, age_minutes=3)
+        self._pending(busy, age_minutes=2)
+        idle_op = self._pending(idle, age_minutes=1)
+
+        services.claim_next_operation("worker-1")
+        claimed = services.claim_next_operation("worker-2")
+
+        self.assertEqual(claimed["operation_id"], str(idle_op.pk))
+        self.assertEqual(Operation.objects.get(pk=idle_op.pk).attempt_id, "worker-2")
+
+    def test_returns_none_when_queue_is_empty(self):
+        self.assertIsNone(services.claim_next_operation("worker-1"))
+
+    @patch("stacks.views.verify_iac_webhook_signature")
+    def test_view_returns_204_when_nothing_is_runnable(self, _mock_verify):
+        from django.urls import reverse
+
+        url = reverse("stacks:operation-claim-next")
+        response = self.client.post(url, {"attempt_id": "worker-1"}, content_type="application/json")
+        self.assertEqual(response.status_code, 204)
+
+        op = self._pending(self._stack())
+        response = self.client.post(url, {"attempt_id": "worker-1"}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["operation_id"], str(op.pk))
@@ -0,0 +1,158 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from stacks import services
+from stacks.models import Stack, PurchasableStack, Operation, OutboxMessage
+from stacks.resources.resources_manager import ResourcesManager
+from projects.models import Project
+from organizations.models import Organization
+
+SERVICE_BUS = {"CONNECTION_STRING": "Endpoint=sb://test/", "QUEUE_NAME": "iac"}
+
+
+class _OutboxTestMixin:
+    def _create_stack(self, name="Outbox Stack", status="Ready"):
+        organization = Organization.objects.create(name="Outbox Org")
+        project = Project.objects.create(name="Outbox Project", organization=organization)
+        purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_outbox",
+        )
+        return Stack.objects.create(
+            name=name, project=project, purchased_stack=purchasable_stack, status=status,
+        )
+
+
+class EnqueueOperationTestCase(_OutboxTestMixin, TestCase):
+    def setUp(self):
+        self.stack = self._create_stack()
+
+    def test_writes_operation_and_outbox_message(self):
+        operation = services.enqueue_operation(
+            str(self.stack.pk), "APPLY", "IAC.APPLY", {"stack_id": self.stack.pk},
+        )
+
+        message = OutboxMessage.objects.get(operation=operation)
+        self.assertEqual(operation.status, "PENDING")
+        self.assertEqual(message.status, "PENDING")
+        self.assertEqual(message.body["request_type"], "IAC.APPLY")
+        self.assertEqual(message.body["operation_id"], str(operation.id))
+        self.assertEqual(message.body["data"], {"stack_id": self.stack.pk})
+
+    @override_settings(AZURE_SERVICE_BUS=SERVICE_BUS)
+    @patch("stacks.services.get_sender_pool")
+    def test_dispatches_after_commit(self, mock_pool):
+        with self.captureOnCommitCallbacks(execute=True):
+            services.pause_stack(str(self.stack.pk))
+
+        mock_pool.return_value.send_batch.assert_called_once()
+        self.assertEqual(OutboxMessage.objects.get().status, "SENT")
+
+    def test_unknown_operation_type_writes_nothing(self):
+        with self.assertRaises(services.ValidationError):
+            services.enqueue_operation(str(self.stack.pk), "BOGUS", "IAC.BOGUS", {})
+
+        self.assertFalse(Operation.objects.exists())
+        self.assertFalse(OutboxMessage.objects.exists())
+
+
+class CoalesceApplyTestCase(_OutboxTestMixin, TestCase):
+    def setUp(self):
+        self.stack = self._create_stack()
+
+    def test_repeated_updates_merge_into_pending_apply(self):
+        first = services.trigger_iac_update(str(self.stack.pk))
+        ResourcesManager.add_resource(self.stack, "AZURERM_RESOURCE_GROUP")
+        second = services.trigger_iac_update(str(self.stack.pk))
+
+        self.assertEqual(first["coalesced"], False)
+        self.assertEqual(second, {"operation_id": first["operation_id"], "coalesced": True})
+        self.assertEqual(Operation.objects.count(), 1)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(len(message.body["data"]["resources"]), 1)
+        self.assertEqual(message.body["operation_id"], first["operation_id"])
+
+    def test_claim_returns_refreshed_payload_after_message_was_sent(self):
+        first = services.trigger_iac_update(str(self.stack.pk))
+        OutboxMessage.objects.update(status="SENT")
+        ResourcesManager.add_resource(self.stack, "AZURERM_RESOURCE_GROUP")
+        services.trigger_iac_update(str(self.stack.pk))
+
+        claimed = services.claim_operation(first["operation_id"], "attempt-1")
+
+        self.assertEqual(len(claimed["payload"]["resources"]), 1)
+
+    def test_does_not_jump_ahead_of_other_queued_operations(self):
+        services.trigger_iac_update(str(self.stack.pk))
+        services.pause_stack(str(self.stack.pk))
+
+        result = services.trigger_iac_update(str(self.stack.pk))
+
+        self.assertFalse(result["coalesced"])
+        self.assertEqual(
+            list(Operation.objects.order_by("created_at").values_list("operation_type", flat=True)),
+            ["APPLY", "PAUSE", "APPLY"],
+        )
+
+    def test_running_apply_is_not_coalesced(self):
+        first = services.trigger_iac_update(str(self.stack.pk))
+        services.claim_operation(first["operation_id"], "attempt-1")
+
+        self.assertFalse(services.trigger_iac_update(str(self.stack.pk))["coalesced"])
+        self.assertEqual(Operation.objects.filter(status="PENDING").count(), 1)
+
+
+@override_settings(AZURE_SERVICE_BUS=SERVICE_BUS)
+class DispatchOutboxTestCase(_OutboxTestMixin, TestCase):
+    def setUp(self):
+        self.stack = self._create_stack()
+        for _ in range(3):
+            services.enqueue_operation(str(self.stack.pk), "APPLY", "IAC.APPLY", {"stack_id": self.stack.pk})
+
+    @patch("stacks.services.get_sender_pool")
+    def test_sends_pending_messages_in_one_batch(self, mock_pool):
+        result = services.dispatch_outbox()
+
+        self.assertEqual(result, {"sent": 3, "retrying": 0, "failed": 0})
+        mock_pool.return_value.send_batch.assert_called_once()
+        _, _, bodies = mock_pool.return_value.send_batch.call_args.args
+        self.assertEqual(len(bodies), 3)
+        self.assertFalse(OutboxMessage.objects.filter(status="PENDING").exists())
+
+    @patch("stacks.services.get_sender_pool")
+    def test_failed_send_is_rescheduled(self, mock_pool):
+        mock_pool.return_value.send_batch.side_effect = Exception("broker down")
+
+        result = services.dispatch_outbox()
+
+        self.assertEqual(result, {"sent": 0, "retrying": 3, "failed": 0})
+        for message in OutboxMessage.objects.all():
+            self.assertEqual(message.status, "PENDING")
+            self.assertEqual(message.attempts, 1)
+            self.assertGreater(message.available_at, message.created_at)
+            self.assertIn("broker down", message.last_error)
+
+        # Backed-off rows are not due yet, so a second run sends nothing.
+        mock_pool.return_value.send_batch.reset_mock()
+        self.assertEqual(services.dispatch_outbox()["sent"], 0)
+        mock_pool.return_value.send_batch.assert_not_called()
+
+    @patch("stacks.services.get_sender_pool")
+    def test_exhausted_messages_fail_their_operation(self, mock_pool):
+        mock_pool.return_value.send_batch.side_effect = Exception("broker down")
+        OutboxMessage.objects.update(attempts=services.OUTBOX_MAX_ATTEMPTS - 1)
+
+        result = services.dispatch_outbox()
+
+        self.assertEqual(result["failed"], 3)
+        self.assertEqual(OutboxMessage.objects.filter(status="FAILED").count(), 3)
+        self.assertEqual(Operation.objects.filter(status="FAILED").count(), 3)
+
+    @override_settings(AZURE_SERVICE_BUS={"CONNECTION_STRING": None, "QUEUE_NAME": "iac"})
+    @patch("stacks.services.get_sender_pool")
+    def test_missing_configuration_leaves_messages_pending(self, mock_pool):
+        result = services.dispatch_outbox()
+
+        self.assertEqual(result["sent"], 0)
+        mock_pool.return_value.send_batch.assert_not_called()
+        self.assertEqual(OutboxMessage.objects.filter(status="PENDING").count(), 3)
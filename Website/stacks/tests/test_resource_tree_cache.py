@@ -0,0 +1,142 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from organizations.models import Organization, OrganizationMember
+from projects.models import Project
+from stacks.models import PurchasableStack, Stack, StackResourceVersion
+from stacks.resources.resource import Resource, ResourceDependency
+from stacks.resources.resources_manager import ResourcesManager
+
+UserProfile = get_user_model()
+
+
+def _version(stack) -> int:
+    row = StackResourceVersion.objects.filter(stack=stack).first()
+    return row.version if row else 0
+
+
+class ResourceTreeCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserProfile.objects.create_user(
+            username="treeuser", email="tree@example.com", password="testpass123",
+        )
+        organization = Organization.objects.create(name="Tree Org")
+        OrganizationMember.objects.create(user=self.user, organization=organization, role="admin")
+        self.project = Project.objects.create(name="Tree Project", organization=organization)
+        purchasable_stack = PurchasableStack.objects.create(
+            type="CUSTOM", variant="CUSTOM", version="1.0", price_id="", name="Custom Stack",
+        )
+        self.stacks = [
+            Stack.objects.create(name=f"Stack {i}", project=self.project, purchased_stack=purchasable_stack)
+            for i in range(3)
+        ]
+        self.stack = self.stacks[0]
+        self.vault = Resource.objects.create(
+            stack=self.stack, index=0, name="vault", resource_type="azurerm_key_vault", prefix="res00B",
+        )
+        self.app = Resource.objects.create(
+            stack=self.stack, index=0, name="app", resource_type="azurerm_container_app",
+            prefix="res007", status="Failed",
+        )
+        Resource.objects.create(
+            stack=self.stacks[1], index=0, name="rg", resource_type="azurerm_resource_group", prefix="res000",
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tree_url = reverse("stacks:resource-tree", kwargs={"stack_id": str(self.stack.pk)})
+        self.dashboard_url = reverse("stacks:stack-dashboard", kwargs={"project_id": str(self.project.pk)})
+
+    def test_resource_and_dependency_writes_bump_version(self):
+        before = _version(self.stack)
+        dep = ResourceDependency.objects.create(resource=self.app, depends_on=self.vault)
+        self.assertEqual(_version(self.stack), before + 1)
+
+        dep.delete()
+        self.app.status = "Running"
+        self.app.save()
+        self.assertEqual(_version(self.stack), before + 3)
+        self.assertEqual(_version(self.stacks[2]), 0)
+
+    def test_bulk_paths_bump_version(self):
+        before = _version(self.stacks[2])
+        created = ResourcesManager.create([{"resource_type": "AZURERM_RESOURCE_GROUP"}], self.stacks[2])
+        self.assertEqual(_version(self.stacks[2]), before + 1)
+
+        ResourcesManager.bulk_update([{"id": created[0].id, "status": "Running"}])
+        self.assertEqual(_version(self.stacks[2]), before + 2)
+
+    def test_stale_stack_save_does_not_roll_back_version(self):
+        stale = Stack.objects.get(pk=self.stack.pk)
+        Resource.objects.create(
+            stack=self.stack, index=1, name="app2", resource_type="azurerm_container_app", prefix="res007",
+        )
+        version = _version(self.stack)
+        stale.save()
+        self.assertEqual(_version(self.stack), version)
+
+    def test_deleting_stack_cascades_without_error(self):
+        stack_pk = self.stack.pk
+        self.stack.delete()
+        self.assertFalse(StackResourceVersion.objects.filter(stack_id=stack_pk).exists())
+
+    def test_tree_served_from_cache_and_revalidated_with_etag(self):
+        response = self.client.get(self.tree_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({node["name"] for node in response.data["resource_tree"]}, {"vault", "app"})
+        etag = response["ETag"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get(self.tree_url)
+        self.assertEqual(cached.data, response.data)
+        self.assertFalse(any("stacks_resource" in q["sql"] for q in ctx.captured_queries))
+
+        not_modified = self.client.get(self.tree_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified["ETag"], etag)
+
+        ResourceDependency.objects.create(resource=self.app, depends_on=self.vault)
+        changed = self.client.get(self.tree_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed["ETag"], etag)
+        app = next(node for node in changed.data["resource_tree"] if node["name"] == "app")
+        self.assertEqual(app["dependencies"][0]["name"], "vault")
+
+    def test_dashboard_totals_and_warm_query_count(self):
+        response = self.client.get(self.dashboard_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["totals"],
+            {"total_stacks": 3, "total_resources": 3, "healthy": 2, "degraded": 0, "failed": 1},
+        )
+        by_name = {s["name"]: s for s in response.data["stacks"]}
+        self.assertEqual(by_name["Stack 0"]["health_summary"]["failed"], 1)
+        self.assertEqual(by_name["Stack 2"]["resource_tree"], [])
+
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get(self.dashboard_url)
+        self.assertEqual(cached.data, response.data)
+        self.assertFalse(any("stacks_resource" in q["sql"] for q in ctx.captured_queries))
+
+    def test_dashboard_etag_changes_with_stack_or_resources(self):
+        etag = self.client.get(self.dashboard_url)["ETag"]
+        self.assertEqual(
+            self.client.get(self.dashboard_url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+
+        Stack.objects.filter(pk=self.stacks[2].pk).update(status="RUNNING")
+        response = self.client.get(self.dashboard_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        self.vault.delete()
+        response = self.client.get(self.dashboard_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["totals"]["total_resources"], 2)
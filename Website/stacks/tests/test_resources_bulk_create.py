@@ -0,0 +1,80 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from stacks import services
+from stacks.models import Stack, PurchasableStack
+from stacks.resources.resource import Resource
+from stacks.resources.resources_manager import ResourcesManager
+from stacks.resources.type_registry import ResourceTypeRegistry
+from projects.models import Project
+from organizations.models import Organization
+
+
+INFRASTRUCTURE = [
+    {"resource_type": "AZURERM_RESOURCE_GROUP"},
+    {"resource_type": "AZURERM_STORAGE_ACCOUNT"},
+    {"resource_type": "AZURERM_STORAGE_ACCOUNT_STATIC_WEBSITE"},
+    {"resource_type": "AZURERM_CONTAINER_APP"},
+    {"resource_type": "DEPLOYBOXRM_EDGE", "subdomain": "shop"},
+]
+
+
+class ResourcesBulkCreateTestCase(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Bulk Org")
+        project = Project.objects.create(name="Bulk Project", organization=organization)
+        purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_bulk",
+        )
+        self.stack = Stack.objects.create(
+            name="Bulk Stack", project=project, purchased_stack=purchasable_stack,
+        )
+
+    def test_resources_match_the_per_row_save_path(self):
+        created = ResourcesManager.create(INFRASTRUCTURE, self.stack)
+
+        rg, sa, website, app, edge = Resource.objects.filter(stack=self.stack).order_by("index")
+        self.assertEqual([r.pk for r in created], [rg.pk, sa.pk, website.pk, app.pk, edge.pk])
+        self.assertTrue(rg.pk.startswith("res000_"))
+        self.assertEqual(len(rg.pk), 16)
+        self.assertEqual(sa.name, "azurerm_storage_account_1")
+        self.assertEqual(
+            sa.provider_name,
+            ResourceTypeRegistry.get_by_type("azurerm_storage_account").generate_provider_name(
+                self.stack, 1, "res002",
+            ),
+        )
+        self.assertEqual(sa.parent_id, rg.pk)
+        self.assertEqual(website.parent_id, sa.pk)
+        self.assertEqual(
+            sa.attributes["resource_group_name"],
+            "${azurerm_resource_group.azurerm_resource_group_0.azurerm_name}",
+        )
+        self.assertEqual(
+            website.attributes["storage_account_id"],
+            "${azurerm_storage_account.azurerm_storage_account_1.azurerm_id}",
+        )
+        self.assertEqual(app.attributes["template_container_name"], f"container-{self.stack.pk}")
+        self.assertEqual(edge.attributes["subdomain"], "shop")
+
+    def test_query_count_does_not_grow_with_template_size(self):
+        services.bump_edge_config_version()
+        services.bump_stack_resource_version([self.stack.pk])
+        template = INFRASTRUCTURE + [{"resource_type": "AZURERM_CONTAINER_APP"} for _ in range(30)]
+
+        with CaptureQueriesContext(connection) as queries:
+            ResourcesManager.create(template, self.stack)
+
+        self.assertEqual(Resource.objects.filter(stack=self.stack).count(), len(template))
+        # Existing-resource lookup, bulk insert, resource tree and edge version bumps.
+        self.assertEqual(len(queries), 4)
+
+    def test_edge_in_template_bumps_traefik_version(self):
+        version = services.get_edge_config_version()
+
+        ResourcesManager.create(INFRASTRUCTURE[:1], self.stack)
+        self.assertEqual(services.get_edge_config_version(), version)
+
+        ResourcesManager.create([{"resource_type": "DEPLOYBOXRM_EDGE"}], self.stack)
+        self.assertGreater(services.get_edge_config_version(), version)
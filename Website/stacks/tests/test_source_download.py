@@ -0,0 +1,92 @@
+from unittest.mock import patch, MagicMock
+
+from azure.core.exceptions import ResourceNotFoundError
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from stacks.models import Stack, PurchasableStack
+from projects.models import Project, ProjectMember
+from organizations.models import Organization, OrganizationMember
+
+UserProfile = get_user_model()
+
+ARCHIVE = b"PK\x03\x04" + bytes(range(256)) * 40
+AZURE = {"STORAGE_CONNECTION_STRING": "conn", "CONTAINER_NAME": "templates"}
+
+
+def _fake_download(offset=None, length=None):
+    data = ARCHIVE if offset is None else ARCHIVE[offset:offset + length]
+    stream = MagicMock()
+    stream.size = len(data)
+    stream.chunks.return_value = iter([data[i:i + 4096] for i in range(0, len(data), 4096)])
+    return stream
+
+
+@override_settings(AZURE=AZURE)
+@patch("stacks.services.get_blob_service_client")
+class StackSourceDownloadTestCase(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create_user(
+            username="downloader", email="download@example.com", password="testpass123",
+        )
+        organization = Organization.objects.create(name="Download Org")
+        OrganizationMember.objects.create(user=self.user, organization=organization, role="admin")
+        project = Project.objects.create(name="Download Project", organization=organization)
+        ProjectMember.objects.create(user=self.user, project=project, role="admin")
+        purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_download",
+        )
+        self.stack = Stack.objects.create(
+            name="Download Stack", project=project, purchased_stack=purchasable_stack,
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("stacks:stack-download", kwargs={"pk": str(self.stack.pk)})
+
+    def _blob(self, mock_get_client):
+        blob = mock_get_client.return_value.get_blob_client.return_value
+        blob.download_blob.side_effect = _fake_download
+        blob.get_blob_properties.return_value.size = len(ARCHIVE)
+        return blob
+
+    def test_streams_whole_archive(self, mock_get_client):
+        self._blob(mock_get_client)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b"".join(response.streaming_content), ARCHIVE)
+        self.assertEqual(response["Content-Length"], str(len(ARCHIVE)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="django-basic.zip"')
+        mock_get_client.return_value.get_blob_client.assert_called_once_with("templates", "django-basic.zip")
+
+    def test_range_request_returns_partial_content(self, mock_get_client):
+        blob = self._blob(mock_get_client)
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(response.streaming_content), ARCHIVE[100:200])
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(ARCHIVE)}")
+        self.assertEqual(response["Content-Length"], "100")
+        blob.download_blob.assert_called_once_with(offset=100, length=100)
+
+    def test_unsatisfiable_range_returns_416(self, mock_get_client):
+        self._blob(mock_get_client)
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(ARCHIVE)}-")
+
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(ARCHIVE)}")
+
+    def test_missing_archive_returns_404(self, mock_get_client):
+        blob = mock_get_client.return_value.get_blob_client.return_value
+        blob.download_blob.side_effect = ResourceNotFoundError("gone")
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,290 @@
+import base64
+from unittest.mock import patch, MagicMock, PropertyMock
+from urllib.parse import parse_qs, urlsplit
+
+from azure.core.exceptions import ResourceNotFoundError
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from stacks import services
+from stacks.models import Stack, PurchasableStack, Operation
+from projects.models import Project, ProjectMember
+from organizations.models import Organization, OrganizationMember
+
+UserProfile = get_user_model()
+
+AZURE = {"STORAGE_CONNECTION_STRING": "conn", "CONTAINER_NAME": "uploads"}
+TOKEN = "0123456789abcdef0123456789abcdef"
+
+
+@override_settings(AZURE=AZURE)
+@patch("stacks.services.get_blob_service_client")
+class DirectSourceUploadTestCase(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create_user(
+            username="uploader", email="upload@example.com", password="testpass123",
+        )
+        organization = Organization.objects.create(name="Upload Org")
+        OrganizationMember.objects.create(user=self.user, organization=organization, role="admin")
+        project = Project.objects.create(name="Upload Project", organization=organization)
+        ProjectMember.objects.create(user=self.user, project=project, role="admin")
+        purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_upload",
+        )
+        self.stack = Stack.objects.create(
+            name="Upload Stack", project=project, purchased_stack=purchasable_stack,
+        )
+        self.client.force_authenticate(user=self.user)
+        self.blob_name = f"{self.stack.pk}/user-files.zip"
+
+    def _client(self, mock_get_client, size=1024, header=services.ZIP_MAGIC_BYTES):
+        """Return ``{blob_name: mock}``; every staged upload reports *size* and *header*."""
+        client = mock_get_client.return_value
+        client.account_name = "acct"
+        client.credential.account_key = base64.b64encode(b"k" * 32).decode()
+        blobs = {}
+
+        def get_blob_client(container, name):
+            blob = blobs.setdefault(name, MagicMock(name=name))
+            blob.url = f"https://acct.blob.core.windows.net/{container}/{name}"
+            blob.get_blob_properties.return_value.size = size
+            blob.download_blob.return_value.readall.return_value = header
+            blob.start_copy_from_url.return_value = {"copy_status": "success"}
+            return blob
+
+        client.get_blob_client.side_effect = get_blob_client
+        return blobs
+
+    def _staged(self, token=TOKEN):
+        return f"{self.stack.pk}/uploads/{token}.zip"
+
+    def test_upload_url_is_write_only_sas_for_staging_blob(self, mock_get_client):
+        self._client(mock_get_client)
+
+        response = self.client.post(reverse("stacks:stack-upload_url", kwargs={"pk": str(self.stack.pk)}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = response.json()["upload_token"]
+        url = urlsplit(response.json()["upload_url"])
+        self.assertTrue(url.path.endswith(self._staged(token)))
+        self.assertNotIn("user-files.zip", url.path)
+        query = parse_qs(url.query)
+        self.assertEqual(query["sp"], ["cw"])
+        self.assertIn("se", query)
+        self.assertEqual(response.json()["max_size_bytes"], services.MAX_UPLOAD_SIZE_BYTES)
+
+    def test_upload_url_requires_account_key(self, mock_get_client):
+        self._client(mock_get_client)
+        mock_get_client.return_value.credential = None
+
+        with self.assertRaises(services.ServiceError) as ctx:
+            services.create_source_upload_url(str(self.stack.pk))
+        self.assertEqual(ctx.exception.status_code, 503)
+
+    def test_finalize_publishes_staged_blob_and_triggers_apply(self, mock_get_client):
+        blobs = self._client(mock_get_client)
+
+        response = self.client.post(
+            reverse("stacks:stack-upload_finalize", kwargs={"pk": str(self.stack.pk)}),
+            {"upload_token": TOKEN}, format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["blob_name"], self.blob_name)
+        self.assertTrue(response.json()["iac_update_queued"])
+        staged = blobs[self._staged()]
+        staged.download_blob.assert_called_once_with(offset=0, length=4)
+        blobs[self.blob_name].start_copy_from_url.assert_called_once_with(staged.url)
+        staged.delete_blob.assert_called_once()
+        self.assertTrue(Operation.objects.filter(stack=self.stack, operation_type="APPLY").exists())
+
+    def test_finalize_rejects_and_deletes_non_zip_without_touching_live_blob(self, mock_get_client):
+        blobs = self._client(mock_get_client, header=b"GIF8")
+
+        with self.assertRaises(services.ValidationError):
+            services.finalize_source_upload(str(self.stack.pk), TOKEN)
+        blobs[self._staged()].delete_blob.assert_called_once()
+        blobs[self.blob_name].start_copy_from_url.assert_not_called()
+        blobs[self.blob_name].delete_blob.assert_not_called()
+
+    def test_finalize_rejects_oversized_upload_without_reading_it(self, mock_get_client):
+        blobs = self._client(mock_get_client, size=services.MAX_UPLOAD_SIZE_BYTES + 1)
+
+        with self.assertRaises(services.ValidationError) as ctx:
+            services.finalize_source_upload(str(self.stack.pk), TOKEN)
+        self.assertEqual(ctx.exception.status_code, 413)
+        blobs[self._staged()].delete_blob.assert_called_once()
+        blobs[self.blob_name].delete_blob.assert_not_called()
+
+    def test_finalize_without_upload_is_not_found(self, mock_get_client):
+        blobs = self._client(mock_get_client)
+        mock_get_client.return_value.get_blob_client(AZURE["CONTAINER_NAME"], self._staged())
+        blobs[self._staged()].get_blob_properties.side_effect = ResourceNotFoundError("missing")
+
+        with self.assertRaises(services.NotFoundError):
+            services.finalize_source_upload(str(self.stack.pk), TOKEN)
+
+    def test_finalize_rejects_malformed_token(self, mock_get_client):
+        self._client(mock_get_client)
+
+        for token in (None, "", "../user-files", TOKEN.upper()):
+            with self.assertRaises(services.ValidationError):
+                services.finalize_source_upload(str(self.stack.pk), token)
+
+
+@override_settings(AZURE=AZURE)
+@patch("stacks.services.get_blob_service_client")
+class ContentAddressedUploadTestCase(APITestCase):
+    ARCHIVE = services.ZIP_MAGIC_BYTES + b"source v1"
+
+    def setUp(self):
+        self.user = UserProfile.objects.create_user(
+            username="casuploader", email="cas@example.com", password="testpass123",
+        )
+        organization = Organization.objects.create(name="CAS Org")
+        OrganizationMember.objects.create(user=self.user, organization=organization, role="admin")
+        project = Project.objects.create(name="CAS Project", organization=organization)
+        ProjectMember.objects.create(user=self.user, project=project, role="admin")
+        purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_cas",
+        )
+        self.stack = Stack.objects.create(
+            name="CAS Stack", project=project, purchased_stack=purchasable_stack,
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("stacks:stack-upload", kwargs={"pk": str(self.stack.pk)})
+
+    def _blobs(self, mock_get_client):
+        blobs = {}
+
+        def get_blob_client(name):
+            blob = blobs.setdefault(name, MagicMock(name=name))
+            blob.url = f"https://acct.blob.core.windows.net/uploads/{name}"
+            blob.start_copy_from_url.return_value = {"copy_status": "success"}
+            return blob
+
+        container = mock_get_client.return_value.get_container_client.return_value
+        container.get_blob_client.side_effect = get_blob_client
+        return blobs
+
+    def _upload(self, content):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        return self.client.post(
+            self.url, {"source_zip": SimpleUploadedFile("source.zip", content)}, format="multipart",
+        )
+
+    def test_archive_is_stored_by_digest_and_stack_blob_copied(self, mock_get_client):
+        import hashlib
+
+        blobs = self._blobs(mock_get_client)
+        digest = hashlib.sha256(self.ARCHIVE).hexdigest()
+
+        response = self._upload(self.ARCHIVE)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["digest"], digest)
+        self.assertTrue(response.json()["iac_update_queued"])
+        archive = blobs[f"sources/sha256/{digest}.zip"]
+        archive.upload_blob.assert_called_once()
+        blobs[f"{self.stack.pk}/user-files.zip"].start_copy_from_url.assert_called_once_with(archive.url)
+        self.stack.refresh_from_db()
+        self.assertEqual(self.stack.source_digest, digest)
+
+    def test_identical_reupload_skips_write_and_apply(self, mock_get_client):
+        blobs = self._blobs(mock_get_client)
+        self._upload(self.ARCHIVE)
+        operations = Operation.objects.count()
+        for blob in blobs.values():
+            blob.reset_mock()
+
+        response = self._upload(self.ARCHIVE)
+
+        self.assertTrue(response.json()["unchanged"])
+        self.assertFalse(response.json()["iac_update_queued"])
+        self.assertEqual(Operation.objects.count(), operations)
+        for blob in blobs.values():
+            blob.upload_blob.assert_not_called()
+            blob.start_copy_from_url.assert_not_called()
+
+    def test_archive_already_stored_by_another_stack_is_reused(self, mock_get_client):
+        from azure.core.exceptions import ResourceExistsError
+
+        self._blobs(mock_get_client)
+        container = mock_get_client.return_value.get_container_client.return_value
+        original = container.get_blob_client.side_effect
+
+        def existing(name):
+            blob = original(name)
+            if name.startswith("sources/"):
+                blob.upload_blob.side_effect = ResourceExistsError("exists")
+            return blob
+
+        container.get_blob_client.side_effect = existing
+
+        response = self._upload(self.ARCHIVE)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()["iac_update_queued"])
+
+    def test_direct_upload_clears_digest(self, mock_get_client):
+        self._blobs(mock_get_client)
+        self._upload(self.ARCHIVE)
+        blob = mock_get_client.return_value.get_blob_client.return_value
+        blob.get_blob_properties.return_value.size = 1024
+        blob.download_blob.return_value.readall.return_value = services.ZIP_MAGIC_BYTES
+        blob.start_copy_from_url.return_value = {"copy_status": "success"}
+
+        services.finalize_source_upload(str(self.stack.pk), TOKEN)
+
+        self.stack.refresh_from_db()
+        self.assertEqual(self.stack.source_digest, "")
+        self.assertFalse(self._upload(self.ARCHIVE).json()["unchanged"])
+
+    def test_pending_copy_is_polled_before_digest_is_recorded(self, mock_get_client):
+        blobs = self._blobs(mock_get_client)
+        live = f"{self.stack.pk}/user-files.zip"
+        mock_get_client.return_value.get_container_client.return_value.get_blob_client(live)
+        blobs[live].start_copy_from_url.side_effect = lambda url: {"copy_status": "pending", "copy_id": "c1"}
+        type(blobs[live].get_blob_properties.return_value.copy).status = PropertyMock(
+            side_effect=["pending", "success"],
+        )
+
+        with patch("stacks.services.time.sleep") as sleep:
+            response = self._upload(self.ARCHIVE)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sleep.call_count, 2)
+        blobs[live].abort_copy.assert_not_called()
+        self.stack.refresh_from_db()
+        self.assertNotEqual(self.stack.source_digest, "")
+
+    def test_failed_copy_is_an_error_and_leaves_no_digest(self, mock_get_client):
+        blobs = self._blobs(mock_get_client)
+        self._upload(self.ARCHIVE)
+        operations = Operation.objects.count()
+        live = f"{self.stack.pk}/user-files.zip"
+        blobs[live].start_copy_from_url.side_effect = lambda url: {"copy_status": "failed"}
+
+        response = self._upload(services.ZIP_MAGIC_BYTES + b"source v2")
+
+        self.assertGreaterEqual(response.status_code, 500)
+        self.assertEqual(Operation.objects.count(), operations)
+        self.stack.refresh_from_db()
+        self.assertEqual(self.stack.source_digest, "")
+
+    def test_identical_reupload_after_failed_apply_redeploys(self, mock_get_client):
+        self._blobs(mock_get_client)
+        self._upload(self.ARCHIVE)
+        Operation.objects.filter(stack=self.stack, operation_type="APPLY").update(status="FAILED")
+
+        response = self._upload(self.ARCHIVE)
+
+        self.assertFalse(response.json()["unchanged"])
+        self.assertTrue(response.json()["iac_update_queued"])
+        self.assertTrue(
+            Operation.objects.filter(stack=self.stack, operation_type="APPLY", status="PENDING").exists()
+        )
@@ -0,0 +1,139 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from stacks import services, views
+from stacks.models import Stack, PurchasableStack, Operation
+from projects.models import Project
+from organizations.models import Organization, OrganizationMember
+
+UserProfile = get_user_model()
+
+
+class _StackEventsTestMixin:
+    def _create_base_objects(self):
+        self.user = UserProfile.objects.create_user(
+            username="eventsuser", email="events@example.com", password="testpass123",
+        )
+        organization = Organization.objects.create(name="Events Org")
+        OrganizationMember.objects.create(user=self.user, organization=organization, role="admin")
+        project = Project.objects.create(name="Events Project", organization=organization)
+        purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_events",
+        )
+        self.stack = Stack.objects.create(
+            name="Events Stack", project=project, purchased_stack=purchasable_stack,
+        )
+
+
+class StackEventsServiceTestCase(_StackEventsTestMixin, TestCase):
+    def setUp(self):
+        self._create_base_objects()
+
+    def test_log_lifecycle_events(self):
+        log_id = services.create_deployment_log(str(self.stack.pk), "APPLY")["id"]
+        services.append_deployment_log(log_id, "init\nplan")
+        services.complete_deployment_log(log_id, "COMPLETED")
+
+        events = services.get_stack_events(str(self.stack.pk), 0)
+
+        self.assertEqual([e["event"] for e in events], ["log_status", "log", "log_status"])
+        self.assertEqual(events[1]["data"], {"log_id": log_id, "start_line": 0, "lines": ["init", "plan"]})
+        self.assertEqual(events[2]["data"]["status"], "COMPLETED")
+
+    def test_operation_transitions_are_recorded(self):
+        op = Operation.objects.create(stack=self.stack, operation_type="PAUSE")
+        services.claim_operation(str(op.pk), "attempt-1")
+        services.complete_operation(str(op.pk), "attempt-1", "SUCCEEDED")
+
+        events = services.get_stack_events(str(self.stack.pk), 0)
+
+        self.assertEqual([e["data"]["status"] for e in events], ["RUNNING", "SUCCEEDED"])
+        self.assertEqual(events[1]["data"]["stack_status"], "PAUSED")
+
+    def test_resume_after_event_id(self):
+        log_id = services.create_deployment_log(str(self.stack.pk), "APPLY")["id"]
+        services.append_deployment_log(log_id, "one")
+        last_seen = services.get_latest_stack_event_id(str(self.stack.pk))
+        services.append_deployment_log(log_id, "two")
+
+        events = services.get_stack_events(str(self.stack.pk), last_seen)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["data"]["lines"], ["two"])
+
+
+@patch("stacks.views.SSE_MAX_STREAM_SECONDS", 0)
+class StackEventsViewTestCase(_StackEventsTestMixin, APITestCase):
+    def setUp(self):
+        self._create_base_objects()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("stacks:stack-events", kwargs={"stack_id": str(self.stack.pk)})
+        self.log_id = services.create_deployment_log(str(self.stack.pk), "APPLY")["id"]
+        services.append_deployment_log(self.log_id, "hello")
+
+    def _read(self, response):
+        return response.content.decode()
+
+    def test_streams_events_after_last_event_id(self):
+        response = self.client.get(self.url, HTTP_ACCEPT="text/event-stream", HTTP_LAST_EVENT_ID="0")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = self._read(response)
+        self.assertIn("event: log_status\n", body)
+        self.assertIn('event: log\ndata: {"log_id": "%s", "start_line": 0, "lines": ["hello"]}' % self.log_id, body)
+
+    def test_new_connection_starts_at_tail(self):
+        response = self.client.get(self.url, HTTP_ACCEPT="text/event-stream")
+
+        latest = services.get_latest_stack_event_id(str(self.stack.pk))
+        self.assertEqual(self._read(response), f"retry: 3000\n\nid: {latest}\n\n")
+
+    @patch("stacks.views.time.sleep")
+    def test_sync_server_answers_a_single_poll(self, mock_sleep):
+        body = self._read(self.client.get(self.url, HTTP_ACCEPT="text/event-stream", HTTP_LAST_EVENT_ID="0"))
+        cursor = body.rsplit("id: ", 1)[1].strip()
+
+        services.append_deployment_log(self.log_id, "world")
+        body = self._read(self.client.get(self.url, HTTP_ACCEPT="text/event-stream", HTTP_LAST_EVENT_ID=cursor))
+
+        self.assertIn('"lines": ["world"]', body)
+        self.assertNotIn("hello", body)
+        mock_sleep.assert_not_called()
+
+    def test_requires_stack_membership(self):
+        outsider = UserProfile.objects.create_user(
+            username="outsider", email="outsider@example.com", password="testpass123",
+        )
+        self.client.force_authenticate(user=outsider)
+
+        response = self.client.get(self.url, HTTP_ACCEPT="text/event-stream")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AsyncStackEventStreamTestCase(SimpleTestCase):
+    @patch("stacks.views.connection")
+    @patch("stacks.views.asyncio.sleep", new_callable=AsyncMock)
+    @patch("stacks.views.time")
+    @patch("stacks.views.get_stack_events")
+    def test_polls_slowly_and_closes_connection_once(self, mock_events, mock_time, mock_sleep, mock_connection):
+        mock_time.monotonic.side_effect = [0, 0, 0, 100]
+        event = {"id": 7, "event": "log", "data": {"lines": ["hi"]}}
+        mock_events.side_effect = [[], [event], []]
+
+        async def collect():
+            return [frame async for frame in views._stack_event_stream_async("stack", 0)]
+
+        frames = asyncio.run(collect())
+
+        self.assertIn(views._format_sse(event), frames)
+        self.assertEqual([call.args[1] for call in mock_events.call_args_list], [0, 0, 7])
+        mock_sleep.assert_awaited_once_with(views.SSE_POLL_SECONDS)
+        mock_connection.close.assert_called_once()
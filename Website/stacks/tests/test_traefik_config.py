@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from stacks import services
+from stacks.models import Stack, PurchasableStack
+from stacks.resources.resources_manager import ResourcesManager
+from projects.models import Project
+from organizations.models import Organization
+
+
+class TraefikConfigTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        organization = Organization.objects.create(name="Edge Org")
+        project = Project.objects.create(name="Edge Project", organization=organization)
+        purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_edge",
+        )
+        self.stack = Stack.objects.create(
+            name="Edge Stack", project=project, purchased_stack=purchasable_stack,
+        )
+        self.edge = ResourcesManager.add_resource(self.stack, "DEPLOYBOXRM_EDGE", {"subdomain": "shop"})
+        self.url = reverse("stacks:stack-traefik_config")
+
+    def test_returns_config_with_etag(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("shop-root", response.json()["http"]["routers"])
+        self.assertEqual(response["ETag"], f'"edge-{services.get_edge_config_version()}"')
+
+    def test_unchanged_config_returns_304_with_one_query(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 1)
+
+    def test_revalidation_does_not_render_config(self):
+        etag = self.client.get(self.url)["ETag"]
+        cache.clear()
+
+        with patch("stacks.services.get_traefik_config") as mock_render:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        mock_render.assert_not_called()
+
+    def test_edge_changes_bump_version(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        ResourcesManager.update_resource(self.edge.pk, {"subdomain": "store"})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("store-root", response.json()["http"]["routers"])
+
+    def test_non_edge_changes_keep_version(self):
+        version = services.get_edge_config_version()
+
+        ResourcesManager.add_resource(self.stack, "AZURERM_RESOURCE_GROUP")
+
+        self.assertEqual(services.get_edge_config_version(), version)
+
+    def test_stack_delete_bumps_version(self):
+        version = services.get_edge_config_version()
+
+        self.stack.delete()
+
+        self.assertGreater(services.get_edge_config_version(), version)
+
+    @patch("stacks.services.time.sleep")
+    def test_long_poll_returns_when_version_moves(self, mock_sleep):
+        etag = self.client.get(self.url)["ETag"]
+        mock_sleep.side_effect = lambda _: services.bump_edge_config_version()
+
+        response = self.client.get(self.url, {"wait": 10}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        mock_sleep.assert_called_once()
+
+    @patch("stacks.services.time.monotonic")
+    @patch("stacks.services.time.sleep")
+    def test_long_poll_times_out_with_304(self, mock_sleep, mock_monotonic):
+        etag = self.client.get(self.url)["ETag"]
+        mock_monotonic.side_effect = [0, 0, 2, 2]
+
+        response = self.client.get(self.url, {"wait": 1}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    @patch("stacks.services.time.sleep")
+    def test_long_poll_answers_immediately_when_waiters_are_capped(self, mock_sleep):
+        etag = self.client.get(self.url)["ETag"]
+
+        with patch.object(services, "_edge_long_poll_slots") as slots:
+            slots.acquire.return_value = False
+            response = self.client.get(self.url, {"wait": 10}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        mock_sleep.assert_not_called()
+        slots.release.assert_not_called()
+
+    def test_invalid_wait_is_rejected(self):
+        response = self.client.get(self.url, {"wait": "soon"}, HTTP_IF_NONE_MATCH='"edge-1"')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
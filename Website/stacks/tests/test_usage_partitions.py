@@ -0,0 +1,32 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from stacks.metrics import partitions
+
+
+class UsagePartitionHelpersTestCase(TestCase):
+    def test_month_arithmetic_and_names(self):
+        self.assertEqual(partitions.add_months(date(2025, 11, 1), 3), date(2026, 2, 1))
+        self.assertEqual(partitions.add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
+        name = partitions.partition_name(date(2026, 2, 1))
+        self.assertEqual(name, "stacks_metricusagerecord_p202602")
+        self.assertEqual(partitions.partition_month(name), date(2026, 2, 1))
+        self.assertIsNone(partitions.partition_month(partitions.DEFAULT_PARTITION))
+
+    def test_commands_are_noops_without_partitioning(self):
+        self.assertFalse(partitions.is_partitioned(connection))
+        out = StringIO()
+
+        call_command("create_usage_partitions", stdout=out)
+        call_command("archive_usage_partitions", "--drop", stdout=out)
+
+        self.assertEqual(out.getvalue().count("not partitioned"), 2)
+
+    def test_archive_keeps_the_month_being_billed(self):
+        with self.assertRaises(CommandError):
+            call_command("archive_usage_partitions", "--keep-months", "1", stdout=StringIO())
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from organizations.models import Organization, OrganizationMember
+from organizations.services import transfer_project_to_organization
+from payments.services import get_usage_data
+from projects.models import Project, ProjectMember
+from stacks import services
+from stacks.metrics.models import DailyMetricUsage, MetricDefinition, MetricUsageRecord
+from stacks.models import PurchasableStack, Stack
+
+
+class DailyUsageRollupTestCase(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Rollup Org")
+        project = Project.objects.create(name="Rollup Project", organization=self.organization)
+        purchasable_stack = PurchasableStack.objects.create(
+            type="DJANGO", variant="basic", version="1.0", price_id="price_rollup",
+        )
+        self.stack = Stack.objects.create(name="Rollup Stack", project=project, purchased_stack=purchasable_stack)
+        self.metric = MetricDefinition.objects.create(
+            name="requests", applicable_resources=[], unit_name="Requests", record_frequency_cron="0 * * * *",
+        )
+        self.now = timezone.now()
+
+    def _record(self, amount, resource="app", when=None):
+        return MetricUsageRecord.objects.create(
+            metric_definition=self.metric, stack=self.stack, resource=resource,
+            amount_used=Decimal(amount), usage_datetime=when or self.now,
+        )
+
+    def test_saved_records_are_rolled_up_per_day(self):
+        self._record("2", resource="app")
+        self._record("3", resource="worker")
+        self._record("7", when=self.now - timedelta(days=40))
+
+        today = DailyMetricUsage.objects.get(usage_date=timezone.localdate(self.now))
+        self.assertEqual(today.amount_used, Decimal("5"))
+        self.assertEqual(today.organization_id, self.organization.id)
+        self.assertEqual(DailyMetricUsage.objects.count(), 2)
+
+    def test_corrected_record_replaces_rather_than_adds(self):
+        record = self._record("2")
+        record.amount_used = Decimal("9")
+        record.save()
+
+        self.assertEqual(DailyMetricUsage.objects.get().amount_used, Decimal("9"))
+
+    def test_refresh_drops_buckets_without_records_and_is_batched(self):
+        record = self._record("2")
+        day = timezone.localdate(self.now)
+        MetricUsageRecord.objects.filter(pk=record.pk).delete()
+        other_day = day - timedelta(days=1)
+        MetricUsageRecord.objects.bulk_create([
+            MetricUsageRecord(
+                metric_definition=self.metric, stack=self.stack, resource=f"r{i}",
+                amount_used=Decimal("1"), usage_datetime=self.now - timedelta(days=1),
+            )
+            for i in range(4)
+        ])
+
+        # Grouped read, organization lookup, upsert, then the delete (collect + DELETE).
+        with self.assertNumQueries(5):
+            services.refresh_daily_usage([
+                (self.stack.pk, self.metric.pk, day), (self.stack.pk, self.metric.pk, other_day),
+            ])
+
+        self.assertEqual(
+            list(DailyMetricUsage.objects.values_list("usage_date", "amount_used")),
+            [(other_day, Decimal("4"))],
+        )
+
+    def test_dashboard_reads_do_not_scale_with_raw_records(self):
+        self._record("1")
+        with self.assertNumQueries(4):
+            small = get_usage_data(self.organization)
+
+        for i in range(20):
+            self._record("1", resource=f"extra-{i}")
+        with self.assertNumQueries(4):
+            large = get_usage_data(self.organization)
+
+        self.assertEqual(small["current_daily_usage"], "1.00")
+        self.assertEqual(large["current_usage"], "21.00")
+
+    def test_project_transfer_moves_open_month_usage_to_new_owner(self):
+        self._record("2")
+        self._record("7", when=self.now - timedelta(days=40))
+        user = get_user_model().objects.create_user(username="mover", email="mover@example.com", password="x")
+        target = Organization.objects.create(name="New Owner")
+        OrganizationMember.objects.create(user=user, organization=target, role="admin")
+        ProjectMember.objects.create(user=user, project=self.stack.project, role="admin")
+
+        transfer_project_to_organization(user, str(self.stack.project_id), str(target.id))
+
+        today = DailyMetricUsage.objects.get(usage_date=timezone.localdate(self.now))
+        earlier = DailyMetricUsage.objects.exclude(pk=today.pk).get()
+        self.assertEqual(today.organization_id, target.id)
+        self.assertEqual(earlier.organization_id, self.organization.id)
@@ -8,6 +8,8 @@ router.register(r'', views.StackViewSet, basename='stack')
 
 urlpatterns = [
     path('admin/check-credit-limits/', views.check_credit_limits_view, name='check-credit-limits'),
+    path('admin/dispatch-outbox/', views.dispatch_outbox_view, name='dispatch-outbox'),
+    path('admin/metric-usage/', views.ingest_metric_usage_view, name='metric-usage-ingest'),
 
     # Deployment log endpoints (IaC webhook-authenticated)
     path('<str:stack_id>/deployment-logs/', views.create_deployment_log_view, name='deployment-log-create'),
@@ -20,10 +22,14 @@ urlpatterns = [
 
     # Operation endpoints (user-authenticated)
     path('<str:stack_id>/operations/', views.stack_operations_view, name='stack-operations'),
+    path('<str:stack_id>/events/', views.stack_events_view, name='stack-events'),
+    # Listed before operation-detail so 'claim-next' is not taken as an operation id (IaC webhook)
+    path('operations/claim-next/', views.operation_claim_next_view, name='operation-claim-next'),
     path('operations/<str:operation_id>/', views.operation_detail_view, name='operation-detail'),
 
     # Operation endpoints (IaC webhook-authenticated)
     path('operations/<str:operation_id>/claim/', views.operation_claim_view, name='operation-claim'),
+    path('operations/<str:operation_id>/heartbeat/', views.operation_heartbeat_view, name='operation-heartbeat'),
     path('operations/<str:operation_id>/complete/', views.operation_complete_view, name='operation-complete'),
 
     # Unified Resource endpoints (Phase 1)
@@ -1,12 +1,23 @@
+import asyncio
 import json
-from django.http import JsonResponse, HttpResponse
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import parse_etags
 from rest_framework import status, filters, viewsets
-from rest_framework.decorators import action, api_view, permission_classes as perm_classes
+from rest_framework.decorators import (
+    action, api_view, permission_classes as perm_classes, renderer_classes,
+)
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
 
 from core.utils.webhook_auth import verify_iac_webhook_signature
-from organizations.models import OrganizationMember
+from organizations.helpers.access import get_user_access
 from stacks.models import Stack, PurchasableStack, Operation
 from stacks.serializers import (
     StackSerializer,
@@ -19,8 +30,9 @@ from stacks.serializers import (
     DeploymentLogCompleteSerializer,
     OperationSerializer,
     OperationClaimSerializer,
+    OperationHeartbeatSerializer,
     OperationCompleteSerializer,
-    ResourceTreeSerializer,
+    MetricUsageIngestSerializer,
     StackDashboardSerializer,
 )
 from stacks import services as _svc
@@ -29,6 +41,7 @@ from stacks.services import (
     ValidationError,
     NotFoundError,
     ForbiddenError,
+    RangeNotSatisfiableError,
     verify_project_access,
     create_stack,
     create_custom_stack,
@@ -37,22 +50,36 @@ from stacks.services import (
     pause_stack,
     resume_stack,
     check_and_auto_pause_stacks,
+    dispatch_outbox,
+    ingest_metric_usage,
     bulk_update_resources,
     add_resource_to_stack,
     remove_resource_from_stack,
     list_stack_resources,
     list_available_resource_types,
-    get_traefik_config,
+    get_edge_config_etag,
+    get_traefik_config_payload,
+    wait_for_edge_config_change,
+    get_resource_fragments,
+    resource_tree_etag,
+    project_dashboard_etag,
     download_stack_source,
     upload_source_code,
+    clear_source_digest,
+    create_source_upload_url,
+    finalize_source_upload,
     create_deployment_log,
     append_deployment_log,
     complete_deployment_log,
     get_latest_deployment_log,
     get_deployment_log_content,
     claim_operation,
+    claim_next_operation,
+    heartbeat_operation,
     complete_operation,
     get_stack_operations,
+    get_stack_events,
+    get_latest_stack_event_id,
 )
 
 
@@ -63,9 +90,7 @@ def _error_response(exc: ServiceError) -> Response:
 
 def _get_user_org_ids(user):
     """Return the organization IDs the user belongs to."""
-    return OrganizationMember.objects.filter(
-        user=user
-    ).values_list("organization_id", flat=True)
+    return get_user_access(user).org_ids
 
 
 def _verify_stack_access(user, stack_id):
@@ -83,10 +108,7 @@ def _verify_stack_access(user, stack_id):
     if stack.status == "Deleted":
         raise NotFoundError("Stack not found.")
 
-    org_id = stack.project.organization_id
-    if not OrganizationMember.objects.filter(
-        user=user, organization_id=org_id
-    ).exists():
+    if not get_user_access(user).is_org_member(stack.project.organization_id):
         raise NotFoundError("Stack not found.")
 
     return stack
@@ -100,6 +122,34 @@ def check_credit_limits_view(request):
     return Response(result, status=status.HTTP_200_OK)
 
 
+@api_view(["POST"])
+@perm_classes([IsAuthenticated])
+def dispatch_outbox_view(request):
+    """Admin endpoint called by the crontainer to retry undelivered IaC messages."""
+    result = dispatch_outbox()
+    return Response(result, status=status.HTTP_200_OK)
+
+
+@api_view(["POST"])
+@perm_classes([IsAdminUser])
+def ingest_metric_usage_view(request):
+    """Admin endpoint for usage recorders to upsert a batch of metric samples.
+
+    Samples name arbitrary stacks and overwrite billable usage, so only staff
+    accounts (the crontainer's service user) may call it.
+    """
+    serializer = MetricUsageIngestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        result = ingest_metric_usage(serializer.validated_data["records"])
+    except ValidationError as exc:
+        return _error_response(exc)
+
+    return Response(result, status=status.HTTP_200_OK)
+
+
 class StackViewSet(viewsets.ModelViewSet):
     queryset = Stack.objects.exclude(status="Deleted")
     serializer_class = StackSerializer
@@ -264,12 +314,12 @@ class StackViewSet(viewsets.ModelViewSet):
     def trigger_iac_update_action(self, request, pk=None):
         stack = self.get_object()
         try:
-            trigger_iac_update(stack_id=str(stack.pk))
+            result = trigger_iac_update(stack_id=str(stack.pk))
         except ServiceError as exc:
             return _error_response(exc)
 
         return Response(
-            {"message": "Stack update initiated successfully."},
+            {"message": "Stack update initiated successfully.", **result},
             status=status.HTTP_200_OK,
         )
 
@@ -304,8 +354,31 @@ class StackViewSet(viewsets.ModelViewSet):
     # ----- TRAEFIK CONFIG ------------------------------------------------
     @action(detail=False, methods=["get"], url_path="traefik-config", url_name="traefik_config", permission_classes=[AllowAny])
     def get_traefik_config_action(self, request):
-        config = get_traefik_config()
-        return JsonResponse(config)
+        """Serve the cached Traefik config with an ETag.
+
+        ``If-None-Match`` matching the current config returns 304.  Adding
+        ``?wait=<seconds>`` holds the request open until the config changes
+        (long-poll), then answers as usual.
+        """
+        known_etags = parse_etags(request.headers.get("If-None-Match", ""))
+        try:
+            wait = float(request.query_params.get("wait", 0))
+        except ValueError:
+            return _error_response(ValidationError("'wait' must be a number of seconds."))
+
+        if known_etags and wait > 0:
+            etag = wait_for_edge_config_change(known_etags, wait)
+        else:
+            etag = get_edge_config_etag()
+
+        # Revalidate against the version row so a 304 never renders the config.
+        if etag in known_etags or "*" in known_etags:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            etag, body = get_traefik_config_payload()
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        return response
 
     # ----- BULK UPDATE RESOURCES (webhook) --------------------------------
     @action(detail=False, methods=["patch"], url_path="bulk-update-resources", url_name="bulk_update_resources", permission_classes=[AllowAny])
@@ -339,7 +412,7 @@ class StackViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_403_FORBIDDEN,
                 )
 
-        bulk_update_resources(resources_data)
+        bulk_update_resources(resources_data, resources=stack_resources)
         return Response(
             {"success": True, "message": "Resources updated successfully."},
             status=status.HTTP_200_OK,
@@ -350,12 +423,26 @@ class StackViewSet(viewsets.ModelViewSet):
     def download(self, request, pk=None):
         stack = self.get_object()
         try:
-            file_bytes, file_name = download_stack_source(stack_id=str(stack.pk))
+            download = download_stack_source(
+                stack_id=str(stack.pk), range_header=request.META.get("HTTP_RANGE"),
+            )
+        except RangeNotSatisfiableError as exc:
+            response = _error_response(exc)
+            response["Content-Range"] = f"bytes */{exc.size}"
+            return response
         except ServiceError as exc:
             return _error_response(exc)
 
-        response = HttpResponse(file_bytes, content_type="application/octet-stream")
-        response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+        response = StreamingHttpResponse(
+            download.chunks,
+            status=status.HTTP_206_PARTIAL_CONTENT if download.partial else status.HTTP_200_OK,
+            content_type="application/octet-stream",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{download.file_name}"'
+        response["Content-Length"] = str(download.length)
+        response["Accept-Ranges"] = "bytes"
+        if download.partial:
+            response["Content-Range"] = f"bytes {download.start}-{download.end}/{download.size}"
         return response
 
     # ----- UPLOAD --------------------------------------------------------
@@ -374,7 +461,51 @@ class StackViewSet(viewsets.ModelViewSet):
         except ServiceError as exc:
             return _error_response(exc)
 
-        # Trigger an IAC update now that the upload succeeded
+        # Trigger an IAC update now that the upload succeeded, unless the
+        # stack already runs this exact archive
+        iac_update_queued = result.changed
+        if result.changed:
+            try:
+                trigger_iac_update(stack_id=str(stack.pk))
+            except ServiceError:
+                # Blob was persisted; forget the digest so re-uploading retries the deploy.
+                clear_source_digest(str(stack.pk))
+                iac_update_queued = False
+
+        return Response(
+            {
+                "success": True,
+                "blob_name": result.blob_name,
+                "blob_url": result.blob_url,
+                "digest": result.digest,
+                "unchanged": not result.changed,
+                "iac_update_queued": iac_update_queued,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    # ----- DIRECT UPLOAD -------------------------------------------------
+    @action(detail=True, methods=["post"], url_path="upload-url", url_name="upload_url")
+    def upload_url(self, request, pk=None):
+        stack = self.get_object()
+        try:
+            result = create_source_upload_url(stack_id=str(stack.pk))
+        except ServiceError as exc:
+            return _error_response(exc)
+
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["post"], url_path="upload-finalize", url_name="upload_finalize")
+    def upload_finalize(self, request, pk=None):
+        stack = self.get_object()
+        try:
+            result = finalize_source_upload(
+                stack_id=str(stack.pk), upload_token=request.data.get("upload_token"),
+            )
+        except ServiceError as exc:
+            return _error_response(exc)
+
+        # Trigger an IAC update now that the upload is verified
         iac_update_queued = True
         try:
             trigger_iac_update(stack_id=str(stack.pk))
@@ -591,6 +722,114 @@ def deployment_log_detail_view(request, stack_id, log_id):
     return Response(result)
 
 
+# ---------------------------------------------------------------------------
+# Stack event stream (Server-Sent Events)
+# ---------------------------------------------------------------------------
+SSE_POLL_SECONDS = 3.0  # matches the dashboard's plain polling interval
+SSE_HEARTBEAT_SECONDS = 15.0
+SSE_MAX_STREAM_SECONDS = 60.0  # browsers reconnect with Last-Event-ID
+SSE_RETRY_MS = 2000
+# Without ASGI each response is a single poll; the browser reconnects this often.
+SSE_SYNC_RETRY_MS = 3000
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF content negotiation accept ``Accept: text/event-stream``."""
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data)
+
+
+def _format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+def _stack_event_poll(stack_id: str, last_event_id: int) -> str:
+    """Return one poll's worth of SSE frames, for servers without ASGI.
+
+    A sync worker would be held for the whole life of a stream, so instead
+    the response ends straight away and ``retry`` makes the browser
+    reconnect.  The trailing ``id`` line moves ``Last-Event-ID`` forward
+    even when there were no events, so the next poll resumes from here.
+    """
+    frames = [f"retry: {SSE_SYNC_RETRY_MS}\n\n"]
+    for event in get_stack_events(stack_id, last_event_id):
+        last_event_id = event["id"]
+        frames.append(_format_sse(event))
+    frames.append(f"id: {last_event_id}\n\n")
+    return "".join(frames)
+
+
+async def _stack_event_stream_async(stack_id: str, last_event_id: int):
+    """Yield SSE frames for new stack events until ``SSE_MAX_STREAM_SECONDS``.
+
+    Sleeps without holding a thread.  Queries run thread-sensitively, so the
+    stream reuses one database connection, which is closed once when the
+    stream ends or the client goes away.
+    """
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        deadline = time.monotonic() + SSE_MAX_STREAM_SECONDS
+        idle = 0.0
+        while True:
+            events = await sync_to_async(get_stack_events)(stack_id, last_event_id)
+            for event in events:
+                last_event_id = event["id"]
+                yield _format_sse(event)
+            if time.monotonic() >= deadline:
+                return
+            if events:
+                idle = 0.0
+                continue
+            await asyncio.sleep(SSE_POLL_SECONDS)
+            idle += SSE_POLL_SECONDS
+            if idle >= SSE_HEARTBEAT_SECONDS:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+    finally:
+        await sync_to_async(connection.close)()
+
+
+@api_view(["GET"])
+@perm_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def stack_events_view(request, stack_id):
+    """Stream log lines and operation status changes for a stack as SSE.
+
+    Resumes after the ``Last-Event-ID`` header (or ``?last_event_id=``);
+    without either, only events newer than the connection are sent.  Under
+    ASGI the response is a long-lived stream; otherwise it answers a single
+    poll and the browser reconnects.
+    """
+    try:
+        _verify_stack_access(request.user, stack_id)
+    except NotFoundError as exc:
+        return _error_response(exc)
+
+    raw_last_id = request.headers.get("Last-Event-ID") or request.query_params.get("last_event_id")
+    if raw_last_id:
+        try:
+            last_event_id = int(raw_last_id)
+        except ValueError:
+            return _error_response(ValidationError("Invalid Last-Event-ID."))
+    else:
+        last_event_id = get_latest_stack_event_id(stack_id)
+
+    if isinstance(request._request, ASGIRequest):
+        response = StreamingHttpResponse(
+            _stack_event_stream_async(stack_id, last_event_id), content_type="text/event-stream",
+        )
+    else:
+        response = HttpResponse(_stack_event_poll(stack_id, last_event_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 # ---------------------------------------------------------------------------
 # Operation views — lifecycle tracking for IaC jobs
 # ---------------------------------------------------------------------------
@@ -605,10 +844,7 @@ def operation_detail_view(request, operation_id):
     except Operation.DoesNotExist:
         return Response({"error": "Operation not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    org_id = operation.stack.project.organization_id
-    if not OrganizationMember.objects.filter(
-        user=request.user, organization_id=org_id
-    ).exists():
+    if not get_user_access(request.user).is_org_member(operation.stack.project.organization_id):
         return Response({"error": "Operation not found"}, status=status.HTTP_404_NOT_FOUND)
 
     return Response(OperationSerializer(operation).data)
@@ -643,7 +879,47 @@ def operation_claim_view(request, operation_id):
         result = claim_operation(
             operation_id=operation_id,
             attempt_id=data["attempt_id"],
-            lease_duration_seconds=data.get("lease_duration_seconds", 1800),
+            lease_duration_seconds=data["lease_duration_seconds"],
+        )
+    except (NotFoundError, ValidationError) as exc:
+        return _error_response(exc)
+
+    return Response(result)
+
+
+@api_view(["POST"])
+@perm_classes([AllowAny])
+def operation_claim_next_view(request):
+    """IaC job claims the next runnable operation, if any (HMAC-authenticated).
+
+    Returns ``204 No Content`` when no operation is ready to run.
+    """
+    data, error_resp = _verify_webhook_and_parse(request, OperationClaimSerializer)
+    if error_resp:
+        return error_resp
+
+    result = claim_next_operation(
+        attempt_id=data["attempt_id"],
+        lease_duration_seconds=data["lease_duration_seconds"],
+    )
+    if result is None:
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(result)
+
+
+@api_view(["POST"])
+@perm_classes([AllowAny])
+def operation_heartbeat_view(request, operation_id):
+    """IaC job renews the lease on an operation it is still running (HMAC-authenticated)."""
+    data, error_resp = _verify_webhook_and_parse(request, OperationHeartbeatSerializer)
+    if error_resp:
+        return error_resp
+
+    try:
+        result = heartbeat_operation(
+            operation_id=operation_id,
+            attempt_id=data["attempt_id"],
+            lease_duration_seconds=data["lease_duration_seconds"],
         )
     except (NotFoundError, ValidationError) as exc:
         return _error_response(exc)
@@ -676,19 +952,29 @@ def operation_complete_view(request, operation_id):
 # Unified Resource (Phase 1 — test endpoints)
 # ---------------------------------------------------------------------------
 
+def _not_modified(request, etag: str) -> bool:
+    known_etags = parse_etags(request.headers.get("If-None-Match", ""))
+    return etag in known_etags or "*" in known_etags
+
+
 @api_view(["GET"])
 @perm_classes([IsAuthenticated])
 def resource_tree_view(request, stack_id):
     """Return the resource tree for a stack using the unified Resource model.
 
     GET /api/v1/stacks/{stack_id}/resources-v2/
-    """
-    from django.db.models import Prefetch
-    from stacks.resources.resource import Resource, ResourceDependency
 
-    try:
-        stack = Stack.objects.get(pk=stack_id)
-    except Stack.DoesNotExist:
+    The tree is cached per ``StackResourceVersion`` and served with an
+    ETag; ``If-None-Match`` matching the current version returns 304.
+    """
+    stack = (
+        Stack.objects
+        .filter(pk=stack_id)
+        .annotate(tree_version=Coalesce("resource_version__version", 0))
+        .only("id", "project_id")
+        .first()
+    )
+    if stack is None:
         return Response({"error": "Stack not found"}, status=status.HTTP_404_NOT_FOUND)
 
     try:
@@ -696,21 +982,14 @@ def resource_tree_view(request, stack_id):
     except (ForbiddenError, NotFoundError) as exc:
         return _error_response(exc)
 
-    resources = (
-        Resource.objects
-        .filter(stack=stack)
-        .select_related("parent")
-        .prefetch_related(
-            Prefetch(
-                "dependencies",
-                queryset=ResourceDependency.objects.select_related("depends_on"),
-            )
-        )
-        .order_by("index")
-    )
-
-    tree = ResourceTreeSerializer().to_representation(resources)
-    return Response({"stack_id": stack_id, "resource_tree": tree})
+    etag = resource_tree_etag(stack.id, stack.tree_version)
+    if _not_modified(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        fragment = get_resource_fragments({stack.id: stack.tree_version})[stack.id]
+        response = Response({"stack_id": stack_id, "resource_tree": fragment["resource_tree"]})
+    response["ETag"] = etag
+    return response
 
 
 @api_view(["GET"])
@@ -719,53 +998,40 @@ def dashboard_view(request, project_id):
     """Unified dashboard: all stacks in a project with resource trees.
 
     GET /api/v1/stacks/dashboard/{project_id}/
-    """
-    from django.db.models import Prefetch
-    from stacks.resources.resource import Resource, ResourceDependency
 
+    Assembled from the cached per-stack fragments (one ``get_many``); the
+    ETag covers every stack row and resource version shown.
+    """
     try:
         verify_project_access(request.user, project_id)
     except (ForbiddenError, NotFoundError) as exc:
         return _error_response(exc)
 
-    stacks = (
+    stacks = list(
         Stack.objects
         .filter(project_id=project_id)
         .select_related("purchased_stack")
-        .prefetch_related(
-            Prefetch(
-                "unified_resources",
-                queryset=Resource.objects.select_related("parent")
-                .prefetch_related(
-                    Prefetch(
-                        "dependencies",
-                        queryset=ResourceDependency.objects.select_related("depends_on"),
-                    )
-                )
-                .order_by("index"),
-            )
-        )
+        .annotate(tree_version=Coalesce("resource_version__version", 0))
+        .only("id", "name", "status", "created_at", "purchased_stack__name")
     )
 
-    serializer = StackDashboardSerializer(stacks, many=True)
-
-    # Compute totals across all stacks
-    all_resources = []
-    for stack in stacks:
-        all_resources.extend(stack.unified_resources.all())
-
-    total = len(all_resources)
-    statuses = [r.status.lower() for r in all_resources]
-    healthy = sum(1 for s in statuses if s in ("active", "running", "succeeded", ""))
-    failed = sum(1 for s in statuses if s in ("failed", "error"))
-
-    return Response({
-        "stacks": serializer.data,
-        "totals": {
-            "total_stacks": stacks.count(),
-            "total_resources": total,
-            "healthy": healthy,
-            "degraded": total - healthy - failed,
-            "failed": failed,
-        },
-    })
+    etag = project_dashboard_etag([
+        (s.id, s.name, s.status, s.created_at.isoformat(), s.purchased_stack.name, s.tree_version)
+        for s in stacks
+    ])
+    if _not_modified(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response["ETag"] = etag
+        return response
+
+    fragments = get_resource_fragments({s.id: s.tree_version for s in stacks})
+    serializer = StackDashboardSerializer(stacks, many=True, context={"fragments": fragments})
+
+    totals = {"total_stacks": len(stacks), "total_resources": 0, "healthy": 0, "degraded": 0, "failed": 0}
+    for fragment in fragments.values():
+        for key, value in fragment["health_summary"].items():
+            totals[key] += value
+
+    response = Response({"stacks": serializer.data, "totals": totals})
+    response["ETag"] = etag
+    return response
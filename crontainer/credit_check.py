@@ -5,22 +5,13 @@ exceeded its monthly credit allowance.  Intended to be scheduled hourly (or
 after each usage-recorder run).
 """
 
-import requests
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-HOST = os.environ.get("HOST")
+from helpers import api_request
 
 
 def check_credit_limits() -> None:
     """POST to the credit-limits endpoint and log the result."""
-    url = f"{HOST}/api/v1/stacks/admin/check-credit-limits/"
     try:
-        resp = requests.post(url, timeout=60)
-        resp.raise_for_status()
-        data = resp.json()
+        data = api_request("POST", "/api/v1/stacks/admin/check-credit-limits/")
         paused = data.get("paused", [])
         errors = data.get("errors", [])
         if paused:
@@ -1,10 +1,66 @@
+"""Shared Deploy Box API client for crontainer jobs.
+
+Every job talks to the API through ``api_request``, which provides:
+
+- one keep-alive ``requests.Session`` per process (connection reuse);
+- an OAuth2 client-credentials token cached until shortly before its
+  ``expires_in`` runs out, and refreshed once if the API answers 401;
+- bounded retries with exponential backoff on connection errors and
+  502/503/504 responses (every endpoint the jobs call is idempotent);
+- a timeout on every request and a timing line per call.
+"""
+
+import threading
+import time
+
 import requests
 import os
 from dotenv import load_dotenv
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
 
+API_BASE_URL = (os.getenv("BASE_URL") or os.getenv("HOST") or "").rstrip("/")
+TOKEN_URL = f"{(os.getenv('HOST') or '').rstrip('/')}/o/token/"
+
+REQUEST_TIMEOUT_SECONDS = 60
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.5
+# Refresh the cached token this many seconds before it actually expires.
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+
+
+class ApiError(Exception):
+    """Raised when the API returns a non-2xx response after retries."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF_SECONDS,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=None,  # retry POSTs too; the job endpoints are idempotent
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=16)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+session = _build_session()
+
+_token_lock = threading.Lock()
+_cached_token: dict | None = None
+_cached_token_expires_at = 0.0
+
+
 def exchange_client_credentials_for_token(
 ) -> dict | None:
     """Exchanges client credentials for an access token."""
@@ -16,8 +72,7 @@ def exchange_client_credentials_for_token(
     }
 
     try:
-        token_url = f"{os.getenv('HOST')}/o/token/"
-        response = requests.post(token_url, data=data)
+        response = session.post(TOKEN_URL, data=data, timeout=REQUEST_TIMEOUT_SECONDS)
 
         if response.status_code != 200:
             print(f"Error obtaining client credentials token: {response.text}")
@@ -28,24 +83,64 @@ def exchange_client_credentials_for_token(
         print(f"Error during client credentials token exchange: {str(e)}")
         return None
 
-def make_authenticated_api_request(url, method="get", json=None):
-    token = exchange_client_credentials_for_token()
-    if not token or "access_token" not in token:
-        print("Error: Could not obtain access token.")
-        return None
-    headers = {"Authorization": f"Bearer {token.get('access_token')}"}
-    full_url = f"{os.getenv('BASE_URL')}/{url}"
 
-    if method.upper() == "POST":
-        response = requests.post(full_url, headers=headers, json=json)
-    else:
-        response = requests.get(full_url, headers=headers)
+def get_access_token(force_refresh: bool = False) -> str | None:
+    """Return a client-credentials access token, reusing it until shortly before it expires."""
+    global _cached_token, _cached_token_expires_at
+
+    with _token_lock:
+        if not force_refresh and _cached_token and time.monotonic() < _cached_token_expires_at:
+            return _cached_token["access_token"]
+
+        token = exchange_client_credentials_for_token()
+        if not token or "access_token" not in token:
+            _cached_token = None
+            return None
 
+        expires_in = float(token.get("expires_in") or 0)
+        _cached_token = token
+        _cached_token_expires_at = time.monotonic() + max(expires_in - TOKEN_EXPIRY_MARGIN_SECONDS, 0)
+        return token["access_token"]
+
+
+def _send(method: str, url: str, access_token: str | None, json, timeout) -> requests.Response:
+    headers = {"Authorization": f"Bearer {access_token}"} if access_token else {}
+    started = time.monotonic()
     try:
-        return response.json()
-    except Exception:
-        print(f"Error during request: {response.text}")
-        return response.text
+        response = session.request(method, url, headers=headers, json=json, timeout=timeout)
+    except requests.RequestException:
+        print(f"{method} {url} failed after {(time.monotonic() - started) * 1000:.0f} ms")
+        raise
+    print(f"{method} {url} -> {response.status_code} in {(time.monotonic() - started) * 1000:.0f} ms")
+    return response
+
+
+def api_request(method: str, path: str, json=None, authenticated: bool = True, timeout=REQUEST_TIMEOUT_SECONDS):
+    """Call the Deploy Box API and return the decoded JSON body.
+
+    Raises ``ApiError`` for non-2xx responses (after retries) and lets
+    ``requests`` exceptions propagate once retries are exhausted.
+    """
+    method = method.upper()
+    url = f"{API_BASE_URL}/{path.lstrip('/')}"
+
+    access_token = None
+    if authenticated:
+        access_token = get_access_token()
+        if not access_token:
+            raise ApiError("Could not obtain access token.")
+
+    response = _send(method, url, access_token, json, timeout)
+    if response.status_code == 401 and authenticated:
+        # The cached token was revoked or expired early; refresh once.
+        response = _send(method, url, get_access_token(force_refresh=True), json, timeout)
+
+    if not response.ok:
+        raise ApiError(f"{method} {path} returned {response.status_code}: {response.text[:500]}", response.status_code)
+    if not response.content:
+        return None
+    return response.json()
+
 
 if __name__ == "__main__":
     print(exchange_client_credentials_for_token())
@@ -1,57 +1,94 @@
-import requests
-import json
-from pymongo import MongoClient
+"""Periodic MongoDB database-size collector.
+
+Measures every stack database concurrently on a bounded thread pool, each
+with its own connect/query timeout, so a run takes about as long as the
+slowest database rather than the sum of all of them.  Samples are posted to
+the metric-usage ingestion endpoint in batches as they arrive, so a crash
+late in the run still records what was already measured.
+"""
+
 import os
-from helpers import make_authenticated_api_request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from pymongo import MongoClient
+from helpers import api_request
 from dotenv import load_dotenv
 
 load_dotenv()
 
-BASE_URL = os.getenv("BASE_URL")
+DB_STORAGE_METRIC = os.getenv("DB_STORAGE_METRIC", "database_storage")
+DB_SIZE_WORKERS = int(os.getenv("DB_SIZE_WORKERS", "16"))
+DB_SIZE_TIMEOUT_MS = int(os.getenv("DB_SIZE_TIMEOUT_MS", "10000"))
+UPLOAD_BATCH_SIZE = int(os.getenv("DB_SIZE_UPLOAD_BATCH_SIZE", "500"))
 
-def send_data(data, token):
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-    url = f"{BASE_URL}/api/stack/update_database_usage"
-    requests.post(url, data=data, headers=headers)
+
+def measure_database(database: dict, sampled_at: str) -> dict:
+    """Run ``dbstats`` against one database and return its usage sample."""
+    with MongoClient(
+        database["uri"],
+        serverSelectionTimeoutMS=DB_SIZE_TIMEOUT_MS,
+        connectTimeoutMS=DB_SIZE_TIMEOUT_MS,
+        socketTimeoutMS=DB_SIZE_TIMEOUT_MS,
+    ) as client:
+        db = client.get_default_database()
+        stats = db.command("dbstats", maxTimeMS=DB_SIZE_TIMEOUT_MS)
+
+    return {
+        "metric": DB_STORAGE_METRIC,
+        "stack_id": database.get("stack"),
+        "resource": database.get("name") or db.name,
+        "amount_used": stats.get("storageSize", 0),
+        "usage_datetime": sampled_at,
+    }
+
+
+def upload_samples(samples: list[dict]) -> None:
+    try:
+        response = api_request("POST", "/api/v1/stacks/admin/metric-usage/", json={"records": samples})
+    except Exception as exc:
+        print(f"Upload failed: {exc}")
+        return
+    print(f"Uploaded {response.get('accepted', 0)} sample(s), rejected {len(response.get('rejected', []))}")
 
 
 def check_db_size():
-    data = make_authenticated_api_request(
-        "http://localhost:8000/api/v1/stacks/admin/databases/"
-    )
+    try:
+        data = api_request("GET", "/api/v1/stacks/admin/databases/")
+    except Exception as exc:
+        print(f"Error fetching databases: {exc}")
+        return
 
     # Ensure data is a dict and contains "data" key
     if not isinstance(data, dict) or "data" not in data:
         print("Error: API response is not a dictionary or missing 'data' key.")
         return
 
-    print(json.dumps(data, indent=4))
-
-    storage_amounts_dict = {}
-
-    for database in data.get("data", []):
-        stack_id = database.get("stack")
-        uri = database.get("uri")
-
-        print(stack_id, uri)
-
-        client = MongoClient(uri)
-        db = client.get_default_database()
-        stats = db.command("dbstats")
-        storage_size = stats.get("storageSize")
-
-        if stack_id in storage_amounts_dict:
-            storage_amounts_dict[stack_id] += storage_size
-        else:
-            storage_amounts_dict[stack_id] = storage_size
-
-    response = make_authenticated_api_request(
-        "/api/v1/stacks/admin/databases/update_database_usage/",
-        "POST",
-        {"success": True, "data": storage_amounts_dict}
-    )
+    databases = [d for d in data.get("data", []) if d.get("uri")]
+    if not databases:
+        print("No databases to record.")
+        return
 
-    print(response)
+    # Stamped to the hour so a re-run upserts instead of double-counting.
+    sampled_at = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0).isoformat()
+    batch, failures = [], 0
+
+    with ThreadPoolExecutor(max_workers=min(DB_SIZE_WORKERS, len(databases))) as pool:
+        futures = {pool.submit(measure_database, d, sampled_at): d for d in databases}
+        for future in as_completed(futures):
+            try:
+                batch.append(future.result())
+            except Exception as exc:
+                failures += 1
+                print(f"Could not measure database for stack {futures[future].get('stack')}: {exc}")
+                continue
+            if len(batch) >= UPLOAD_BATCH_SIZE:
+                upload_samples(batch)
+                batch = []
+
+    if batch:
+        upload_samples(batch)
+    print(f"Measured {len(databases) - failures}/{len(databases)} database(s).")
 
 
 if __name__ == "__main__":
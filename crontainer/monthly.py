@@ -1,15 +1,53 @@
-import requests
-import os
-from dotenv import load_dotenv
+"""Month-end invoice run.
 
-load_dotenv()
+Creates the invoice run for the previous month, then polls its status until
+``manage.py process_invoice_run`` has finished it.  The start endpoint is
+idempotent; posting again for a run that completed with errors queues its
+failed tasks for retry by the next ``process_invoice_run``.
+"""
 
-HOST = os.environ.get("HOST")
+import time
 
-def update_billing_history() -> None:
-    requests.post(
-        f"{HOST}/api/v1/payments/update_billing_history/",
+from helpers import api_request
+
+POLL_SECONDS = 30
+MAX_WAIT_SECONDS = 4 * 60 * 60
+FINISHED_STATUSES = ("completed", "completed_with_errors")
+
+
+def _report(data: dict) -> None:
+    print(
+        f"Invoice run {data.get('run_id')} ({data.get('billing_month')}): "
+        f"{data.get('status')} {data.get('tasks')}"
     )
 
+
+def update_billing_history() -> None:
+    """Create the invoice run and wait for it to finish."""
+    try:
+        data = api_request("POST", "/api/v1/payments/update_billing_history/")
+    except Exception as exc:
+        print(f"Invoice run request failed: {exc}")
+        return
+    _report(data)
+
+    run_id = data.get("run_id")
+    deadline = time.monotonic() + MAX_WAIT_SECONDS
+    while data.get("status") not in FINISHED_STATUSES:
+        if time.monotonic() >= deadline:
+            print("Invoice run still in progress; giving up waiting.")
+            return
+        time.sleep(POLL_SECONDS)
+        try:
+            data = api_request("GET", f"/api/v1/payments/invoice-runs/{run_id}/")
+        except Exception as exc:
+            print(f"Invoice run status request failed: {exc}")
+            continue
+        _report(data)
+
+    if data.get("status") == "completed_with_errors":
+        print("Invoice run completed with failed tasks; re-run this job to retry them.")
+
+
 if __name__ == "__main__":
     update_billing_history()
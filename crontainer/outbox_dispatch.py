@@ -0,0 +1,24 @@
+"""Periodic IaC outbox dispatch.
+
+Calls the Django admin endpoint that drains the transactional outbox, so IaC
+messages whose immediate send failed are retried.  Intended to be scheduled
+every minute.
+"""
+
+from helpers import api_request
+
+
+def dispatch_outbox() -> None:
+    """POST to the outbox-dispatch endpoint and log the result."""
+    try:
+        data = api_request("POST", "/api/v1/stacks/admin/dispatch-outbox/")
+        print(
+            f"Outbox dispatch: sent={data.get('sent', 0)} "
+            f"retrying={data.get('retrying', 0)} failed={data.get('failed', 0)}"
+        )
+    except Exception as exc:
+        print(f"Outbox dispatch failed: {exc}")
+
+
+if __name__ == "__main__":
+    dispatch_outbox()